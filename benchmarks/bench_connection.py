@@ -0,0 +1,48 @@
+"""
+    python -m benchmarks.bench_connection
+
+    latency of a query on a freshly opened connection (cold, the old
+    10 second reconnect) and on a long lived tuned one (warm)
+"""
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from labeled_files.setting import Config, SQLITE_FILES_NAME
+from labeled_files.sql import FileConnection
+
+from .workspace import generate
+
+
+queries = {
+    "recent 50": lambda conn: conn.fetch_files(
+        "SELECT * FROM files ORDER BY vtime DESC LIMIT 50"),
+    "nested tag": lambda conn: conn.search_files("", ["t1/t2/t3"]),
+    "keyword": lambda conn: conn.search_files("file 123", []),
+}
+
+
+def measure(conn: FileConnection, query, reopen: bool, repeat: int = 20):
+    times = []
+    for _ in range(repeat):
+        if reopen:
+            conn.close_db()
+        start = time.perf_counter()
+        query(conn)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        generate(Path(tmp), files=100_000, labels_per_file=5).close_db()
+        path = Path(tmp) / SQLITE_FILES_NAME
+        cold = FileConnection(path)
+        warm = FileConnection(path, True, Config().sqlite_pragmas)
+        for name, query in queries.items():
+            query(warm)
+            print(f"{name:>10}: cold {measure(cold, query, True) * 1000:7.2f} ms"
+                  f"  warm {measure(warm, query, False) * 1000:7.2f} ms")
+        cold.close_db()
+        warm.close_db()
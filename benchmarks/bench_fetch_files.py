@@ -0,0 +1,54 @@
+"""
+    python -m benchmarks.bench_fetch_files
+
+    compare per-file tag queries with the batched tag query of fetch_files
+"""
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from labeled_files.path_types import File
+from labeled_files.sql import FileConnection
+
+from .workspace import generate
+
+
+def fetch_files_per_row(conn: FileConnection, *args):
+    with conn.connect() as c:
+        cursor = c.execute(*args)
+        cursor.row_factory = sqlite3.Row
+        return [File(
+            row['id'],
+            row['name'],
+            row['type'],
+            row['path'],
+            conn.fetch_file_tags(row['id']),
+            datetime.fromisoformat(row['ctime']),
+            datetime.fromisoformat(row['vtime']),
+            row['icon'],
+            row['description']) for row in cursor]
+
+
+def measure(func, *args, repeat: int = 5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ret = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, ret
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = generate(Path(tmp), files=100_000, labels_per_file=5)
+        with conn.connect():
+            for limit in [50, 5_000, 100_000]:
+                sql = f"SELECT * FROM files ORDER BY vtime DESC LIMIT {limit}"
+                old, old_files = measure(fetch_files_per_row, conn, sql)
+                new, new_files = measure(conn.fetch_files, sql)
+                assert old_files == new_files
+                print(f"{limit:>7} files: per-row {old * 1000:9.1f} ms"
+                      f"  batched {new * 1000:9.1f} ms  x{old / new:.1f}")
+        conn.close_db()
@@ -0,0 +1,48 @@
+"""
+    python -m benchmarks.bench_first_page
+
+    time to the first 200 rows: loading every match and sorting it
+    against the first keyset page of iter_files
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from labeled_files.sql import VisitView
+
+from .workspace import generate, generate_visits
+
+
+def measure(func, repeat: int = 5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ret = func()
+        best = min(best, time.perf_counter() - start)
+    return best, ret
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = generate(Path(tmp), files=100_000, labels_per_file=5)
+        visits = generate_visits(Path(tmp), pcs=3, files=100_000)
+        view = VisitView([v.path for v in visits])
+        with conn.connect():
+            start = time.perf_counter()
+            conn.refresh_vtimes(view)
+            print(f"initial refresh_vtimes: {(time.perf_counter() - start) * 1000:.1f} ms")
+            for tags in [["t0"], ["t0/t1"], ["t0/t1/t2"], ["t0", "t1"]]:
+                def load_all():
+                    files = conn.search_files("", tags)
+                    times = view.get_file_times([f.id for f in files])
+                    for f in files:
+                        f.vtime = max(f.vtime, times.get(f.id, f.vtime))
+                    files.sort(key=lambda f: (f.vtime, f.id), reverse=True)
+                    return files
+                old, files = measure(load_all)
+                new, page = measure(lambda: next(conn.iter_files(tags, view)))
+                assert [f.id for f in files[:200]] == [f.id for f in page]
+                print(f"{'+'.join(tags):>10} ({len(files):>6} files): "
+                      f"all {old * 1000:8.1f} ms  first page {new * 1000:6.1f} ms")
+        view.close_db()
+        conn.close_db()
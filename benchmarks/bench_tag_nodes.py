@@ -0,0 +1,46 @@
+"""
+    python -m benchmarks.bench_tag_nodes
+
+    counts of the whole tag tree of 100k files: grouping file_labels
+    and summing up the paths in python against reading tag_nodes
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from labeled_files.core.tree import Node
+
+from .workspace import generate
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        conn = generate(Path(tmp))
+        print(f"generate: {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+        with conn.connect() as c:
+            start = time.perf_counter()
+            labels = c.execute(
+                "SELECT label, COUNT(*) FROM file_labels GROUP BY label").fetchall()
+            summed = {}
+            for label, count in labels:
+                ind = label.find('/')
+                while ind > 0:
+                    summed[label[:ind]] = summed.get(label[:ind], 0) + count
+                    ind = label.find('/', ind + 1)
+                summed[label] = summed.get(label, 0) + count
+            print(f"group by: {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+            start = time.perf_counter()
+            nodes = conn.fetch_tag_nodes()
+            print(f"nodes:    {(time.perf_counter() - start) * 1000:8.1f} ms")
+            exact = {path: count for path, count, _ in nodes}
+            assert exact.keys() == summed.keys()
+            print("over counted nodes:",
+                  sum(summed[path] != exact[path] for path in exact))
+
+            root = Node()
+            for path, count, vtime in nodes:
+                root.build_node(path, count, vtime)
+        conn.close_db()
@@ -0,0 +1,39 @@
+"""
+    python -m benchmarks.bench_tag_times
+
+    visit times of 20k tags on 6 PCs: one query per tag and PC
+    against one query over the attached visit files
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from labeled_files.sql import VisitView
+
+from .workspace import generate_visits, make_tags
+
+
+if __name__ == "__main__":
+    tags = make_tags(3, 27)
+    with tempfile.TemporaryDirectory() as tmp:
+        conns = generate_visits(Path(tmp), pcs=6, files=1000, tags=tags)
+        print(len(tags), "tags", len(conns), "pcs")
+
+        start = time.perf_counter()
+        old = {}
+        for conn in conns:
+            with conn.connect():
+                for tag in tags:
+                    t = conn.get_tag_time(tag)
+                    old[tag] = max(old.get(tag, t), t)
+        print(f"per tag:  {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+        view = VisitView([conn.path for conn in conns])
+        view.open_db()
+        start = time.perf_counter()
+        new = view.get_tag_times()
+        print(f"attached: {(time.perf_counter() - start) * 1000:8.1f} ms")
+        assert old == new
+        view.close_db()
+        for conn in conns:
+            conn.close_db()
@@ -0,0 +1,84 @@
+"""
+    python -m pytest benchmarks --benchmark-only
+
+    every benchmark runs on a synthetic workspace of each size in
+    LABELED_FILES_BENCH_SIZES, 10000,100000,1000000 by default. the workspaces
+    are generated in a temp folder, or once in LABELED_FILES_BENCH_DIR
+    to be kept between runs. besides the table of pytest-benchmark, the
+    p50 and p99 latency and the throughput of every benchmark is reported
+"""
+import os
+from pathlib import Path
+import statistics
+from typing import Callable, List, Tuple
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from labeled_files.core.config import Config  # noqa: E402
+
+from .workspace import generate_workspace  # noqa: E402
+
+SIZES = [int(size) for size in os.environ.get(
+    "LABELED_FILES_BENCH_SIZES", "10000,100000,1000000").split(",")]
+PC = "pc0"  # the visit file of this PC among the generated ones
+
+# name, p50 ms, p99 ms, items per second
+results: List[Tuple[str, float, float, float]] = []
+
+
+@pytest.fixture(scope="session", params=SIZES, ids=lambda size: f"{size}files")
+def size(request) -> int:
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def workspace(size, tmp_path_factory) -> Path:
+    folder = os.environ.get("LABELED_FILES_BENCH_DIR")
+    if folder:
+        root = Path(folder) / f"files{size}"
+        done = root / "generated"
+        if not done.exists():
+            generate_workspace(root, size)
+            done.touch()
+        return root
+    root = tmp_path_factory.mktemp(f"files{size}")
+    generate_workspace(root, size)
+    return root
+
+
+@pytest.fixture(scope="session")
+def config() -> Config:
+    return Config(pc_name_override=PC, startup_snapshot=False)
+
+
+@pytest.fixture
+def measure(benchmark, request) -> Callable:
+    """
+        measure(func, items=1), items are what func handles in one call
+    """
+    def measure(func: Callable, items: int = 1):
+        ret = benchmark(func)
+        if benchmark.stats is None:  # --benchmark-disable
+            return ret
+        data = sorted(benchmark.stats.stats.data)
+        p99 = data[min(len(data) - 1, int(len(data) * 0.99))]
+        p50 = statistics.median(data)
+        benchmark.extra_info.update(
+            p50_ms=p50 * 1000, p99_ms=p99 * 1000, items_per_s=items / p50)
+        results.append((request.node.name, p50 * 1000, p99 * 1000, items / p50))
+        return ret
+    return measure
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not results:
+        return
+    write = terminalreporter.write_line
+    terminalreporter.section("latency and throughput")
+    width = max(len(name) for name, *_ in results)
+    write(f"{'name':<{width}}  {'p50 ms':>10}  {'p99 ms':>10}  {'items/s':>12}")
+    for name, p50, p99, throughput in results:
+        write(f"{name:<{width}}  {p50:10.3f}  {p99:10.3f}  {throughput:12.1f}")
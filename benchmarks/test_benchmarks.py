@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta
+from itertools import count
+import sys
+import time
+
+import pytest
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from labeled_files.core.search import tree_tags_all
+from labeled_files.core.tree import build_tree
+from labeled_files.core.workspace import Workspace
+from labeled_files.utils import get_shown_timedelta
+
+DROPPED = 1000  # files of a drop
+
+
+@pytest.fixture(scope="session")
+def app() -> QtWidgets.QApplication:
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture(scope="session")
+def connections(workspace, config):
+    workspace = Workspace(workspace, config)
+    view = workspace.visit_view()
+    yield workspace.conn, view
+    view.close_db()
+    workspace.close()
+
+
+def releases_true() -> bool:
+    """
+        PySide6 6.12.0 drops a reference of True on every signal emit,
+        the interpreter aborts once the window has emitted enough of them
+    """
+    class Emitter(QtCore.QObject):
+        emitted = QtCore.Signal()
+    emitter = Emitter()
+    before = sys.getrefcount(True)
+    emitter.emitted.emit()
+    return sys.getrefcount(True) < before
+
+
+@pytest.fixture(scope="session")
+def window(app, workspace, config):
+    """
+        the window of the workspace, headless, after the first search
+    """
+    if releases_true():
+        pytest.skip("this PySide6 leaks references of True on signal emits")
+    from labeled_files.mainUiPy import Window
+    from labeled_files.path_types import init_handlers
+    from labeled_files.setting import setting
+    setting.config = config
+    init_handlers()
+    win = Window()
+    loop = QtCore.QEventLoop()
+    # after search_show, which is connected before
+    win.search_worker.finished.connect(loop.quit)
+    win.search_worker.failed.connect(loop.quit)
+    win.search_loop = loop
+    win.workspace_change(str(workspace))
+    loop.exec()
+    yield win
+    win.close()
+    win.deleteLater()
+    # deleteLater is only carried out by a running event loop otherwise
+    app.sendPostedEvents(None, QtCore.QEvent.Type.DeferredDelete)
+    app.processEvents()
+
+
+def search(win):
+    win.search()
+    win.search_loop.exec()
+
+
+def test_fetch_files(measure, connections, size):
+    conn, _ = connections
+    starts = count(0, 997)
+    sql = "SELECT * FROM files WHERE id > ? ORDER BY id LIMIT 200"
+
+    def fetch():
+        with conn.connect():
+            return conn.fetch_files(sql, (next(starts) % size,))
+    measure(fetch, 200)
+
+
+@pytest.mark.parametrize("keyword,tags", [
+    ("", []), ("", ["t0"]), ("", ["t1/t2", "t3"]),
+    ("file 4242", []), ("4242", ["t0"])],
+    ids=["recent", "tag", "tags", "keyword", "keyword_tag"])
+def test_window_search(measure, window, keyword, tags):
+    window.searchLineEdit.setText(keyword)
+    window.tagListWidget.clear()
+    window.tagListWidget.addItems(tags)
+    measure(lambda: search(window))
+    window.searchLineEdit.clear()
+    window.tagListWidget.clear()
+
+
+def test_tag_tree_show_all(measure, window, connections):
+    """
+        the tag tree of the default view, counts and times of all tags
+    """
+    conn, view = connections
+    measure(lambda: window.tag_tree_show_tags(tree_tags_all(conn, view)))
+
+
+def test_build_tree(measure, connections):
+    conn, view = connections
+    tags = tree_tags_all(conn, view)
+    measure(lambda: build_tree(tags), len(tags))
+
+
+def test_get_shown_timedelta(measure):
+    base = datetime(2024, 1, 1)
+    times = [base - timedelta(minutes=7 ** (i % 9)) for i in range(1000)]
+    measure(lambda: [get_shown_timedelta(t, base) for t in times], len(times))
+
+
+def test_drop(measure, app, window, tmp_path_factory):
+    """
+        prefetch and insert of dropped links, removed again afterwards
+        as the workspace may be kept for the next run
+    """
+    from labeled_files.setting import setting
+    src = tmp_path_factory.mktemp("dropped")
+    for i in range(DROPPED):
+        (src / f"d{i}.{['txt', 'pdf', 'exe', ''][i % 4]}").write_text("x")
+    mime = QtCore.QMimeData()
+    mime.setText("\n".join(f"file:///{p}" for p in sorted(src.iterdir())))
+
+    def drop():
+        event = QtGui.QDropEvent(
+            QtCore.QPointF(10, 400), QtCore.Qt.DropAction.LinkAction, mime,
+            QtCore.Qt.MouseButton.LeftButton, QtCore.Qt.KeyboardModifier.NoModifier)
+        window.file_table_DropEvent(event)
+        while window.ingest_jobs:
+            app.processEvents()
+            time.sleep(0.001)
+    with setting.conn.connect() as c:
+        last_id = c.execute("SELECT MAX(id) FROM files").fetchone()[0]
+    measure(drop, DROPPED)
+    with setting.conn.connect() as c:
+        ids = [id for id, in c.execute("SELECT id FROM files WHERE id > ?", (last_id,))]
+    setting.conn.delete_file(ids)
@@ -0,0 +1,130 @@
+"""
+    generate a synthetic workspace for benchmarks
+
+        python -m benchmarks.workspace ROOT --files 100000 --depth 3 --fanout 8 --labels 5 --pcs 6
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from labeled_files.core.config import SQLITE_FILES_NAME
+from labeled_files.sql import FileConnection, VisitConnection
+from labeled_files.sql.files import create_fts, create_tag_nodes, get_prefixes
+
+
+def make_tags(depth: int, fanout: int) -> List[str]:
+    """
+        all tags of a tree with `depth` levels and `fanout` children per node
+    """
+    tags = []
+    level = [""]
+    for _ in range(depth):
+        level = [f"{parent}{'/' if parent else ''}t{i}"
+                 for parent in level for i in range(fanout)]
+        tags.extend(level)
+    return tags
+
+
+def generate(
+        root: Path,
+        files: int = 100_000,
+        labels_per_file: int = 5,
+        depth: int = 3,
+        fanout: int = 8,
+        seed: int = 0) -> FileConnection:
+    random.seed(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    conn = FileConnection(root / SQLITE_FILES_NAME)
+    tags = make_tags(depth, fanout)
+    start = datetime(2020, 1, 1)
+    with conn.connect() as c:
+        # indexed in one pass after the bulk load, not row by row by the triggers
+        c.executescript("DROP TRIGGER IF EXISTS files_fts_insert; DROP TRIGGER tag_nodes_insert;")
+        c.executemany(
+            "INSERT INTO files(id, name, type, path, ctime, vtime, icon, description) VALUES(?,?,?,?,?,?,?,?)",
+            ((i, f"file {i}.txt", "file", f"file {i}.txt",
+              str(start + timedelta(minutes=i)),
+              str(start + timedelta(minutes=random.randrange(files * 2))),
+              "", "") for i in range(1, files + 1)))
+        file_tags = [random.sample(tags, labels_per_file)
+                     for _ in range(files)]
+        c.executemany(
+            "INSERT INTO file_labels(file_id, label) VALUES(?,?)",
+            ((i, tag) for i, ts in enumerate(file_tags, 1) for tag in ts))
+        c.executemany(
+            "INSERT INTO label_prefixes(file_id, prefix) VALUES(?,?)",
+            ((i, prefix) for i, ts in enumerate(file_tags, 1)
+             for prefix in get_prefixes(ts)))
+        if create_fts(c):
+            c.execute(
+                "INSERT INTO files_fts(rowid, name, description, path) SELECT id, name, description, path FROM files")
+        c.execute(
+            "INSERT INTO tag_nodes(path, distinct_file_count, last_vtime) "
+            "SELECT prefix, COUNT(*), MAX(files.vtime) "
+            "FROM label_prefixes JOIN files ON files.id = label_prefixes.file_id GROUP BY prefix")
+        create_tag_nodes(c)
+    return conn
+
+
+def generate_visits(
+        root: Path,
+        pcs: int = 6,
+        files: int = 100_000,
+        tags: List[str] = (),
+        visits: float = 0.3,
+        seed: int = 0) -> List[VisitConnection]:
+    """
+        VISIT_TIME_pc*.sqlite3 where every pc visited a `visits` share of
+        the files and all `tags`
+    """
+    random.seed(seed)
+    start = datetime(2020, 1, 1)
+    conns = []
+    for pc in range(pcs):
+        conn = VisitConnection(root / f"VISIT_TIME_pc{pc}.sqlite3")
+        with conn.connect() as c:
+            c.executemany(
+                "INSERT INTO file_visit(file_id, time) VALUES(?,?)",
+                ((i, str(start + timedelta(minutes=random.randrange(files * 4))))
+                 for i in random.sample(range(1, files + 1), int(files * visits))))
+            c.executemany(
+                "INSERT INTO tag_visit(tag, time) VALUES(?,?)",
+                ((tag, str(start + timedelta(minutes=random.randrange(files * 4))))
+                 for tag in tags))
+        conns.append(conn)
+    return conns
+
+
+def generate_workspace(
+        root: Path,
+        files: int = 100_000,
+        labels_per_file: int = 5,
+        depth: int = 3,
+        fanout: int = 8,
+        pcs: int = 6,
+        visits: float = 0.3,
+        seed: int = 0):
+    """
+        LABELED_FILES.sqlite3 and VISIT_TIME_pc0.sqlite3 ... of `pcs` PCs
+    """
+    conn = generate(root, files, labels_per_file, depth, fanout, seed)
+    conn.close_db()
+    for visit in generate_visits(root, pcs, files, make_tags(depth, fanout), visits, seed):
+        visit.close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.workspace")
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--labels", type=int, default=5, help="labels per file")
+    parser.add_argument("--depth", type=int, default=3, help="levels of the tag tree")
+    parser.add_argument("--fanout", type=int, default=8, help="children of a tag")
+    parser.add_argument("--pcs", type=int, default=6, help="count of visit files")
+    parser.add_argument("--visits", type=float, default=0.3,
+                        help="share of the files visited on every PC")
+    args = parser.parse_args()
+    generate_workspace(args.root, args.files, args.labels, args.depth,
+                       args.fanout, args.pcs, args.visits)
@@ -0,0 +1,139 @@
+"""
+    command line of labeled files, runs without Qt
+
+        python -m labeled_files search --tag A/B --kw foo --json
+        python -m labeled_files add PATH_OR_URL... --tag A/B
+        python -m labeled_files tag ID... --add A/C --remove A/B
+        python -m labeled_files vacuum
+"""
+import argparse
+from contextlib import redirect_stdout
+import json
+import os
+from pathlib import Path
+import sys
+from typing import List
+
+from .core.config import Config
+from .core.file import File
+
+WORKSPACE_ENV = "LABELED_FILES_WORKSPACE"
+
+
+def file_to_dict(f: File) -> dict:
+    return {
+        "id": f.id,
+        "name": f.name,
+        "type": f.type,
+        "path": f.path,
+        "tags": f.tags,
+        "ctime": f.ctime.isoformat(),
+        "vtime": f.vtime.isoformat(),
+        "description": f.description}
+
+
+def print_files(files: List[File], as_json: bool):
+    if as_json:
+        json.dump([file_to_dict(f) for f in files], sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+    else:
+        for f in files:
+            print(f.id, f.name, f.path, ",".join(f.tags), sep="\t")
+
+
+def search(workspace, args) -> List[File]:
+    from .core.search import search_once
+    view = workspace.visit_view()
+    try:
+        return search_once(workspace.conn, view, args.kw, args.tag, args.limit)
+    finally:
+        view.close_db()
+
+
+def add(workspace, args) -> List[File]:
+    from .core.ingest import add_files
+    return add_files(workspace.conn, args.items, args.tag)
+
+
+def tag(workspace, args) -> List[File]:
+    conn = workspace.conn
+    select = "SELECT * FROM files WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id"
+    with conn.connect():
+        files = conn.fetch_files(select, (json.dumps(args.ids),))
+        missing = set(args.ids) - {f.id for f in files}
+        if missing:
+            raise SystemExit(
+                f"no file of id {', '.join(map(str, sorted(missing)))}")
+        for f in files:
+            new = [t for t in f.tags if t not in args.remove]
+            new.extend(t for t in args.add if t not in new)
+            conn.update_file_tags(f.id, new)
+        return conn.fetch_files(select, (json.dumps(args.ids),))
+
+
+def vacuum(workspace, args) -> List[File]:
+    workspace.conn.vacuum()
+    return []
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="labeled-files")
+    parser.add_argument(
+        "--workspace", help=f"workspace folder, or ${WORKSPACE_ENV}, or the default one in the config")
+    parser.add_argument("--config", default="config.json", type=Path)
+    parser.add_argument("--json", action="store_true", help="print files as json")
+    # also after the command, without overriding the one before it
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--json", action="store_true", default=argparse.SUPPRESS, help="print files as json")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser(
+        "search", help="files under all tags containing the keyword", parents=[common])
+    p.add_argument("--kw", default="", help="keyword in name, description or path")
+    p.add_argument("--tag", action="append", default=[])
+    p.add_argument("--limit", type=int, default=50)
+    p.set_defaults(run=search)
+
+    p = commands.add_parser(
+        "add", help="link files, folders or urls", parents=[common])
+    p.add_argument("items", nargs="+", metavar="PATH_OR_URL")
+    p.add_argument("--tag", action="append", default=[])
+    p.set_defaults(run=add)
+
+    p = commands.add_parser(
+        "tag", help="add or remove tags of files", parents=[common])
+    p.add_argument("ids", nargs="+", type=int, metavar="ID")
+    p.add_argument("--add", action="append", default=[])
+    p.add_argument("--remove", action="append", default=[])
+    p.set_defaults(run=tag)
+
+    p = commands.add_parser(
+        "vacuum", help="give the space of deleted rows back", parents=[common])
+    p.set_defaults(run=vacuum)
+    return parser
+
+
+def open_workspace(args):
+    from .core.workspace import Workspace
+    config = Config()
+    if args.config.exists():
+        config = Config.from_json(args.config.read_text(encoding="utf-8"))
+    root = args.workspace or os.environ.get(WORKSPACE_ENV) \
+        or config.workspaces.get(config.default)
+    if not root or not Path(root).is_dir():
+        raise SystemExit(f"workspace not found: {root or 'none is given'}")
+    return Workspace(Path(root).absolute(), config)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = get_parser().parse_args(argv)
+    # messages of the connections would break the output
+    with redirect_stdout(sys.stderr):
+        workspace = open_workspace(args)
+        try:
+            files = args.run(workspace, args)
+        finally:
+            workspace.close()
+    print_files(files, args.json)
+    return 0
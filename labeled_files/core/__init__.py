@@ -0,0 +1,8 @@
+"""
+    labeled files without Qt. the modules using the databases,
+    core.search, core.workspace and core.ingest, are imported by name
+    since the sql package itself depends on core.file
+"""
+from .config import SQLITE_FILES_NAME, VERSION, Config
+from .file import File, icon_hash
+from .tree import TagItem, TreeTag, build_tree
@@ -0,0 +1,59 @@
+from functools import cached_property
+import json
+import pathlib
+import platform
+from typing import Dict, List, Union
+
+import dataclasses
+
+SQLITE_FILES_NAME = "LABELED_FILES.sqlite3"
+VERSION = "0.6.4"
+
+
+@dataclasses.dataclass
+class Config:
+    default: str = ""
+    workspaces: Dict[str, str] = dataclasses.field(default_factory=dict)
+    hide_search_tag_in_result: bool = False
+    file_name_regex: bool = False
+    path_mapping: Dict[str, str] = dataclasses.field(default_factory=dict)
+    pc_name_override: str = ""
+    sqlite_persistent: bool = True
+    startup_snapshot: bool = True
+    trace: bool = False
+    # WAL keeps -wal and -shm files beside the database, unsafe on network
+    # drives and in synced folders, where the workspace uses journal_mode
+    # DELETE instead, see workspace_pragmas
+    sqlite_pragmas: Dict[str, Union[str, int]] = dataclasses.field(
+        default_factory=lambda: {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": 256 * 1024 * 1024,
+            "cache_size": -64 * 1024,
+            "temp_store": "MEMORY"})
+    icon_cache_mb: int = 64
+    url_cache_days: float = 7
+    url_cache_mb: int = 16
+    copy_strategies: List[str] = dataclasses.field(
+        default_factory=lambda: ["reflink", "hardlink", "copy"])
+    hardlink_suffixes: List[str] = dataclasses.field(
+        default_factory=lambda: [
+            ".mp4", ".mkv", ".avi", ".mov", ".mp3", ".flac",
+            ".jpg", ".jpeg", ".png", ".gif", ".iso"])
+
+    @cached_property
+    def path_convert(self):
+        return {pathlib.Path(k): pathlib.Path(v) for k, v in self.path_mapping.items()}
+
+    @classmethod
+    def from_json(cls, s: str):
+        d: dict = json.loads(s)
+        d = {k: v for k, v in d.items() if k in cls.__dataclass_fields__}
+        return cls(**d)
+
+    def get_sqlite_visit_name(self):
+        if self.pc_name_override:
+            name = self.pc_name_override
+        else:
+            name = platform.node()
+        return f"VISIT_TIME_{name}.sqlite3"
@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+from datetime import datetime
+import hashlib
+from typing import List
+
+
+@dataclass
+class _File:
+    id: int
+    name: str
+    type: str
+    path: str
+    tags: List[str]
+    ctime: datetime
+    vtime: datetime
+    icon: str | bytes  # hash in the icons table, or png bytes not stored yet
+    description: str
+    transfer: str = ""  # how it is brought into the workspace, see transfer.py
+
+
+class File(_File):
+    handler: 'HandlerDescriptor'  # class attribute, set by path_types.init_handlers
+
+
+def icon_hash(png: bytes) -> str:
+    """
+        key of an icon in the icons table
+    """
+    return hashlib.sha1(png).hexdigest()
@@ -0,0 +1,46 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List
+
+from ..sql import FileConnection
+from .file import File
+
+
+def get_placeholder_name(url: str) -> str:
+    return url.removeprefix("http://").removeprefix("https://")
+
+
+def file_from_path(path: Path) -> File:
+    """
+        a record linking to the file or folder where it is
+    """
+    stat = path.stat()
+    typ = "folder" if path.is_dir() else "file"
+    return File(None, path.name, typ, str(path), [], datetime.fromtimestamp(
+        stat.st_ctime), datetime.now(), "", "")
+
+
+def file_from_url(url: str) -> File:
+    """
+        the url as its name until the title is fetched
+    """
+    url = url.removesuffix('/')
+    return File(None, get_placeholder_name(url) or url, "url", url, [],
+                datetime.now(), datetime.now(), b"", "")
+
+
+def file_from_text(text: str) -> File:
+    """
+        an http or https url, otherwise a path
+    """
+    if text.startswith(("http://", "https://")):
+        return file_from_url(text)
+    return file_from_path(Path(text).absolute())
+
+
+def add_files(conn: FileConnection, texts: Iterable[str], tags: List[str]) -> List[File]:
+    files = [file_from_text(text) for text in texts]
+    for f in files:
+        f.tags = list(tags)
+    conn.insert_files(files)
+    return files
@@ -0,0 +1,68 @@
+from typing import Iterator, List, Tuple
+
+from ..sql import FileConnection, VisitView
+from .file import File
+from .trace import span
+from .tree import TreeTag
+
+
+def tree_tags_all(conn: FileConnection, visit_view: VisitView) -> List[TreeTag]:
+    tags = [TreeTag(*node) for node in conn.fetch_tag_nodes()]
+    times = visit_view.get_tag_times()
+    for tag in tags:
+        tag.time = max(tag.time, times.get(tag.tag, tag.time))
+    return tags
+
+
+def first_page(conn: FileConnection, visit_view: VisitView, keyword: str, tags: List[str], page_size: int) -> Tuple[List[File], Iterator[List[File]]]:
+    """
+        first page of files and the following pages,
+        as soon as the first page is read
+    """
+    with conn.connect(), span("search.files", keyword=bool(keyword)) as s:
+        # ranked, or ordered by visit time, later pages are loaded by scrolling
+        if keyword:
+            pages = conn.iter_search_files(keyword, tags, visit_view, page_size)
+        else:
+            pages = conn.iter_files(tags, visit_view, page_size)
+        files = next(pages, [])
+        s.set(rows=len(files))
+    return files, pages
+
+
+def search_tree_tags(conn: FileConnection, visit_view: VisitView, keyword: str, tags: List[str]) -> List[TreeTag]:
+    """
+        the tags to show in the tag tree, after first_page.
+        every file under the tags is counted, so it takes longer
+    """
+    with conn.connect(), span("search.tags") as s:
+        if not keyword and not tags:
+            tree_tags = tree_tags_all(conn, visit_view)
+        else:
+            tree_tags = [TreeTag(*tag) for tag in conn.count_tags(tags, keyword)]
+        s.set(rows=len(tree_tags))
+    return tree_tags
+
+
+def run_search(conn: FileConnection, visit_view: VisitView, keyword: str, tags: List[str], page_size: int) -> Tuple[List[File], Iterator[List[File]], List[TreeTag]]:
+    """
+        first_page and search_tree_tags at once
+    """
+    with conn.connect():
+        files, pages = first_page(conn, visit_view, keyword, tags, page_size)
+        return files, pages, search_tree_tags(conn, visit_view, keyword, tags)
+
+
+def search_once(conn: FileConnection, visit_view: VisitView, keyword: str, tags: List[str], limit: int) -> List[File]:
+    """
+        the first `limit` files of run_search for a single query,
+        without the following pages and the tags of the tag tree
+    """
+    with conn.connect():
+        if not keyword:
+            return conn.latest_files(tags, visit_view, limit)
+        files = conn.search_files(keyword, tags, limit)
+    times = visit_view.get_file_times([f.id for f in files])
+    for f in files:
+        f.vtime = max(f.vtime, times.get(f.id, f.vtime))
+    return files
@@ -0,0 +1,85 @@
+"""
+    the default view of a workspace, the latest files and the whole tag tree,
+    saved when the window closes or another workspace is opened, and shown
+    at the next start before the first search finishes
+"""
+from dataclasses import dataclass
+from datetime import datetime
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import List
+
+from .config import SQLITE_FILES_NAME, VERSION
+from .file import File
+from .tree import TreeTag
+
+SNAPSHOT_DIR = "snapshots"  # beside config.json, the workspace may be synced
+
+
+@dataclass
+class Snapshot:
+    key: list
+    files: List[File]  # the first page
+    tree_tags: List[TreeTag]
+
+
+def snapshot_path(root: Path, folder: Path = Path(SNAPSHOT_DIR)) -> Path:
+    name = hashlib.sha1(str(root.absolute()).encode()).hexdigest()[:16]
+    return folder / f"{name}.json"
+
+
+def workspace_key(root: Path) -> list:
+    """
+        size and mtime of the databases of the workspace and of their
+        write-ahead logs, taken when no connection is open. a snapshot of
+        another key is stale, sqlite keeps no data version across connections
+    """
+    key = [VERSION]
+    paths = [root / SQLITE_FILES_NAME, *sorted(root.glob("VISIT_TIME*.sqlite3"))]
+    for path in paths:
+        for p in (path, path.with_name(path.name + "-wal")):
+            try:
+                stat = p.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_size:
+                key.append([p.name, stat.st_size, stat.st_mtime_ns])
+    return key
+
+
+def save_snapshot(path: Path, snapshot: Snapshot):
+    data = {
+        "key": snapshot.key,
+        "files": [
+            [f.id, f.name, f.type, f.path, f.tags, f.ctime.isoformat(),
+             f.vtime.isoformat(), f.icon if isinstance(f.icon, str) else "",
+             f.description, f.transfer]
+            for f in snapshot.files],
+        "tags": [[t.tag, t.count, t.time.isoformat()] for t in snapshot.tree_tags]}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")),
+                   encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: Path, key: list) -> Snapshot | None:
+    """
+        None if there is no snapshot, or it is of another key
+    """
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("key") != key:
+        return None
+    fromiso = datetime.fromisoformat
+    files = [File(id, name, typ, p, tags, fromiso(ctime), fromiso(vtime),
+                  icon, description, transfer)
+             for id, name, typ, p, tags, ctime, vtime, icon, description, transfer
+             in data["files"]]
+    tree_tags = [TreeTag(tag, count, fromiso(time))
+                 for tag, count, time in data["tags"]]
+    return Snapshot(key, files, tree_tags)
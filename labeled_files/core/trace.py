@@ -0,0 +1,153 @@
+"""
+    timing spans of the stages of a search, one json line each
+
+        with span("search.files") as s:
+            files = ...
+            s.set(rows=len(files))
+
+    a line holds the name, the duration in ms, the end time, the thread,
+    the enclosing span and the fields given by the span and by the
+    context of its thread. when tracing is disabled a span is a shared
+    object doing nothing
+"""
+from collections import deque
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Deque, List, TextIO
+
+TRACE_FILE = "trace.jsonl"
+
+
+class NullSpan:
+    def set(self, **fields):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    __slots__ = ("name", "fields", "start", "parent")
+
+    def __init__(self, name: str, fields: dict):
+        self.name = name
+        self.fields = fields
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        stack = tracer.stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *args):
+        ms = (time.perf_counter() - self.start) * 1000
+        tracer.stack().pop()
+        if self.parent is not None:
+            self.fields["parent"] = self.parent
+        if exc_type is not None:
+            self.fields["error"] = exc_type.__name__
+        tracer.record(self.name, ms, **self.fields)
+
+
+class Context:
+    """
+        fields added to every span of the thread, nested contexts are merged
+    """
+    __slots__ = ("fields", "outer")
+
+    def __init__(self, fields: dict):
+        self.fields = fields
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        local = tracer.local
+        self.outer = getattr(local, "context", {})
+        local.context = self.outer | self.fields
+        return self
+
+    def __exit__(self, *args):
+        tracer.local.context = self.outer
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.out: TextIO | None = None
+        self.recent: Deque[dict] = deque(maxlen=256)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def enable(self, path: Path | None = Path(TRACE_FILE)):
+        """
+            spans are appended to `path`, or only kept in recent if None
+        """
+        self.disable()
+        if path is not None:
+            self.out = path.open("a", encoding="utf-8", buffering=1)
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        with self.lock:
+            if self.out is not None:
+                self.out.close()
+                self.out = None
+
+    def stack(self) -> List[str]:
+        try:
+            return self.local.stack
+        except AttributeError:
+            self.local.stack = []
+            return self.local.stack
+
+    def record(self, name: str, ms: float, **fields):
+        """
+            a span timed by the caller, e.g. across threads
+        """
+        if not self.enabled:
+            return
+        line = {"name": name, "ms": round(ms, 3), "time": round(time.time(), 3),
+                "thread": threading.current_thread().name}
+        line.update(getattr(self.local, "context", {}))
+        line.update(fields)
+        with self.lock:
+            self.recent.append(line)
+            if self.out is not None:
+                self.out.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+
+    def spans(self, **fields) -> List[dict]:
+        """
+            the recent spans having all the given fields
+        """
+        with self.lock:
+            spans = list(self.recent)
+        return [s for s in spans if all(s.get(k) == v for k, v in fields.items())]
+
+
+tracer = Tracer()
+
+
+def span(name: str, **fields) -> Span | NullSpan:
+    if not tracer.enabled:
+        return NULL_SPAN
+    return Span(name, fields)
+
+
+def context(**fields) -> Context | NullSpan:
+    if not tracer.enabled:
+        return NULL_SPAN
+    return Context(fields)
@@ -0,0 +1,73 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import DefaultDict, List
+
+
+@dataclass
+class TreeTag:
+    tag: str
+    count: int = 0
+    time: datetime = datetime(1970, 1, 1)
+
+
+@dataclass
+class Node:
+    count: int = 0
+    vtime: datetime = datetime(1970, 1, 1)
+    sub_nodes: DefaultDict[str, 'Node'] = field(
+        default_factory=lambda: defaultdict(Node))
+
+    def build_node(self, label: str, count: int, vtime: datetime):
+        """
+            count is the count of the node of label itself,
+            the time is passed to all ancestors
+        """
+        self.vtime = max(self.vtime, vtime)
+        if not label:
+            self.count = count
+            return
+        ind = label.find('/')
+        part = label[:ind] if ind > 0 else label
+        node = self.sub_nodes[part]
+        node.build_node(label[ind + 1:] if ind > 0 else "", count, vtime)
+
+    def build_items(self, parent: 'TagItem'):
+        items = sorted(self.sub_nodes.items(),
+                       key=lambda item: (item[1].vtime, item[1].count), reverse=True)
+        for key, node in items:
+            # a chain of nodes with the same count is shown as one item
+            path = [key]
+            while len(node.sub_nodes) == 1:
+                key, sub_node = next(iter(node.sub_nodes.items()))
+                if sub_node.count != node.count:
+                    break
+                path.append(key)
+                node = sub_node
+            text = '/'.join(path)
+            item = TagItem(text, f"{parent.tag}/{text}" if parent.tag else text,
+                           node.count, parent, len(parent.children))
+            parent.children.append(item)
+            node.build_items(item)
+
+
+@dataclass(eq=False)
+class TagItem:
+    text: str
+    tag: str  # the full tag
+    count: int
+    parent: 'TagItem | None'
+    row: int
+    children: List['TagItem'] = field(default_factory=list)
+
+
+def build_tree(tags: List[TreeTag]) -> TagItem:
+    """
+        the root item of the hierarchy of every tag and tag prefix
+    """
+    node = Node()
+    for tag in tags:
+        node.build_node(tag.tag, tag.count, tag.time)
+    root = TagItem("", "", 0, None, 0)
+    node.build_items(root)
+    return root
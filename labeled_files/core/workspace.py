@@ -0,0 +1,82 @@
+import os
+from pathlib import Path
+import sys
+from typing import Dict, List
+
+from ..sql import FileConnection, VisitConnection, VisitView
+from .config import SQLITE_FILES_NAME, Config
+
+# folders of sync clients, which may copy a database without its -wal file
+SYNCED_FOLDERS = ("onedrive", "dropbox", "google drive", "icloud", "坚果云", "nutstore")
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "fuse.sshfs", "9p", "afs"}
+
+
+def is_shared_folder(root: Path) -> bool:
+    """
+        on a network drive or in a synced folder, where the -wal and -shm
+        files of sqlite are unsafe
+    """
+    root = root.absolute()
+    if any(part.lower().startswith(SYNCED_FOLDERS) for part in root.parts):
+        return True
+    if sys.platform == "win32":
+        import ctypes
+        if root.drive.startswith("\\\\"):
+            return True
+        DRIVE_REMOTE = 4
+        return ctypes.windll.kernel32.GetDriveTypeW(root.anchor) == DRIVE_REMOTE
+    try:
+        with open("/proc/mounts", encoding="utf-8") as mounts:
+            points = [line.split()[1:3] for line in mounts]
+    except OSError:
+        return False
+    # the filesystem of the longest mount point containing the root
+    fs = ""
+    length = -1
+    for point, fs_type in points:
+        point = point.replace("\\040", " ")
+        if root.is_relative_to(point) and len(point) > length:
+            fs, length = fs_type, len(point)
+    return fs in NETWORK_FILESYSTEMS
+
+
+def workspace_pragmas(root: Path, pragmas: Dict[str, str | int]) -> Dict[str, str | int]:
+    """
+        the configured pragmas, with the rollback journal instead of WAL
+        in a shared folder
+    """
+    if str(pragmas.get("journal_mode", "")).upper() == "WAL" and is_shared_folder(root):
+        return {**pragmas, "journal_mode": "DELETE"}
+    return pragmas
+
+
+class Workspace:
+    """
+        connections of a workspace folder: the files database,
+        the visit file of this PC and the visit files of every PC
+    """
+
+    def __init__(self, root: Path, config: Config) -> None:
+        self.root = root
+        persistent = config.sqlite_persistent
+        pragmas = workspace_pragmas(root, config.sqlite_pragmas)
+        # visit files of other PCs are only read, keep their journal mode
+        read_pragmas = {k: v for k, v in pragmas.items()
+                        if k != "journal_mode"}
+        self.conn = FileConnection(
+            root / SQLITE_FILES_NAME, persistent, pragmas)
+        w_name = config.get_sqlite_visit_name()
+        self.visit_conns_r: List[VisitConnection] = [
+            VisitConnection(vpath, persistent, read_pragmas)
+            for vpath in root.glob("VISIT_TIME*.sqlite3")
+            if vpath.name != w_name]
+        self.visit_conn_w = VisitConnection(root / w_name, persistent, pragmas)
+        self.visit_conns_r.insert(0, self.visit_conn_w)
+
+    def visit_view(self) -> VisitView:
+        return VisitView([conn.path for conn in self.visit_conns_r])
+
+    def close(self):
+        self.conn.close_db()
+        for conn in self.visit_conns_r:
+            conn.close_db()
@@ -0,0 +1,157 @@
+import re
+from typing import Any, Dict, List, Tuple
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, Signal
+
+from .path_types import File
+from .setting import setting
+from .utils import get_shown_timedelta
+
+
+class FileTableModel(QAbstractTableModel):
+    """
+        rows are loaded in batches by fetchMore as the view scrolls.
+        when all files are shown and `more` is set, more_requested is emitted
+        and the next page arrives by append_page.
+        texts and icons are computed the first time a row is shown
+    """
+    headers = ["标签", "种类", "文件名", "上次访问时间", "描述"]
+    batch = 200
+    more_requested = Signal()
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.files: List[File] = []
+        self.more = False
+        self.requested = False
+        self.loaded = 0
+        self._texts: Dict[int, Tuple[str, ...]] = {}
+
+    def set_files(self, files: List[File], more: bool = False):
+        self.beginResetModel()
+        self.files = files
+        self.more = more
+        self.requested = False
+        self.loaded = min(len(files), self.batch)
+        self._texts.clear()
+        self.endResetModel()
+
+    def insert_file(self, row: int, f: File):
+        self.insert_files(row, [f])
+
+    def insert_files(self, row: int, files: List[File]):
+        if not files:
+            return
+        self.beginInsertRows(QModelIndex(), row, row + len(files) - 1)
+        self.files[row:row] = files
+        self.loaded += len(files)
+        self._texts.clear()
+        self.endInsertRows()
+
+    def remove_file(self, row: int):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.files.pop(row)
+        self.loaded -= 1
+        self._texts.clear()
+        self.endRemoveRows()
+
+    def update_file(self, row: int, f: File):
+        self.files[row] = f
+        self._texts.pop(row, None)
+        self.dataChanged.emit(self.index(row, 0),
+                              self.index(row, len(self.headers) - 1))
+
+    def row_of(self, file_id: int) -> int:
+        for row, f in enumerate(self.files):
+            if f.id == file_id:
+                return row
+        return -1
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return self.loaded
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        if parent.isValid():
+            return False
+        return self.loaded < len(self.files) or (self.more and not self.requested)
+
+    def fetchMore(self, parent: QModelIndex):
+        if self.loaded == len(self.files) and self.more:
+            if not self.requested:
+                self.requested = True
+                self.more_requested.emit()
+            return
+        count = min(len(self.files) - self.loaded, self.batch)
+        if not count:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded,
+                             self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def append_page(self, files: List[File]):
+        self.requested = False
+        if len(files) < self.batch:
+            self.more = False
+        self.files.extend(files)
+        self.fetchMore(QModelIndex())
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.headers[section]
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        f = self.files[index.row()]
+        match role:
+            case Qt.ItemDataRole.DisplayRole:
+                return self.get_texts(index.row())[index.column()]
+            case Qt.ItemDataRole.DecorationRole if index.column() == 0:
+                return f.handler.get_icon()
+
+    def get_texts(self, row: int) -> Tuple[str, ...]:
+        if row not in self._texts:
+            self._texts[row] = self.compute_texts(self.files[row])
+        return self._texts[row]
+
+    @staticmethod
+    def compute_texts(f: File) -> Tuple[str, ...]:
+        if setting.config.hide_search_tag_in_result:
+            tags = []
+            for tag in f.tags:
+                for st in setting.searched_tags:
+                    if tag == st:
+                        break
+                    tmp = st + '/'
+                    if tag.startswith(tmp):
+                        result = tag.removeprefix(tmp)
+                        tags.append(result)
+                        break
+                else:
+                    tags.append(tag)
+        else:
+            tags = f.tags
+        text = ' '.join('#' + tag for tag in tags)
+        if setting.config.file_name_regex and f.name.startswith("r|"):
+            actual_name = f.handler.actual_name_get()
+            ret = re.search(f.name.removeprefix('r|'), actual_name)
+            if ret:
+                name = ret.group()
+            else:
+                name = f"MISS FINDING {f.name} in {actual_name}"
+        else:
+            name = f.name
+        return (
+            text,
+            f.type,  # f.handler.get_shown_name()
+            name,
+            get_shown_timedelta(f.vtime) + "前",
+            f.description)
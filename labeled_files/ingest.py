@@ -0,0 +1,68 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+from typing import Callable, List
+
+from PySide6 import QtCore
+
+from .path_types import File, path_handler_types
+
+
+def create_file_from_mime(mime_path: str) -> File | None:
+    for handler in path_handler_types.values():
+        if not handler.mime_acceptable(mime_path):
+            continue
+        f = handler.create_file_from_mime(mime_path)
+        if f is not None:
+            return f
+
+
+class PrefetchJob(QtCore.QObject):
+    """
+        create_file_from_mime of all dropped paths on a thread pool,
+        stat and other slow io run out of the GUI thread.
+        callbacks are called in the thread of this object,
+        done gets the files in the dropped order and the errors
+    """
+    progress_step = 100
+    progressed = QtCore.Signal(int, int)  # prepared, total
+    finished = QtCore.Signal()
+
+    def __init__(self, pool: ThreadPoolExecutor, mime_paths: List[str],
+                 done: Callable[[List[File], List[Exception]], None],
+                 progress: Callable[[int, int], None]) -> None:
+        super().__init__()
+        self.total = len(mime_paths)
+        self.prepared = 0
+        self._lock = threading.Lock()
+        self.progressed.connect(
+            progress, QtCore.Qt.ConnectionType.QueuedConnection)
+        self.finished.connect(
+            self.on_finished, QtCore.Qt.ConnectionType.QueuedConnection)
+        self.done = done
+        # handlers create Qt objects when loaded, not in the pool
+        path_handler_types.load_all()
+        self.futures = [pool.submit(create_file_from_mime, mime_path)
+                        for mime_path in mime_paths]
+        if not self.futures:
+            self.finished.emit()
+        for future in self.futures:
+            future.add_done_callback(self.on_prepared)
+
+    def on_prepared(self, future: Future):
+        with self._lock:
+            self.prepared += 1
+            prepared = self.prepared
+        if prepared == self.total:
+            self.finished.emit()
+        elif prepared % self.progress_step == 0:
+            self.progressed.emit(prepared, self.total)
+
+    def on_finished(self):
+        files = []
+        errors = []
+        for future in self.futures:
+            if future.exception() is not None:
+                errors.append(future.exception())
+            elif future.result() is not None:
+                files.append(future.result())
+        self.done(files, errors)
@@ -20,8 +20,7 @@ from PySide6.QtWidgets import (QAbstractItemView, QApplication, QGroupBox, QHBox
     QHeaderView, QLineEdit, QListView, QListWidget,
     QListWidgetItem, QMainWindow, QMenu, QMenuBar,
     QPushButton, QSizePolicy, QSpacerItem, QStatusBar,
-    QTableWidget, QTableWidgetItem, QTreeWidget, QTreeWidgetItem,
-    QVBoxLayout, QWidget)
+    QTableView, QTreeView, QVBoxLayout, QWidget)
 
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
@@ -61,19 +60,19 @@ class Ui_MainWindow(object):
 
         self.verticalLayout_4.addLayout(self.horizontalLayout_4)
 
-        self.treeWidget = QTreeWidget(self.groupBox)
-        self.treeWidget.setObjectName(u"treeWidget")
+        self.tagTreeView = QTreeView(self.groupBox)
+        self.tagTreeView.setObjectName(u"tagTreeView")
         sizePolicy = QSizePolicy(QSizePolicy.Fixed, QSizePolicy.Expanding)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
-        sizePolicy.setHeightForWidth(self.treeWidget.sizePolicy().hasHeightForWidth())
-        self.treeWidget.setSizePolicy(sizePolicy)
-        self.treeWidget.setMaximumSize(QSize(250, 16777215))
-        self.treeWidget.setExpandsOnDoubleClick(False)
-        self.treeWidget.header().setCascadingSectionResizes(False)
-        self.treeWidget.header().setDefaultSectionSize(180)
+        sizePolicy.setHeightForWidth(self.tagTreeView.sizePolicy().hasHeightForWidth())
+        self.tagTreeView.setSizePolicy(sizePolicy)
+        self.tagTreeView.setMaximumSize(QSize(250, 16777215))
+        self.tagTreeView.setExpandsOnDoubleClick(False)
+        self.tagTreeView.header().setCascadingSectionResizes(False)
+        self.tagTreeView.header().setDefaultSectionSize(180)
 
-        self.verticalLayout_4.addWidget(self.treeWidget)
+        self.verticalLayout_4.addWidget(self.tagTreeView)
 
 
         self.horizontalLayout_2.addWidget(self.groupBox)
@@ -112,27 +111,15 @@ class Ui_MainWindow(object):
 
         self.verticalLayout.addWidget(self.tagListWidget)
 
-        self.filesTableWidget = QTableWidget(self.centralwidget)
-        if (self.filesTableWidget.columnCount() < 5):
-            self.filesTableWidget.setColumnCount(5)
-        __qtablewidgetitem = QTableWidgetItem()
-        self.filesTableWidget.setHorizontalHeaderItem(0, __qtablewidgetitem)
-        __qtablewidgetitem1 = QTableWidgetItem()
-        self.filesTableWidget.setHorizontalHeaderItem(1, __qtablewidgetitem1)
-        __qtablewidgetitem2 = QTableWidgetItem()
-        self.filesTableWidget.setHorizontalHeaderItem(2, __qtablewidgetitem2)
-        __qtablewidgetitem3 = QTableWidgetItem()
-        self.filesTableWidget.setHorizontalHeaderItem(3, __qtablewidgetitem3)
-        __qtablewidgetitem4 = QTableWidgetItem()
-        self.filesTableWidget.setHorizontalHeaderItem(4, __qtablewidgetitem4)
-        self.filesTableWidget.setObjectName(u"filesTableWidget")
-        self.filesTableWidget.setAcceptDrops(True)
-        self.filesTableWidget.setEditTriggers(QAbstractItemView.NoEditTriggers)
-        self.filesTableWidget.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
-        self.filesTableWidget.horizontalHeader().setStretchLastSection(True)
-        self.filesTableWidget.verticalHeader().setVisible(False)
-
-        self.verticalLayout.addWidget(self.filesTableWidget)
+        self.filesTableView = QTableView(self.centralwidget)
+        self.filesTableView.setObjectName(u"filesTableView")
+        self.filesTableView.setAcceptDrops(True)
+        self.filesTableView.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.filesTableView.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.filesTableView.horizontalHeader().setStretchLastSection(True)
+        self.filesTableView.verticalHeader().setVisible(False)
+
+        self.verticalLayout.addWidget(self.filesTableView)
 
         self.horizontalLayout_3 = QHBoxLayout()
         self.horizontalLayout_3.setObjectName(u"horizontalLayout_3")
@@ -182,25 +169,12 @@ class Ui_MainWindow(object):
         self.groupBox.setTitle(QCoreApplication.translate("MainWindow", u"\u6807\u7b7e", None))
         self.tagLineEdit.setPlaceholderText(QCoreApplication.translate("MainWindow", u"\u641c\u7d22\u6807\u7b7e", None))
         self.tagSearchClearPushButton.setText(QCoreApplication.translate("MainWindow", u"\u6e05\u9664", None))
-        ___qtreewidgetitem = self.treeWidget.headerItem()
-        ___qtreewidgetitem.setText(1, QCoreApplication.translate("MainWindow", u"\u8ba1\u6570", None));
-        ___qtreewidgetitem.setText(0, QCoreApplication.translate("MainWindow", u"\u6807\u7b7e", None));
         self.searchLineEdit.setPlaceholderText(QCoreApplication.translate("MainWindow", u"\u641c\u7d22\u6587\u5b57", None))
         self.clearSearchPushButton.setText(QCoreApplication.translate("MainWindow", u"\u6e05\u9664", None))
         self.searchPushButton.setText(QCoreApplication.translate("MainWindow", u"\u641c\u7d22", None))
 #if QT_CONFIG(shortcut)
         self.searchPushButton.setShortcut(QCoreApplication.translate("MainWindow", u"Return", None))
 #endif // QT_CONFIG(shortcut)
-        ___qtablewidgetitem = self.filesTableWidget.horizontalHeaderItem(0)
-        ___qtablewidgetitem.setText(QCoreApplication.translate("MainWindow", u"\u6807\u7b7e", None));
-        ___qtablewidgetitem1 = self.filesTableWidget.horizontalHeaderItem(1)
-        ___qtablewidgetitem1.setText(QCoreApplication.translate("MainWindow", u"\u79cd\u7c7b", None));
-        ___qtablewidgetitem2 = self.filesTableWidget.horizontalHeaderItem(2)
-        ___qtablewidgetitem2.setText(QCoreApplication.translate("MainWindow", u"\u6587\u4ef6\u540d", None));
-        ___qtablewidgetitem3 = self.filesTableWidget.horizontalHeaderItem(3)
-        ___qtablewidgetitem3.setText(QCoreApplication.translate("MainWindow", u"\u4e0a\u6b21\u8bbf\u95ee\u65f6\u95f4", None));
-        ___qtablewidgetitem4 = self.filesTableWidget.horizontalHeaderItem(4)
-        ___qtablewidgetitem4.setText(QCoreApplication.translate("MainWindow", u"\u63cf\u8ff0", None));
         self.delPushButton.setText(QCoreApplication.translate("MainWindow", u"\u5220\u9664", None))
 #if QT_CONFIG(shortcut)
         self.delPushButton.setShortcut(QCoreApplication.translate("MainWindow", u"Del", None))
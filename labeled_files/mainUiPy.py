@@ -1,22 +1,29 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from copy import copy
 import dataclasses
-from datetime import datetime
 
 import pathlib
-import re
 import sys
+import time
 from functools import partial
-from typing import Dict, List, Tuple
+from typing import List, Set
 
 from PySide6 import QtCore, QtGui, QtWidgets
 
 from .mainUi import Ui_MainWindow
-from .path_types import init_handlers, path_handler_types, File
+from .path_types import init_handlers, path_handler_types, File, icon_cache
 from .setting import VERSION, Config, setting, logv
-from .tree import build_tree, TreeTag
-from .utils import get_shown_timedelta
+from .tree import TagFilterModel, TagRole, TagTreeModel, TreeTag
 from .flow_layout import FlowLayout
+from .file_table import FileTableModel
+from .ingest import PrefetchJob
+from .transfer import Transfer, TransferQueue
+from .transfer_widget import TransferWidget
+from .search_worker import SearchRequest, SearchResult, SearchWorker
+from .core.snapshot import Snapshot, load_snapshot, save_snapshot, snapshot_path, workspace_key
+from .core.trace import context, span, tracer
+from .sql import base as sql_base
 
 
 def except_hook(exc_type, exc_value, exc_traceback):
@@ -29,6 +36,26 @@ def except_hook(exc_type, exc_value, exc_traceback):
 sys.excepthook = except_hook
 
 
+def qt_idle_timer(timeout) -> QtCore.QTimer:
+    timer = QtCore.QTimer()
+    timer.setSingleShot(True)
+    timer.timeout.connect(timeout)
+    return timer
+
+
+# idle connections are closed, so sync tools can take the files
+sql_base.idle_timer_factory = qt_idle_timer
+
+
+# spans of a search shown in the status bar
+TRACE_SHOWN = {
+    "search.files": "查询",
+    "search.visits": "访问时间",
+    "search.tags": "标签",
+    "file_table_show_files": "表格",
+    "tag_tree_show_tags": "标签树"}
+
+
 # TODO:
 # - 支持多语言
 # - 文件列表中，标签显示可视化，即名字+标签
@@ -36,16 +63,20 @@ sys.excepthook = except_hook
 # FUTURE
 # - 支持安装
 
-min_dt = datetime(1970, 1, 1)
-
 
 class Window(QtWidgets.QMainWindow, Ui_MainWindow):
+    search_requested = QtCore.Signal(object)  # SearchRequest
+    page_requested = QtCore.Signal(int)  # serial of the search
+    worker_close_requested = QtCore.Signal()
+
     def __init__(self) -> None:
         super().__init__()
         self.setupUi(self)
         self.setWindowTitle(f"Labeled Files {VERSION}")
 
-        h = self.filesTableWidget.horizontalHeader()
+        self.file_model = FileTableModel(self)
+        self.filesTableView.setModel(self.file_model)
+        h = self.filesTableView.horizontalHeader()
         for i, size in enumerate([150, 50, 125, 100]):
             h.resizeSection(i, size)
 
@@ -54,9 +85,15 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
 
         self.pinTagLayout = FlowLayout()
         self.pinTagWidget.setLayout(self.pinTagLayout)
-        self.treeWidget.itemDoubleClicked.connect(
+        self.tag_model = TagTreeModel(self)
+        self.tag_filter_model = TagFilterModel(self)
+        self.tag_filter_model.setSourceModel(self.tag_model)
+        self.tagTreeView.setModel(self.tag_filter_model)
+        self.tagTreeView.header().setSectionResizeMode(
+            0, QtWidgets.QHeaderView.ResizeMode.ResizeToContents)
+        self.tagTreeView.doubleClicked.connect(
             self.tag_tree_item_append)
-        self.treeWidget.contextMenuEvent = self.tag_tree_ContextMenuEvent
+        self.tagTreeView.contextMenuEvent = self.tag_tree_ContextMenuEvent
 
         self.tagLineEdit.textChanged.connect(self.tag_tree_show)
         self.tagSearchClearPushButton.clicked.connect(
@@ -64,18 +101,56 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
         self.searchPushButton.clicked.connect(self.search)
         self.openWorkSpaceAction.triggered.connect(self.workspace_open)
         self.clearSearchPushButton.clicked.connect(self.search_clear_all)
-        self.filesTableWidget.itemDoubleClicked.connect(
+        self.filesTableView.doubleClicked.connect(
             self.file_table_file_open)
 
-        self.filesTableWidget.dragEnterEvent = self.file_table_DragEnterEvent
-        self.filesTableWidget.dragMoveEvent = self.file_table_DragMoveEvent
-        self.filesTableWidget.dropEvent = self.file_table_DropEvent
-        self.filesTableWidget.contextMenuEvent = self.file_table_ContextMenuEvent
+        self.filesTableView.dragEnterEvent = self.file_table_DragEnterEvent
+        self.filesTableView.dragMoveEvent = self.file_table_DragMoveEvent
+        self.filesTableView.dropEvent = self.file_table_DropEvent
+        self.filesTableView.contextMenuEvent = self.file_table_ContextMenuEvent
 
         self.delPushButton.clicked.connect(self.file_table_file_del)
 
-        self.files: List[File] = []
-        self.tags: List[TreeTag] = []
+        self.search_serial = 0
+        self.search_started = 0.0
+        # of the snapshot while it is shown, until the search replaces it
+        self.snapshot_files: List[File] | None = None
+        self.snapshot_tree_tags: List[TreeTag] | None = None
+        # whether the table holds the default view, and the tree tags of
+        # the shown view once they are there, what the next snapshot is of
+        self.shown_default = False
+        self.shown_tree_tags: List[TreeTag] | None = None
+        self.search_worker = SearchWorker(FileTableModel.batch)
+        self.search_thread = QtCore.QThread(self)
+        self.search_worker.moveToThread(self.search_thread)
+        self.search_requested.connect(self.search_worker.search)
+        self.page_requested.connect(self.search_worker.fetch_page)
+        self.worker_close_requested.connect(
+            self.search_worker.close, QtCore.Qt.ConnectionType.BlockingQueuedConnection)
+        self.search_worker.finished.connect(self.search_show)
+        self.search_worker.tags_ready.connect(self.search_tags_show)
+        self.search_worker.page_ready.connect(self.search_page_show)
+        self.search_worker.failed.connect(self.search_failed)
+        self.file_model.more_requested.connect(
+            lambda: self.page_requested.emit(self.search_serial))
+        self.search_thread.start()
+
+        self.ingest_pool = ThreadPoolExecutor(8, thread_name_prefix="ingest")
+        self.ingest_jobs: Set[PrefetchJob] = set()
+        self.transfer_queue = TransferQueue()
+        self.statusbar.addPermanentWidget(
+            TransferWidget(self.transfer_queue))
+
+        # search as you type, after the typing pauses
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.search_timer.timeout.connect(self.search)
+        self.searchLineEdit.textChanged.connect(self.search_timer.start)
+
+    @property
+    def files(self) -> List[File]:
+        return self.file_model.files
 
     def config_init(self):
         import json
@@ -93,15 +168,51 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
                 partial(self.workspace_change, path))
 
         default = setting.config.workspaces.get(setting.config.default, None)
+        icon_cache.resize(setting.config.icon_cache_mb * 1024 * 1024)
+        if setting.config.trace:
+            self.trace_init()
         init_handlers()
+        self.addFileMenu.aboutToShow.connect(self.add_file_menu_init)
+
+        if default:
+            self.workspace_change(default)
+
+    def trace_init(self):
+        tracer.enable()
+        self.trace_label = QtWidgets.QLabel()
+        self.statusbar.addPermanentWidget(self.trace_label)
+        self.filesTableView.paintEvent = self.file_table_PaintEvent
+
+    def trace_show(self):
+        """
+            the spans of the latest search and the latest paint of the table
+        """
+        spans = tracer.spans(serial=self.search_serial)
+        ms = dict.fromkeys(TRACE_SHOWN, 0.0)
+        total = None
+        for s in spans:
+            if s["name"] in ms:
+                ms[s["name"]] += s["ms"]
+            elif s["name"] == "search":
+                total = s["ms"]
+        if total is None:
+            return
+        parts = [f"{label} {ms[name]:.1f}" for name, label in TRACE_SHOWN.items()]
+        paints = tracer.spans(name="file_table_paint")
+        if paints:
+            parts.append(f"绘制 {paints[-1]['ms']:.1f}")
+        self.trace_label.setText(f"搜索 {total:.0f} ms（{'，'.join(parts)}）")
+        self.trace_label.setToolTip("\n".join(
+            f"{s['name']}: {s['ms']:.1f} ms, {s.get('rows', '-')} 行" for s in spans))
+
+    def add_file_menu_init(self):
+        # handlers are loaded on the first use, not before the window shows
+        self.addFileMenu.aboutToShow.disconnect(self.add_file_menu_init)
         for name, handler in path_handler_types.items():
             if handler.create_file_able(name):
                 self.addFileMenu.addAction(name).triggered.connect(
                     partial(self.file_table_create_file, name))
 
-        if default:
-            self.workspace_change(default)
-
     def workspace_open(self):
         ret = QtWidgets.QFileDialog.getExistingDirectory(
             caption="open a folder as workspace")
@@ -109,12 +220,55 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
             self.workspace_change(ret)
 
     def workspace_change(self, path):
+        if setting.root_path:
+            snapshot = self.snapshot_take()
+            self.search_worker.latest = -1
+            self.worker_close_requested.emit()
+            setting.close()
+            self.snapshot_save(snapshot)
+        # the key is taken before any connection is opened
+        snapshot = None
+        if setting.config.startup_snapshot:
+            root = pathlib.Path(path).absolute()
+            snapshot = load_snapshot(snapshot_path(root), workspace_key(root))
         setting.set_root(path)
         self.last_keyword = None
         self.pin_tag_refresh()
+        if snapshot is not None and not self.searchLineEdit.text().strip() \
+                and not self.search_tag_get():
+            self.snapshot_show(snapshot)
         self.search()
 
+    def snapshot_show(self, snapshot: Snapshot):
+        """
+            painted at once, the search revalidates it
+        """
+        self.snapshot_files = snapshot.files
+        self.snapshot_tree_tags = snapshot.tree_tags
+        self.shown_default = True
+        self.shown_tree_tags = snapshot.tree_tags
+        setting.searched_tags = []
+        # no more pages until the search has them
+        self.file_table_show_files(snapshot.files)
+        self.tag_tree_show_tags(snapshot.tree_tags)
+
+    def snapshot_take(self) -> Snapshot | None:
+        """
+            the default view as it is shown, None if another view is shown.
+            the key is set by snapshot_save once all connections are closed
+        """
+        if not setting.root_path or not setting.config.startup_snapshot \
+                or not self.shown_default or self.shown_tree_tags is None:
+            return None
+        return Snapshot([], self.files[:FileTableModel.batch], self.shown_tree_tags)
+
+    def snapshot_save(self, snapshot: Snapshot | None):
+        if snapshot is not None:
+            snapshot.key = workspace_key(setting.root_path)
+            save_snapshot(snapshot_path(setting.root_path), snapshot)
+
     def search(self):
+        self.search_timer.stop()
         if not setting.root_path:
             return
         keyword = self.searchLineEdit.text().strip()
@@ -123,113 +277,82 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
 
         logv("SEARCH", f"keyword='{keyword}' tag='{str(tags)}'")
 
-        id_times: Dict[int, datetime] = {}
-        file_ids: List[int] = []
-        conn = setting.conn
-        with conn.connect():
-            match keyword, tags:
-                case "", []:
-                    for file_id, vtime in conn.execute(
-                            "SELECT id, vtime FROM files ORDER BY vtime DESC LIMIT 50"):
-                        id_times[file_id] = datetime.fromisoformat(vtime)
-                    for conn_r in setting.visit_conns_r:
-                        with conn_r.connect():
-                            for file_id, vtime in conn_r.get_files_by_time(50):
-                                id_times[file_id] = max(
-                                    id_times.get(file_id, min_dt), vtime)
-                    id_times_list = list(id_times.items())
-                    id_times_list.sort(key=lambda v: v[1], reverse=True)
-                    if len(id_times_list) > 50:
-                        id_times_list = id_times_list[:50]
-                    id_times = dict(id_times_list)
-                    file_ids = list(id_times)
-                case keyword, []:
-                    file_ids = [f for f, in conn.execute(
-                        f'SELECT id FROM files WHERE name like "%{keyword}%"')]
-                case keyword, tags:
-                    tag = tags[0]
-                    file_ids = {v for v, in conn.execute(
-                        f"SELECT file_id FROM file_labels WHERE label = '{tag}' OR label LIKE '{tag}/%'")}
-                    for tag in tags[1:]:
-                        if file_ids:
-                            file_ids = ','.join(map(str, file_ids))
-                            file_ids = {v for v, in conn.execute(
-                                f"SELECT file_id FROM file_labels WHERE file_id in ({file_ids}) AND (label = '{tag}' OR label LIKE '{tag}/%')")}
-
-                    if file_ids and keyword:
-                        file_ids = ','.join(str(f) for f in file_ids)
-                        file_ids = [f for f, in conn.execute(
-                            f'SELECT id FROM files WHERE name like "%{keyword}%" AND id in ({file_ids})')]
-            if file_ids:
-                file_ids = ','.join(str(f) for f in file_ids)
-                files = conn.fetch_files(
-                    f"SELECT * FROM files WHERE id in ({file_ids})")
-                if not id_times:
-                    id_times = {f.id: f.vtime for f in files}
-                    for conn_r in setting.visit_conns_r:
-                        with conn_r.connect():
-                            for f in files:
-                                id_times[f.id] = max(
-                                    id_times.get(f.id, min_dt), conn_r.get_file_time(f.id))
-                for f in files:
-                    f.vtime = id_times.get(f.id, f.vtime)
-                files.sort(key=lambda f: f.vtime, reverse=True)
-            else:
-                files = []
-            setting.searched_tags = tags
-            self.file_table_show_files(files)
+        # the worker drops, or interrupts, every search older than this one
+        self.search_serial += 1
+        self.search_started = time.perf_counter()
+        self.search_worker.latest = self.search_serial
+        self.search_requested.emit(SearchRequest(
+            self.search_serial,
+            setting.conn.path,
+            [conn.path for conn in setting.visit_conns_r],
+            keyword, tags,
+            setting.config.sqlite_persistent,
+            setting.conn.pragmas))
+
+    def search_show(self, result: SearchResult):
+        if result.serial != self.search_serial:
+            return
+        with context(serial=result.serial):
+            self.search_result_show(result)
+            tracer.record("search", (time.perf_counter() - self.search_started) * 1000,
+                          rows=len(result.files), keyword=bool(result.keyword),
+                          tags=len(result.tags))
+        if tracer.enabled:
+            self.trace_show()
+
+    def search_result_show(self, result: SearchResult):
+        shown, self.snapshot_files = self.snapshot_files, None
+        setting.searched_tags = result.tags
+        self.shown_default = not result.keyword and not result.tags
+        self.shown_tree_tags = None
+        if shown == result.files:
+            # the snapshot is still right, the table is kept as it is
+            self.file_model.more = result.more
+            return
+        self.file_table_show_files(result.files, result.more)
 
-            if not keyword and not tags:
-                self.tag_tree_show_all()
-            else:
-                self.tag_tree_show_files(files)
+    def search_tags_show(self, serial: int, tree_tags: List[TreeTag]):
+        if serial != self.search_serial:
+            return
+        shown, self.snapshot_tree_tags = self.snapshot_tree_tags, None
+        self.shown_tree_tags = tree_tags
+        if shown != tree_tags:
+            with context(serial=serial):
+                self.tag_tree_show_tags(tree_tags)
+        if tracer.enabled:
+            self.trace_show()
+
+    def search_page_show(self, serial: int, files: List[File]):
+        if serial != self.search_serial:
+            return
+        self.file_model.append_page(files)
+
+    def search_failed(self, e: Exception):
+        raise e
 
     def search_tag_get(self):
         return [self.tagListWidget.item(row).text()
                 for row in range(self.tagListWidget.count())]
 
-    def tag_tree_show_files(self, files: List[File]):
-        tags: Dict[str, TreeTag] = {}
-        for f in files:
-            for tag in f.tags:
-                if tag in tags:
-                    shown_tag = tags[tag]
-                    shown_tag.count += 1
-                    shown_tag.time = max(shown_tag.time, f.vtime)
-                else:
-                    tags[tag] = TreeTag(tag, 1, f.vtime)
-        self.tags = sorted(tags.values(), key=lambda tag: (
-            tag.time, tag.count), reverse=True)
-
-        self.tag_tree_show()
+    def tag_tree_show_tags(self, tags: List[TreeTag]):
+        with span("tag_tree_show_tags", rows=len(tags)):
+            self.tag_model.set_tags(tags)
+            self.tag_tree_expand()
 
     def tag_tree_show(self):
-        keyword = self.tagLineEdit.text().lower()
-        if keyword:
-            tags = [tag for tag in self.tags if keyword in tag.tag.lower()]
-        else:
-            tags = self.tags
-        build_tree(self.treeWidget, tags)
+        with span("tag_tree_show") as s:
+            self.tag_filter_model.set_keyword(self.tagLineEdit.text())
+            self.tag_tree_expand()
+            s.set(rows=self.tag_filter_model.rowCount())
 
-    def tag_tree_show_all(self):
-        conn = setting.conn
-        sql = f"""
-            SELECT label, COUNT(*)
-            FROM file_labels
-            GROUP BY label"""
-        with conn.connect():
-            tags = [TreeTag(tag, cnt)
-                    for tag, cnt in conn.execute(sql).fetchall()]
-            for vconn in setting.visit_conns_r:
-                with vconn.connect():
-                    for tag in tags:
-                        tag.time = max(tag.time, vconn.get_tag_time(tag.tag))
-            self.tags = tags
-        self.tag_tree_show()
-
-    def tag_tree_item_append(self, item: QtWidgets.QTreeWidgetItem):
-        tag = self.tag_tree_get_from_item(item)
-        self.search_tag_insert(tag)
+    def tag_tree_expand(self):
+        model = self.tag_filter_model
+        if model.rowCount() < 10:
+            for row in range(model.rowCount()):
+                self.tagTreeView.expand(model.index(row, 0))
+
+    def tag_tree_item_append(self, index: QtCore.QModelIndex):
+        self.search_tag_insert(index.data(TagRole))
 
     def search_tag_insert(self, tag: str, insert_row: int = -1):
         for row in range(self.tagListWidget.count()):
@@ -265,13 +388,6 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
             layout.addWidget(btn)
             btn.clicked.connect(partial(self.search_tag_insert, tag.tag))
 
-    def tag_tree_get_from_item(self, item: QtWidgets.QTreeWidgetItem):
-        tag = []
-        while item:
-            tag.append(item.text(0))
-            item = item.parent()
-        return '/'.join(reversed(tag))
-
     def pin_tag_pin(self, tag: str):
         setting.conn.append_pin_tag(tag)
         self.pin_tag_refresh()
@@ -282,14 +398,14 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
 
     def tag_tree_ContextMenuEvent(self, e: QtGui.QContextMenuEvent) -> None:
         root_self = self
-        self = self.treeWidget
-        item = self.itemAt(e.pos())
-        if not item:
+        self = self.tagTreeView
+        index = self.indexAt(e.pos())
+        if not index.isValid():
             e.ignore()
             return
         menu = QtWidgets.QMenu(self)
 
-        tag = root_self.tag_tree_get_from_item(item)
+        tag = index.data(TagRole)
         menu.addAction('以标签筛选').triggered.connect(
             partial(root_self.search_tag_insert, tag))
         if not setting.conn.exist_pin_tag(tag):
@@ -334,67 +450,48 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
             return
         file.tags = self.search_tag_get()
         setting.conn.insert_file(file)
-        self.files.insert(0, file)
-        self.file_table_show_files()
+        self.file_model.insert_file(0, file)
+        file.handler.fetch_details(self.file_table_file_fetched)
 
     def closeEvent(self, event: QtGui.QCloseEvent) -> None:
         from .sql import on_close
+        if self.transfer_queue.transfers:
+            match QtWidgets.QMessageBox.question(self, "正在传输文件", "是否取消传输并退出？", QtWidgets.QMessageBox.Cancel, QtWidgets.QMessageBox.Ok):
+                case QtWidgets.QMessageBox.Ok:
+                    pass
+                case _:
+                    event.ignore()
+                    return
+        self.search_timer.stop()
+        self.search_worker.latest = -1
+        self.worker_close_requested.emit()
+        self.search_thread.quit()
+        self.search_thread.wait()
+        self.ingest_pool.shutdown(wait=False, cancel_futures=True)
+        self.transfer_queue.close()
+        snapshot = self.snapshot_take()
+        setting.close()
         on_close()
+        self.snapshot_save(snapshot)
+        tracer.disable()
         return super().closeEvent(event)
 
-    def file_table_show_files(self, results: List[File] = None):
-        table = self.filesTableWidget
-        table.clearContents()
-        table.setRowCount(0)
-        if results is not None:
-            self.files = results
-        else:
+    def file_table_show_files(self, results: List[File] = None, more: bool = False):
+        if results is None:
             results = self.files
-        table.setRowCount(len(results))
-        for row, file in enumerate(results):
-            self.file_table_show_file_at(row, file)
-
-    def file_table_show_file_at(self, row: int, f: File):
-        icon = f.handler.get_icon()
-        if setting.config.hide_search_tag_in_result:
-            tags = []
-            for tag in f.tags:
-                for st in setting.searched_tags:
-                    if tag == st:
-                        break
-                    tmp = st + '/'
-                    if tag.startswith(tmp):
-                        result = tag.removeprefix(tmp)
-                        tags.append(result)
-                        break
-                else:
-                    tags.append(tag)
-        else:
-            tags = f.tags
-        text = ' '.join('#' + tag for tag in tags)
-        if icon is None:
-            item = QtWidgets.QTableWidgetItem(text)
-        else:
-            item = QtWidgets.QTableWidgetItem(icon, text)
-        table = self.filesTableWidget
-        table.setItem(row, 0, item)
-        if setting.config.file_name_regex and f.name.startswith("r|"):
-            actual_name = f.handler.actual_name_get()
-            ret = re.search(f.name.removeprefix('r|'), actual_name)
-            if ret:
-                name = ret.group()
-            else:
-                name = f"MISS FINDING {f.name} in {actual_name}"
-        else:
-            name = f.name
-        cols = [
-            f.type,  # f.handler.get_shown_name()
-            name,
-            get_shown_timedelta(f.vtime) + "前",
-            f.description
-        ]
-        for i, col in enumerate(cols, 1):
-            table.setItem(row, i, QtWidgets.QTableWidgetItem(col))
+        with span("file_table_show_files", rows=len(results)):
+            self.file_model.set_files(results, more)
+
+    def file_table_PaintEvent(self, e: QtGui.QPaintEvent) -> None:
+        # only while tracing, the rows are those painted
+        view = self.filesTableView
+        with span("file_table_paint") as s:
+            QtWidgets.QTableView.paintEvent(view, e)
+            first = view.rowAt(e.rect().top())
+            last = view.rowAt(e.rect().bottom())
+            if last < 0:
+                last = self.file_model.rowCount() - 1
+            s.set(rows=last - first + 1 if first >= 0 else 0)
 
     def file_table_DragEnterEvent(self, event: QtGui.QDragEnterEvent) -> None:
         data = event.mimeData()
@@ -405,7 +502,7 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
                     event.accept()
 
     def file_table_DragMoveEvent(self, e: QtGui.QDragMoveEvent) -> None:
-        table = self.filesTableWidget
+        table = self.filesTableView
         if e.pos().y() < table.height() / 2:
             if e.pos().x() < table.width() / 2:
                 e.setDropAction(QtCore.Qt.DropAction.MoveAction)
@@ -419,49 +516,85 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
 
         action = e.dropAction()
         conn = setting.conn
-        files = []
         current_tags = self.search_tag_get()
-        with conn.connect():
-            for file in e.mimeData().text().splitlines():
-                for typ, handler in path_handler_types.items():
-                    if not handler.mime_acceptable(file):
-                        continue
-                    f = handler.create_file_from_mime(file)
-                    if f is None:
-                        continue
-                    f.tags = current_tags.copy()
-
-                    match action:
-                        case QtCore.Qt.DropAction.MoveAction:
-                            f.handler.move_to()
-                        case QtCore.Qt.DropAction.CopyAction:
-                            f.handler.copy_to()
-                    conn.insert_file(f)
-                    files.append(f)
-                    break
-
-        files.extend(self.files)
-        self.file_table_show_files(files)
+
+        def done(files: List[File], errors: List[Exception]):
+            self.ingest_jobs.discard(job)
+            self.file_table_ingest(conn, current_tags, action, files, errors)
+        job = PrefetchJob(
+            self.ingest_pool, e.mimeData().text().splitlines(),
+            done, self.file_table_ingest_progress)
+        self.ingest_jobs.add(job)
 
         e.ignore()
 
+    def file_table_ingest_progress(self, prepared: int, total: int):
+        self.statusbar.showMessage(f"正在读取文件 {prepared}/{total}")
+
+    def file_table_ingest(self, conn, tags: List[str], action: QtCore.Qt.DropAction, files: List[File], errors: List[Exception]):
+        self.statusbar.clearMessage()
+        if conn is not setting.conn:  # the workspace is changed meanwhile
+            return
+        ready = []
+        for f in files:
+            f.tags = tags.copy()
+            try:
+                f.handler.prepare_insert()
+                match action:
+                    case QtCore.Qt.DropAction.MoveAction:
+                        transfer = f.handler.move_to()
+                    case QtCore.Qt.DropAction.CopyAction:
+                        transfer = f.handler.copy_to()
+                    case _:
+                        transfer = None
+            except Exception as e:
+                errors.append(e)
+                continue
+            if transfer is None:
+                ready.append(f)
+            else:
+                # inserted once all data is in the workspace
+                self.transfer_queue.submit(
+                    transfer, partial(self.file_table_transferred, conn, f))
+        self.file_table_add_files(conn, ready)
+        if errors:
+            raise errors[0]
+
+    def file_table_transferred(self, conn, f: File, transfer: Transfer):
+        match transfer.state:
+            case "finished":
+                f.path = transfer.path
+                f.transfer = transfer.strategy
+                self.file_table_add_files(conn, [f])
+            case "failed":
+                raise transfer.error
+
+    def file_table_add_files(self, conn, files: List[File]):
+        conn.insert_files(files)
+        if conn is not setting.conn or not files:
+            return
+        self.file_model.insert_files(0, files)
+        for f in files:
+            f.handler.fetch_details(self.file_table_file_fetched)
+        self.statusbar.showMessage(f"已添加 {len(files)} 条记录", 5000)
+
     def file_table_ContextMenuEvent(self, e: QtGui.QContextMenuEvent) -> None:
-        table = self.filesTableWidget
-        item = table.itemAt(e.pos())
-        if not item:
+        table = self.filesTableView
+        index = table.indexAt(e.pos())
+        if not index.isValid():
             e.ignore()
             return
         menu = QtWidgets.QMenu(table)
         menu.addAction("打开").triggered.connect(
-            partial(self.file_table_file_open, item))
+            partial(self.file_table_file_open, index))
         menu.addAction('编辑').triggered.connect(
-            partial(self.file_table_file_edit, item))
+            partial(self.file_table_file_edit, index))
         menu.addAction("以标签筛选").triggered.connect(
-            partial(self.file_table_file_filter, item))
+            partial(self.file_table_file_filter, index))
         menu.addAction("创建副本").triggered.connect(
-            partial(self.file_table_file_duplicate, item))
+            partial(self.file_table_file_duplicate, index))
         menu.addAction('打开文件夹').triggered.connect(
-            partial(self.file_table_file_path_open, item))
+            partial(self.file_table_file_path_open, index))
         menu.popup(e.globalPos())
 
     def file_table_get_file_by_index(self, ind: int, visit: bool = True) -> File:
@@ -470,13 +603,13 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
             setting.visit_conn_w.visit_file(f.id, f.tags)
         return f
 
-    def file_table_file_filter(self, item: QtWidgets.QTableWidgetItem):
-        f = self.file_table_get_file_by_index(item.row(), False)
+    def file_table_file_filter(self, index: QtCore.QModelIndex):
+        f = self.file_table_get_file_by_index(index.row(), False)
         for tag in f.tags:
             self.search_tag_insert(tag)
 
-    def file_table_file_duplicate(self, item: QtWidgets.QTableWidgetItem):
-        origin_f = self.file_table_get_file_by_index(item.row(), False)
+    def file_table_file_duplicate(self, index: QtCore.QModelIndex):
+        origin_f = self.file_table_get_file_by_index(index.row(), False)
         custom = False
         if origin_f.handler.support_custom_duplicate:
             msg = QtWidgets.QMessageBox()
@@ -497,31 +630,34 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
         if f is None:
             return
         setting.conn.insert_file(f)
-        self.files.insert(0, f)
-        self.filesTableWidget.insertRow(0)
-        self.file_table_show_file_at(0, f)
+        self.file_model.insert_file(0, f)
 
-    def file_table_file_open(self, item: QtWidgets.QTableWidgetItem):
-        self.file_table_get_file_by_index(item.row()).handler.open()
+    def file_table_file_open(self, index: QtCore.QModelIndex):
+        self.file_table_get_file_by_index(index.row()).handler.open()
 
-    def file_table_file_edit(self, item: QtWidgets.QTableWidgetItem):
-        f = self.file_table_get_file_by_index(item.row())
+    def file_table_file_edit(self, index: QtCore.QModelIndex):
+        f = self.file_table_get_file_by_index(index.row())
         f.handler.edit(
-            partial(self.file_table_show_file_from_db, f.id, item.row()))
+            partial(self.file_table_show_file_from_db, f.id, index.row()))
 
     def file_table_show_file_from_db(self, file_id, row: int):
         conn = setting.conn
         f = conn.fetch_files(
             "SELECT * FROM files WHERE id = ? ", (file_id,))[0]
-        self.files[row] = f
-        self.file_table_show_file_at(row, f)
+        self.file_model.update_file(row, f)
+
+    def file_table_file_fetched(self, f: File):
+        row = self.file_model.row_of(f.id)
+        if row >= 0:
+            f.vtime = self.files[row].vtime
+            self.file_model.update_file(row, f)
 
-    def file_table_file_path_open(self, item: QtWidgets.QTableWidgetItem):
-        self.file_table_get_file_by_index(item.row()).handler.open_path()
+    def file_table_file_path_open(self, index: QtCore.QModelIndex):
+        self.file_table_get_file_by_index(index.row()).handler.open_path()
 
     def file_table_file_del(self):
-        rows = sorted({item.row()
-                      for item in self.filesTableWidget.selectedItems()})
+        rows = sorted({index.row()
+                      for index in self.filesTableView.selectionModel().selectedIndexes()})
         ids = []
         names = []
         conn = setting.conn
@@ -531,14 +667,9 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
             names.append(f.handler.repr())
         match QtWidgets.QMessageBox.question(self, "是否删除以下文件？", "\n".join(names), QtWidgets.QMessageBox.Cancel, QtWidgets.QMessageBox.Ok):
             case QtWidgets.QMessageBox.Ok:
-                try:
-                    with conn.connect():
-                        for i in reversed(rows):
-                            f = self.files[i]
-                            f.handler.remove()
-                            conn.delete_file([f.id])
-                            self.files.pop(i)
-                except:
-                    raise
-                finally:
-                    self.file_table_show_files()
+                with conn.connect():
+                    for i in reversed(rows):
+                        f = self.files[i]
+                        f.handler.remove()
+                        conn.delete_file([f.id])
+                        self.file_model.remove_file(i)
@@ -1,18 +1,14 @@
 from typing import Dict
 from .base import HandlerDescriptor, path_handler_types, File
+from .icon_cache import icon_cache
 
 
 def init_handlers():
+    """
+        register the handler modules, each is imported on the first use
+        of its types
+    """
     File.handler = HandlerDescriptor()
-    from . import file
-
-    if file.Handler.init_var():
-        path_handler_types["file"] = path_handler_types["folder"] = file.Handler
-
-    from . import vscode
-    if vscode.Handler.init_var():
-        path_handler_types["vscode"] = vscode.Handler
-
-    from . import url
-    if url.Handler.init_var():
-        path_handler_types["url"] = url.Handler
\ No newline at end of file
+    path_handler_types.register(".file", "file", "folder")
+    path_handler_types.register(".vscode", "vscode")
+    path_handler_types.register(".url", "url")
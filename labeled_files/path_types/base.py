@@ -1,32 +1,89 @@
 
 import abc
-import base64
-from dataclasses import dataclass, field
-from datetime import datetime
+from collections.abc import MutableMapping
+import importlib
 from pathlib import Path
-from typing import Dict, List, Type
+import threading
+from typing import Callable, Dict, Iterator, Type
 import weakref
 from PySide6.QtGui import QIcon, QPixmap, QScreen
 from PySide6.QtCore import QFileInfo, QByteArray, QBuffer, QIODevice
 
-path_handler_types: Dict[str, Type['BasePathHandler']] = {}
-
-
-@dataclass
-class _File:
-    id: int
-    name: str
-    type: str
-    path: str
-    tags: List[str]
-    ctime: datetime
-    vtime: datetime
-    icon: str
-    description: str
-
-
-class File(_File):
-    handler: 'HandlerDescriptor'  # class attribute
+from ..core.file import File
+from .icon_cache import icon_cache, icon_hash
+
+
+
+class HandlerRegistry(MutableMapping):
+    """
+        handler types by File.type. the module of a handler is imported and
+        its init_var called on the first use of one of its types, a type
+        whose init_var returns False is dropped. iterating loads all modules
+    """
+
+    def __init__(self) -> None:
+        self.modules: Dict[str, str] = {}  # type -> module, not loaded yet
+        self.handlers: Dict[str, Type['BasePathHandler']] = {}
+        self._lock = threading.RLock()
+
+    def register(self, module: str, *types: str):
+        """
+            module is relative to labeled_files.path_types
+        """
+        with self._lock:
+            for typ in types:
+                self.handlers.pop(typ, None)
+                self.modules[typ] = module
+
+    def load(self, module: str):
+        with self._lock:
+            types = [typ for typ, m in self.modules.items() if m == module]
+            if not types:
+                return
+            handler = importlib.import_module(module, __package__).Handler
+            ok = handler.init_var()
+            for typ in types:
+                del self.modules[typ]
+                if ok:
+                    self.handlers[typ] = handler
+
+    def load_all(self):
+        with self._lock:
+            for module in set(self.modules.values()):
+                self.load(module)
+
+    def __getitem__(self, typ: str) -> Type['BasePathHandler']:
+        handler = self.handlers.get(typ)
+        if handler is None:
+            module = self.modules.get(typ)
+            if module is None:
+                raise KeyError(typ)
+            self.load(module)
+            handler = self.handlers[typ]
+        return handler
+
+    def __setitem__(self, typ: str, handler: Type['BasePathHandler']):
+        with self._lock:
+            self.modules.pop(typ, None)
+            self.handlers[typ] = handler
+
+    def __delitem__(self, typ: str):
+        with self._lock:
+            if self.modules.pop(typ, None) is None:
+                del self.handlers[typ]
+            else:
+                self.handlers.pop(typ, None)
+
+    def __iter__(self) -> Iterator[str]:
+        self.load_all()
+        return iter(list(self.handlers))
+
+    def __len__(self) -> int:
+        self.load_all()
+        return len(self.handlers)
+
+
+path_handler_types = HandlerRegistry()
 
 
 class HandlerDescriptor:
@@ -55,18 +112,20 @@ class BasePathHandler(abc.ABC):
         return icon.pixmap(32, 32)
 
     @staticmethod
-    def pixmap_to_b64(pixmap: QPixmap):
+    def pixmap_to_png(pixmap: QPixmap | None) -> bytes:
+        if pixmap is None:
+            return b""
         b = QByteArray()
         buffer = QBuffer(b)
         buffer.open(QIODevice.WriteOnly)
         pixmap.save(buffer, 'PNG')
         buffer.close()
-        return base64.b64encode(b.data())
+        return b.data()
 
     @staticmethod
-    def icon_to_b64(icon: QIcon):
+    def icon_to_png(icon: QIcon) -> bytes:
         if icon:
-            return BasePathHandler.pixmap_to_b64(BasePathHandler.icon_to_pixmap(icon))
+            return BasePathHandler.pixmap_to_png(BasePathHandler.icon_to_pixmap(icon))
         return b""
 
     @classmethod
@@ -77,6 +136,17 @@ class BasePathHandler(abc.ABC):
     @classmethod
     @abc.abstractmethod
     def create_file_from_mime(cls, mime_path: str) -> File:
+        """
+            called in a worker thread, do not create any Qt GUI objects,
+            leave them to prepare_insert
+        """
+        pass
+
+    def prepare_insert(self):
+        """
+            called in the GUI thread before a file from create_file_from_mime
+            is inserted
+        """
         pass
 
     @classmethod
@@ -90,21 +160,44 @@ class BasePathHandler(abc.ABC):
         pass
 
     @abc.abstractmethod
-    def copy_to(self):
+    def copy_to(self) -> 'Transfer | None':
+        """
+            the Transfer copying the file into the workspace, run before the
+            file is inserted with transfer.path as its path. None if nothing
+            is transferred
+        """
         pass
 
     @abc.abstractmethod
-    def move_to(self):
+    def move_to(self) -> 'Transfer | None':
+        """
+            like copy_to, but moves the file
+        """
         pass
 
     @abc.abstractmethod
     def get_default_icon(self) -> QIcon:
         pass
 
+    def fetch_default_icon(self, done: Callable[[QIcon | None], None]):
+        """
+            the default icon of a handler which gets it slowly, e.g. over
+            the network. done is called in the GUI thread, again when a
+            placeholder is replaced
+        """
+        done(self.get_default_icon())
+
     @abc.abstractmethod
     def open(self):
         pass
 
+    def fetch_details(self, done: Callable[['File'], None]):
+        """
+            fill details of a new file which are slow to get, in background.
+            done is called with the updated file
+        """
+        pass
+
     def edit(self, callback):
         from .fileUiPy import Window
         if self.win is not None:
@@ -138,19 +231,32 @@ class BasePathHandler(abc.ABC):
     def actual_name_get(self) -> str:
         pass
 
+    def get_decoded_icon(self) -> tuple[QPixmap, QIcon]:
+        """
+            decoded self.file.icon, shared by all files with the same icon
+        """
+        from ..setting import setting
+        icon = self.file.icon
+        key = icon if isinstance(icon, str) else icon_hash(icon)
+
+        def decode():
+            png = icon if isinstance(icon, bytes) else setting.conn.get_icon(icon)
+            pixmap = QPixmap()
+            if png:
+                pixmap.loadFromData(png)
+            return pixmap, QIcon(pixmap)
+        return icon_cache.get(("icon", key), decode)
+
     def get_icon(self) -> QIcon | None:
         if self.file.icon:
-            pixmap = QPixmap()
-            pixmap.loadFromData(base64.b64decode(self.file.icon))
-            return QIcon(pixmap)
+            return self.get_decoded_icon()[1]
         if self.support_dynamic_icon:
             return self.get_default_icon()
 
     def get_pixmap(self) -> QPixmap | None:
         if self.file.icon:
-            pixmap = QPixmap()
-            pixmap.loadFromData(base64.b64decode(self.file.icon))
-            return pixmap
+            # a copy, callers may change its device pixel ratio
+            return QPixmap(self.get_decoded_icon()[0])
         if self.support_dynamic_icon:
             return self.icon_to_pixmap(self.get_default_icon())
 
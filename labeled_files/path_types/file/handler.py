@@ -1,22 +1,42 @@
 import copy
 from datetime import datetime
-from multiprocessing import Process
 import shutil
 import subprocess
 from pathlib import Path
+from typing import Dict, Tuple
 from PySide6.QtCore import QFileInfo, QByteArray, QBuffer, QIODevice
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QFileIconProvider, QMessageBox, QInputDialog
+from labeled_files.core.ingest import file_from_path
 from labeled_files.setting import setting
+from labeled_files.transfer import COPY, HARDLINK, REFLINK, Transfer
 
 from ..base import BasePathHandler, File
+from ..icon_cache import icon_cache
 
 
 need_icon_suffixes = {".exe", "", ".lnk"}
 EXECUTABLE = {".exe"}
+PREWARM_SUFFIXES = [".txt", ".md", ".pdf", ".docx", ".xlsx", ".pptx",
+                    ".png", ".jpg", ".zip", ".py"]
 
 
 icon_provider: QFileIconProvider = None
+# (type, lowercase suffix) -> icon. never evicted, so the provider is
+# asked once per extension, files in need_icon_suffixes are cached by path
+type_icons: Dict[Tuple[str, str], QIcon] = {}
+
+
+def get_type_icon(typ: str, suffix: str) -> QIcon:
+    key = typ, suffix
+    icon = type_icons.get(key)
+    if icon is None:
+        if typ == "folder":
+            icon = icon_provider.icon(icon_provider.IconType.Folder)
+        else:
+            icon = icon_provider.icon(QFileInfo(f"file{suffix}"))
+        type_icons[key] = icon
+    return icon
 
 
 class Handler(BasePathHandler):
@@ -26,6 +46,10 @@ class Handler(BasePathHandler):
     def init_var(cls):
         global icon_provider
         icon_provider = QFileIconProvider()
+        type_icons.clear()
+        get_type_icon("folder", "")
+        for suffix in PREWARM_SUFFIXES:
+            get_type_icon("file", suffix)
         return True
 
     @classmethod
@@ -34,18 +58,15 @@ class Handler(BasePathHandler):
 
     @classmethod
     def create_file_from_mime(cls, mime_path: str) -> File:
-        p = Path(mime_path.removeprefix("file:///"))
-        stat = p.stat()
-        typ = "folder" if p.is_dir() else "file"
-        f = File(None, p.name, typ, str(p), [], datetime.fromtimestamp(
-            stat.st_ctime), datetime.now(), "", "")
-        if typ == "file" and p.suffix.lower() in need_icon_suffixes:
-            icon = f.handler.get_default_icon()
-            f.icon = cls.icon_to_b64(icon)
+        return file_from_path(Path(mime_path.removeprefix("file:///")))
+
+    def prepare_insert(self):
+        p = Path(self.file.path)
+        if self.file.type == "file" and p.suffix.lower() in need_icon_suffixes:
+            self.file.icon = self.icon_to_png(self.get_default_icon())
         else:
             # will generate icon for folder or file.type dynamicly
             pass
-        return f
 
     @classmethod
     def create_file_able(cls, handler_type) -> bool:
@@ -79,29 +100,27 @@ class Handler(BasePathHandler):
                 break
         return target_p.relative_to(setting.root_path), target_p
 
-    def copy_to(self):
-        p = Path(self.file.path)
+    def copy_to(self) -> Transfer:
         target_rel, target_abs = self.get_new_name()
-        if p.is_dir():
-            shutil.copytree(p, target_abs)
-        else:
-            shutil.copy(p, target_abs)
-        self.file.path = str(target_rel)
+        strategies = [s for s in setting.config.copy_strategies if s != COPY]
+        return Transfer(Path(self.file.path), target_abs, str(target_rel), False,
+                        (*strategies, COPY),
+                        frozenset(s.lower() for s in setting.config.hardlink_suffixes))
 
-    def move_to(self):
-        p = Path(self.file.path)
+    def move_to(self) -> Transfer:
         target_rel, target_abs = self.get_new_name()
-        shutil.move(p, target_abs)
-        self.file.path = str(target_rel)
+        return Transfer(Path(self.file.path), target_abs, str(target_rel), True)
 
     def get_default_icon(self) -> QIcon:
         if self.file.type == "folder":
-            return icon_provider.icon(icon_provider.IconType.Folder)
-        path = self.get_absolute_path()
-        if path.suffix.lower() in need_icon_suffixes:
-            return icon_provider.icon(QFileInfo(path))
-        else:
-            return icon_provider.icon(QFileInfo(path.name))
+            return get_type_icon("folder", "")
+        suffix = Path(self.file.path).suffix.lower()
+        if suffix in need_icon_suffixes:
+            path = self.get_absolute_path()
+            return icon_cache.get(
+                ("path", str(path)),
+                lambda: icon_provider.icon(QFileInfo(path)))
+        return get_type_icon("file", suffix)
 
     def get_absolute_path(self) -> Path:
         path = Path(self.file.path)
@@ -112,6 +131,7 @@ class Handler(BasePathHandler):
     def open(self):
         p = self.get_absolute_path()
         if p.exists():
+            from multiprocessing import Process
             process = Process(target=open_file, args=(
                 p, setting.get_clean_env()))
             process.start()
@@ -131,6 +151,9 @@ class Handler(BasePathHandler):
         p = Path(self.file.path)
         if p.is_absolute():
             return f"file: link-to: {self.file.name}"
+        elif self.file.transfer in (HARDLINK, REFLINK):
+            # the data is shared with the source, removing only unlinks it
+            return f"file: {self.file.transfer}: {self.file.name}"
         else:
             return f"file: {self.file.name}"
 
@@ -170,6 +193,7 @@ class Handler(BasePathHandler):
             shutil.copy(path, new_path)
         f = copy.copy(self.file)
         f.path = str(new_path)
+        f.transfer = COPY
         return f
 
 def open_file(path: Path, env: dict):
@@ -0,0 +1,48 @@
+from collections import Counter
+from datetime import datetime
+
+from PySide6.QtGui import QIcon
+
+from ...base import File, HandlerDescriptor, path_handler_types
+from ...icon_cache import icon_cache
+from ....setting import Config, setting
+from .. import handler
+
+
+class CountingProvider:
+    IconType = handler.QFileIconProvider.IconType
+
+    def __init__(self) -> None:
+        self.calls = Counter()
+
+    def icon(self, arg):
+        self.calls[arg if isinstance(arg, self.IconType) else arg.fileName()] += 1
+        return QIcon()
+
+
+def test_icon_per_suffix(monkeypatch, tmp_path):
+    provider = CountingProvider()
+    monkeypatch.setattr(handler, "icon_provider", provider)
+    monkeypatch.setattr(handler, "type_icons", {})
+    monkeypatch.setattr(File, "handler", HandlerDescriptor(), raising=False)
+    monkeypatch.setitem(path_handler_types, "file", handler.Handler)
+    monkeypatch.setitem(path_handler_types, "folder", handler.Handler)
+    monkeypatch.setattr(setting, "config", Config())
+    monkeypatch.setattr(setting, "root_path", tmp_path)
+    icon_cache.clear()
+
+    names = ["a.txt", "b.TXT", "c.pdf", "d.exe", "e", "folder"]
+    files = [
+        File(None, name, "folder" if name == "folder" else "file",
+             f"{i}/{name}", [], datetime.now(), datetime.now(), "", "")
+        for i in range(2000) for name in names]
+    for f in files:
+        f.handler.get_default_icon()
+
+    # one call per extension, executables and files without suffix by path
+    assert provider.calls[handler.QFileIconProvider.IconType.Folder] == 1
+    assert provider.calls["file.txt"] == 1
+    assert provider.calls["file.pdf"] == 1
+    assert provider.calls["d.exe"] == 2000
+    assert provider.calls["e"] == 2000
+    icon_cache.clear()
@@ -61,9 +61,15 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
         self.close()
 
     def clear_image(self):
+        # the icon is only replaced while no other one is chosen
+        self.default_icon = self.icon
+        self.origin_file.handler.fetch_default_icon(self.default_icon_show)
+
+    def default_icon_show(self, icon: QtGui.QIcon | None):
+        if self.icon is not self.default_icon:
+            return  # another icon is chosen meanwhile
         handler = self.origin_file.handler
-        pixmap = self.origin_file.handler.icon_to_pixmap(
-            self.origin_file.handler.get_default_icon())
+        pixmap = handler.icon_to_pixmap(icon)
         if pixmap is None:
             return
         pixmap.setDevicePixelRatio(self.devicePixelRatio())
@@ -71,7 +77,8 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
         if handler.support_dynamic_icon:
             self.icon = b""
         else:
-            self.icon = handler.pixmap_to_b64(pixmap)
+            self.icon = handler.pixmap_to_png(pixmap)
+        self.default_icon = self.icon
 
     def icon_choose(self):
         f, typ = QtWidgets.QFileDialog.getOpenFileName(self, "choose an icon", str(
@@ -82,7 +89,7 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
             QtCore.QFileInfo(f)).pixmap(32, 32, QtGui.QIcon.Mode.Normal)
         pixmap.setDevicePixelRatio(self.devicePixelRatio())
         self.iconLabel.setPixmap(pixmap)
-        self.icon = self.origin_file.handler.pixmap_to_b64(pixmap)
+        self.icon = self.origin_file.handler.pixmap_to_png(pixmap)
 
     def image_choose(self):
         f, typ = QtWidgets.QFileDialog.getOpenFileName(self, "choose an image", str(
@@ -97,7 +104,7 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
             pixmap = pixmap.scaledToHeight(32)
         pixmap.setDevicePixelRatio(self.devicePixelRatio())
         self.iconLabel.setPixmap(pixmap)
-        self.icon = self.origin_file.handler.pixmap_to_b64(pixmap)
+        self.icon = self.origin_file.handler.pixmap_to_png(pixmap)
 
     def image_url_choose(self):
         url, ok = QtWidgets.QInputDialog.getText(
@@ -113,7 +120,7 @@ class Window(QtWidgets.QMainWindow, Ui_MainWindow):
             pixmap = None
         pixmap.setDevicePixelRatio(self.devicePixelRatio())
         self.iconLabel.setPixmap(pixmap)
-        self.icon = self.origin_file.handler.pixmap_to_b64(pixmap)
+        self.icon = self.origin_file.handler.pixmap_to_png(pixmap)
 
 
 class BaseWidget(abc.ABC):
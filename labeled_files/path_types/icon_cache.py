@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from typing import Callable, Hashable, TypeVar
+
+from PySide6.QtGui import QIcon, QPixmap
+
+from ..core.file import icon_hash
+
+T = TypeVar("T")
+
+
+def icon_cost(value) -> int:
+    """
+        estimated bytes of a decoded QIcon / QPixmap
+    """
+    if isinstance(value, QPixmap):
+        return value.width() * value.height() * max(value.depth(), 8) // 8
+    if isinstance(value, QIcon):
+        return sum(size.width() * size.height() * 4
+                   for size in value.availableSizes()) or 32 * 32 * 4
+    if isinstance(value, tuple):
+        return sum(icon_cost(v) for v in value)
+    return 0
+
+
+class IconCache:
+    """
+        LRU cache of decoded icons, bounded by their estimated memory
+    """
+
+    def __init__(self, max_bytes: int, cost: Callable[[object], int] = icon_cost) -> None:
+        self.max_bytes = max_bytes
+        self.cost = cost
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict[Hashable, tuple[object, int]] = OrderedDict()
+
+    def get(self, key: Hashable, factory: Callable[[], T]) -> T:
+        if key in self._items:
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key][0]
+        self.misses += 1
+        value = factory()
+        if value is None:
+            return value
+        cost = self.cost(value)
+        self._items[key] = value, cost
+        self.bytes += cost
+        self.shrink()
+        return value
+
+    def shrink(self):
+        while self.bytes > self.max_bytes and self._items:
+            _, (_, cost) = self._items.popitem(last=False)
+            self.bytes -= cost
+
+    def resize(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.shrink()
+
+    def clear(self):
+        self._items.clear()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self) -> str:
+        return f"IconCache({len(self)} icons, {self.bytes}/{self.max_bytes} bytes, {self.hits} hits, {self.misses} misses)"
+
+
+icon_cache = IconCache(64 * 1024 * 1024)
@@ -0,0 +1,105 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Dict
+
+TITLES = "titles"  # url -> title, link is the favicon url of the page
+FAVICONS = "favicons"  # origin -> png, link is the url it is fetched from
+
+
+@dataclass
+class Entry:
+    value: str | bytes | None
+    link: str | None
+    etag: str | None = None
+    last_modified: str | None = None
+    fetched: float = field(default_factory=time.time)
+
+    def validators(self) -> Dict[str, str]:
+        """
+            headers of a conditional request
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def revalidated(self, headers) -> 'Entry':
+        """
+            the entry confirmed by a 304 response
+        """
+        return Entry(self.value, self.link,
+                     headers.get("ETag", self.etag),
+                     headers.get("Last-Modified", self.last_modified))
+
+
+class UrlCache:
+    """
+        titles by url and favicons by origin, kept in a sqlite file.
+        entries older than ttl seconds should be revalidated,
+        the least recently used are dropped when over max_bytes.
+        safe to use from several threads
+    """
+
+    def __init__(self, path: Path, ttl: float, max_bytes: int) -> None:
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None)
+        for table in [TITLES, FAVICONS]:
+            self._conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table}(
+                    key TEXT PRIMARY KEY,
+                    value BLOB,
+                    link TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched REAL,
+                    used REAL,
+                    size INTEGER)""")
+
+    def is_fresh(self, entry: Entry) -> bool:
+        return time.time() - entry.fetched < self.ttl
+
+    def get(self, table: str, key: str) -> Entry | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, link, etag, last_modified, fetched FROM {table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                f"UPDATE {table} SET used = ? WHERE key = ?", (time.time(), key))
+        return Entry(*row)
+
+    def put(self, table: str, key: str, entry: Entry):
+        size = len(key) + len(entry.value or "") + len(entry.link or "")
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {table} VALUES(?,?,?,?,?,?,?,?)",
+                (key, entry.value, entry.link, entry.etag, entry.last_modified, entry.fetched, time.time(), size))
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute(
+            f"SELECT (SELECT TOTAL(size) FROM {TITLES}) + (SELECT TOTAL(size) FROM {FAVICONS})").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(f"""
+            SELECT '{TITLES}', key, size, used FROM {TITLES}
+            UNION ALL
+            SELECT '{FAVICONS}', key, size, used FROM {FAVICONS}
+            ORDER BY used""").fetchall()
+        for table, key, size, _ in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+            total -= size
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
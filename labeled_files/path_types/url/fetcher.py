@@ -0,0 +1,156 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Tuple
+
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, QObject, Qt, Signal
+from PySide6.QtGui import QImage
+
+from .cache import FAVICONS, TITLES, Entry, UrlCache
+
+Metadata = Tuple[str | None, bytes | None]  # title, png of the favicon
+
+
+def scale_icon(content: bytes) -> bytes | None:
+    """
+        favicon of any format to png at most 32x32.
+        QImage, unlike QPixmap, can be used out of the GUI thread
+    """
+    image = QImage()
+    if not image.loadFromData(content):
+        return None
+    if image.width() > 32:
+        image = image.scaled(32, 32)
+    b = QByteArray()
+    buffer = QBuffer(b)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    buffer.close()
+    return b.data()
+
+
+def default_icon_url(url: str) -> str:
+    from urllib.parse import urlparse
+    parse_result = urlparse(url)
+    return f"{parse_result.scheme}://{parse_result.netloc}/favicon.ico"
+
+
+def parse_page(response) -> Tuple[str | None, str]:
+    """
+        title of the page and the url of its favicon.
+        an error page has no title
+    """
+    from bs4 import BeautifulSoup
+    from urllib.parse import urljoin
+    if not 200 <= response.status_code < 300:
+        return None, default_icon_url(response.url)
+    soup = BeautifulSoup(response.content, "html.parser")
+
+    title = soup.title
+    if title is not None:
+        title = title.text.strip() or None
+
+    icon_link = soup.find("link", rel="shortcut icon")
+    if icon_link is None:
+        icon_link = soup.find("link", rel="icon")
+
+    if icon_link is not None and icon_link.get("href"):
+        icon_url = urljoin(response.url, icon_link["href"])
+    else:
+        icon_url = default_icon_url(response.url)
+    return title, icon_url
+
+
+def fetch_metadata(session, url: str, timeout: float = 2, cache: UrlCache | None = None) -> Metadata:
+    """
+        title of the page and its favicon.
+        fresh entries in the cache are used without any request,
+        stale ones are revalidated by conditional requests, and used as
+        they are when the network or the server fails.
+        the title is kept if the favicon cannot be fetched
+    """
+    from urllib.parse import urlparse
+    page = cache.get(TITLES, url) if cache is not None else None
+    if page is None or not cache.is_fresh(page):
+        try:
+            ret = session.get(url, timeout=timeout,
+                              headers=page.validators() if page else {})
+        except Exception:
+            if page is None:
+                raise
+            ret = None
+        if ret is None or page is not None and ret.status_code >= 500:
+            pass  # the stale page, it is revalidated next time
+        elif page is not None and ret.status_code == 304:
+            page = page.revalidated(ret.headers)
+        else:
+            title, icon_url = parse_page(ret)
+            page = Entry(title, icon_url, ret.headers.get("ETag"),
+                         ret.headers.get("Last-Modified"))
+        if cache is not None and ret is not None and ret.status_code in (200, 304):
+            cache.put(TITLES, url, page)
+
+    parse_result = urlparse(url)
+    origin = f"{parse_result.scheme}://{parse_result.netloc}"
+    icon = cache.get(FAVICONS, origin) if cache is not None else None
+    if icon is None or not cache.is_fresh(icon):
+        stale = icon
+        if icon is not None and icon.link != page.link:
+            icon = None
+        try:
+            ret = session.get(page.link, timeout=timeout,
+                              headers=icon.validators() if icon else {})
+        except Exception:
+            # the stale favicon if any, it is tried again next time
+            return page.value, (stale.value or None) if stale is not None else None
+        if icon is not None and ret.status_code == 304:
+            icon = icon.revalidated(ret.headers)
+        else:
+            # a missing favicon is cached as well
+            png = scale_icon(ret.content) if ret.status_code == 200 else None
+            icon = Entry(png or b"", page.link, ret.headers.get("ETag"),
+                         ret.headers.get("Last-Modified"))
+        if cache is not None:
+            cache.put(FAVICONS, origin, icon)
+    return page.value, icon.value or None
+
+
+class UrlFetcher(QObject):
+    """
+        fetches metadata of urls on a bounded thread pool.
+        all requests share one session, so connections to a host are kept alive
+    """
+    fetched = Signal(object, object)  # callback, Metadata
+
+    def __init__(self, workers: int = 4, cache: UrlCache | None = None) -> None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        super().__init__()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="url")
+        self.cache = cache
+        self.fetched.connect(self.deliver, Qt.ConnectionType.QueuedConnection)
+
+    def submit(self, url: str) -> 'Future[Metadata]':
+        return self.pool.submit(fetch_metadata, self.session, url, cache=self.cache)
+
+    def fetch(self, url: str, callback: Callable[[str | None, bytes | None], None]):
+        """
+            callback is called in the thread of this object, with (None, None) on failure
+        """
+        def done(future: 'Future[Metadata]'):
+            if future.exception() is not None:
+                self.fetched.emit(callback, (None, None))
+            else:
+                self.fetched.emit(callback, future.result())
+        self.submit(url).add_done_callback(done)
+
+    def deliver(self, callback, metadata: Metadata):
+        callback(*metadata)
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -1,7 +1,26 @@
-from datetime import datetime
+from pathlib import Path
+from typing import Callable
+from ...core.ingest import file_from_url, get_placeholder_name
 from ..base import BasePathHandler, File
+from .cache import UrlCache
+from .fetcher import UrlFetcher
 from PySide6.QtGui import QIcon, QPixmap
-from PySide6.QtWidgets import QInputDialog
+from PySide6.QtWidgets import QApplication, QInputDialog, QStyle
+
+URL_CACHE_NAME = "url_cache.sqlite3"
+_fetcher: UrlFetcher | None = None
+
+
+def get_fetcher() -> UrlFetcher:
+    global _fetcher
+    if _fetcher is None:
+        from ...setting import setting
+        config = setting.config
+        _fetcher = UrlFetcher(cache=UrlCache(
+            Path(URL_CACHE_NAME),
+            config.url_cache_days * 24 * 3600,
+            config.url_cache_mb * 1024 * 1024))
+    return _fetcher
 
 
 class Handler(BasePathHandler):
@@ -20,21 +39,10 @@ class Handler(BasePathHandler):
 
     @classmethod
     def create_file_from_mime(cls, mime_path: str) -> File:
-        mime_path = mime_path.removesuffix('/')
-        title, pixmap = get_from_url(mime_path)
-        if not title:
-            title = mime_path.removeprefix("http://").removeprefix("https://")
-        return File(
-            None,
-            title or mime_path,
-            "url",
-            mime_path,
-            [],
-            datetime.now(),
-            datetime.now(),
-            cls.pixmap_to_b64(pixmap),
-            ""
-        )
+        """
+        title and icon are filled by fetch_details
+        """
+        return file_from_url(mime_path)
 
     @classmethod
     def create_file_able(cls, handler_name: str) -> bool:
@@ -57,9 +65,47 @@ class Handler(BasePathHandler):
         pass
 
     def get_default_icon(self) -> QIcon | None:
-        _, pixmap = get_from_url(self.file.path)
-        if pixmap is not None:
-            return QIcon(pixmap)
+        """
+            a placeholder, the favicon is fetched by fetch_default_icon
+        """
+        return QApplication.style().standardIcon(QStyle.StandardPixmap.SP_DriveNetIcon)
+
+    def fetch_default_icon(self, done: Callable[[QIcon | None], None]):
+        done(self.get_default_icon())
+
+        def fetched(title: str | None, png: bytes | None):
+            if png:
+                pixmap = QPixmap()
+                pixmap.loadFromData(png)
+                done(QIcon(pixmap))
+        get_fetcher().fetch(self.file.path, fetched)
+
+    def fetch_details(self, done: Callable[[File], None]):
+        from ...setting import setting
+        conn = setting.conn
+        file_id = self.file.id
+        url = self.file.path
+        placeholder = get_placeholder_name(url) or url
+
+        def update(title: str | None, png: bytes | None):
+            files = conn.fetch_files(
+                "SELECT * FROM files WHERE id = ?", (file_id,))
+            if not files:  # removed while fetching
+                return
+            f = files[0]
+            changed = False
+            if title and f.name == placeholder:
+                f.name = title
+                changed = True
+            if png and not f.icon:
+                f.icon = png
+                changed = True
+            if not changed:
+                return
+            conn.update_file(f)
+            if conn is setting.conn:
+                done(f)
+        get_fetcher().fetch(url, update)
 
     def open(self):
         import webbrowser
@@ -80,38 +126,3 @@ class Handler(BasePathHandler):
 
     def actual_name_get(self) -> str:
         return self.file.path
-
-
-def get_from_url(url: str):
-    import requests
-    from bs4 import BeautifulSoup
-    from urllib.parse import urlparse
-    ret = requests.get(url, timeout=2)
-    soup = BeautifulSoup(ret.content)
-
-    soup = BeautifulSoup(ret.content)
-    title = soup.title
-    if title is not None:
-        title = title.text
-
-    icon_link = soup.find("link", rel="shortcut icon")
-    if icon_link is None:
-        icon_link = soup.find("link", rel="icon")
-
-    if icon_link is not None:
-        icon_url = icon_link["href"].removeprefix('/')
-        if not icon_url.startswith("http"):
-            icon_url = f"{url}/{icon_url}"
-    else:
-        parse_result = urlparse(url)
-        icon_url = f"{parse_result.scheme}://{parse_result.netloc}/favicon.ico"
-    ret = requests.get(icon_url)
-    if ret.status_code == 200:
-        pixmap = QPixmap()
-        pixmap.loadFromData(ret.content)
-    else:
-        pixmap = None
-
-    if pixmap is not None and pixmap.width() > 32:
-        pixmap = pixmap.scaled(32, 32)
-    return title, pixmap
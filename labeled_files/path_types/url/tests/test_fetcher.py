@@ -0,0 +1,157 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice
+from PySide6.QtGui import QColor, QImage
+
+from ..cache import FAVICONS, TITLES, Entry, UrlCache
+from ..fetcher import UrlFetcher, fetch_metadata
+
+
+def make_png(size: int) -> bytes:
+    image = QImage(size, size, QImage.Format_ARGB32)
+    image.fill(QColor("red"))
+    b = QByteArray()
+    buffer = QBuffer(b)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    buffer.close()
+    return b.data()
+
+
+def serve(pages: dict, requests: list | None = None):
+    """
+        a local site, returns the server and the client ports it has seen.
+        pages are served with an ETag, or are (status, content),
+        requests records (path, status)
+    """
+    ports = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            ports.add(self.client_address[1])
+            if self.path not in pages:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            content = pages[self.path]
+            status = 200
+            if isinstance(content, tuple):
+                status, content = content
+            etag = f'"{hash(content)}"'
+            if self.headers.get("If-None-Match") == etag:
+                if requests is not None:
+                    requests.append((self.path, 304))
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if requests is not None:
+                requests.append((self.path, status))
+            self.send_response(status)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server, ports
+
+
+def test_fetch_metadata():
+    server, ports = serve({
+        "/a": b'<html><head><title> A page </title><link rel="icon" href="/icons/a.png"></head></html>',
+        "/b": b"<html><head><title>B</title></head></html>",
+        "/c": b"no html",
+        "/d": b'<title>D</title><link rel="icon" href="http://127.0.0.1:1/d.png">',
+        "/gone": (404, b"<title>404 Not Found</title>"),
+        "/icons/a.png": make_png(64),
+        "/favicon.ico": make_png(16),
+    })
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+    fetcher = UrlFetcher(1)
+    try:
+        title, png = fetcher.submit(f"{host}/a").result()
+        assert title == "A page"
+        image = QImage()
+        assert image.loadFromData(png)
+        assert image.width() == 32
+
+        title, png = fetcher.submit(f"{host}/b").result()
+        assert title == "B"
+        assert QImage.fromData(png).width() == 16
+
+        title, png = fetcher.submit(f"{host}/c").result()
+        assert title is None
+        # the session keeps the connection alive
+        assert len(ports) == 1
+
+        # the favicon cannot be fetched, the title is kept
+        assert fetcher.submit(f"{host}/d").result() == ("D", None)
+        # an error page is no title
+        title, png = fetcher.submit(f"{host}/gone").result()
+        assert title is None and png
+    finally:
+        fetcher.close()
+        server.shutdown()
+
+
+def test_fetch_metadata_cache(tmp_path):
+    requests = []
+    pages = {
+        "/a": b"<title>A</title>",
+        "/b": b"<title>B</title>",
+        "/favicon.ico": make_png(16),
+    }
+    server, _ = serve(pages, requests)
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+    cache = UrlCache(tmp_path / "cache.sqlite3", 3600, 1024 * 1024)
+    fetcher = UrlFetcher(1, cache)
+    try:
+        title, png = fetcher.submit(f"{host}/a").result()
+        assert title == "A" and png
+        assert requests == [("/a", 200), ("/favicon.ico", 200)]
+
+        # same url and same origin, nothing is requested
+        assert fetcher.submit(f"{host}/a").result() == (title, png)
+        fetcher.submit(f"{host}/b").result()
+        assert requests[2:] == [("/b", 200)]
+
+        # stale entries are revalidated
+        cache.ttl = 0
+        pages["/b"] = b"<title>B2</title>"
+        assert fetcher.submit(f"{host}/a").result() == (title, png)
+        assert fetcher.submit(f"{host}/b").result()[0] == "B2"
+        assert requests[3:] == [
+            ("/a", 304), ("/favicon.ico", 304),
+            ("/b", 200), ("/favicon.ico", 304)]
+
+        # stale entries are used when the server fails or is gone
+        pages["/a"] = (500, b"error")
+        assert fetcher.submit(f"{host}/a").result() == (title, png)
+        server.shutdown()
+        server.server_close()
+        assert fetcher.submit(f"{host}/b").result() == ("B2", png)
+    finally:
+        fetcher.close()
+        server.shutdown()
+
+
+def test_url_cache_evict(tmp_path):
+    cache = UrlCache(tmp_path / "cache.sqlite3", 3600, 120)
+    cache.put(FAVICONS, "http://a", Entry(b"x" * 40, "http://a/favicon.ico"))
+    cache.put(TITLES, "http://a/1", Entry("title", "http://a/favicon.ico"))
+    cache.get(FAVICONS, "http://a")
+    cache.put(TITLES, "http://a/2", Entry("title", "http://a/favicon.ico"))
+    # the least recently used title is dropped
+    assert cache.get(TITLES, "http://a/1") is None
+    assert cache.get(TITLES, "http://a/2").value == "title"
+    assert cache.get(FAVICONS, "http://a").value == b"x" * 40
+    cache.close()
@@ -108,7 +108,7 @@ class Handler(BasePathHandler):
 
     @classmethod
     def create_file(cls, handler_name: str) -> File:
-        return File(None, "新工作区", "vscode", "", [], datetime.now(), datetime.now(), cls.pixmap_to_b64(folder_pixmap), "")
+        return File(None, "新工作区", "vscode", "", [], datetime.now(), datetime.now(), cls.pixmap_to_png(folder_pixmap), "")
 
     def copy_to(self):
         raise NotImplementedError()
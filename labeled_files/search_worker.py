@@ -0,0 +1,133 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, TypeVar
+
+from PySide6 import QtCore
+
+from .core.search import first_page, search_tree_tags
+from .core.trace import context, span
+from .path_types import File
+from .sql import FileConnection, VisitView
+
+T = TypeVar("T")
+
+
+@dataclass
+class SearchRequest:
+    serial: int
+    files_path: Path
+    visit_paths: List[Path]
+    keyword: str
+    tags: List[str]
+    persistent: bool = True
+    pragmas: Dict[str, str | int] = field(default_factory=dict)
+
+
+@dataclass
+class SearchResult:
+    serial: int
+    keyword: str
+    tags: List[str]
+    files: List[File]
+    more: bool  # further pages can be requested by fetch_page
+
+
+class SearchWorker(QtCore.QObject):
+    """
+        runs searches in its own thread with its own read connections.
+        only the request numbered `latest` is worth running, an outdated
+        query is interrupted by the progress handler of its connection.
+        the first page is sent before the tags of the tag tree are counted
+    """
+    finished = QtCore.Signal(object)  # SearchResult
+    tags_ready = QtCore.Signal(int, object)  # serial, List[TreeTag]
+    page_ready = QtCore.Signal(int, object)  # serial, List[File]
+    failed = QtCore.Signal(object)  # exception
+
+    def __init__(self, page_size: int) -> None:
+        super().__init__()
+        self.page_size = page_size
+        self.latest = 0  # set by the GUI thread
+        self.running = 0
+        self.conn: FileConnection | None = None
+        self.visit_view: VisitView | None = None
+        self.pages: Iterator[List[File]] | None = None
+
+    def is_outdated(self) -> bool:
+        return self.running != self.latest
+
+    def connect_to(self, request: SearchRequest):
+        if self.conn is not None and self.conn.path == request.files_path \
+                and self.visit_view.paths == request.visit_paths:
+            return
+        self.close()
+        self.conn = FileConnection(
+            request.files_path, request.persistent, request.pragmas)
+        self.visit_view = VisitView(request.visit_paths)
+        self.visit_view.set_progress_handler(self.is_outdated, 1000)
+
+    def run(self, serial: int, name: str, func: Callable[[], T]) -> T | None:
+        """
+            func() in the span `name` on the connection, None if it fails
+            or the search is outdated. an outdated query is interrupted,
+            on the visit files too
+        """
+        try:
+            with context(serial=serial), span(name), self.conn.connect() as conn:
+                conn.set_progress_handler(self.is_outdated, 1000)
+                ret = func()
+        except Exception as e:
+            # an interrupted query raises, which is expected when outdated
+            if not self.is_outdated():
+                self.failed.emit(e)
+            return None
+        if self.is_outdated():
+            return None
+        return ret
+
+    @QtCore.Slot(object)
+    def search(self, request: SearchRequest):
+        if request.serial != self.latest:
+            return
+        self.running = request.serial
+        self.pages = None
+        try:
+            self.connect_to(request)
+        except Exception as e:
+            self.failed.emit(e)
+            return
+        ret = self.run(request.serial, "search.worker", lambda: first_page(
+            self.conn, self.visit_view, request.keyword, request.tags, self.page_size))
+        if ret is None:
+            return
+        files, self.pages = ret
+        self.finished.emit(SearchResult(
+            request.serial, request.keyword, request.tags,
+            files, len(files) == self.page_size))
+
+        tree_tags = self.run(request.serial, "search.worker_tags", lambda: search_tree_tags(
+            self.conn, self.visit_view, request.keyword, request.tags))
+        if tree_tags is not None:
+            self.tags_ready.emit(request.serial, tree_tags)
+
+    @QtCore.Slot(int)
+    def fetch_page(self, serial: int):
+        if serial != self.latest or self.pages is None:
+            return
+        self.running = serial
+        files = self.run(serial, "search.page", lambda: next(self.pages, []))
+        if files is None:
+            return
+        if len(files) < self.page_size:
+            self.pages = None
+        self.page_ready.emit(serial, files)
+
+    @QtCore.Slot()
+    def close(self):
+        self.pages = None
+        if self.conn is not None:
+            self.conn.close_db()
+            self.conn = None
+        if self.visit_view is not None:
+            self.visit_view.close_db()
+            self.visit_view = None
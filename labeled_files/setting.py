@@ -1,14 +1,9 @@
-from functools import cache, cached_property
-import json
+from functools import cache
 import os
 import pathlib
-import platform
-from typing import Callable, Dict, List, Tuple, Union
+from typing import List
 
-import dataclasses
-
-SQLITE_FILES_NAME = "LABELED_FILES.sqlite3"
-VERSION = "0.5.6"
+from .core.config import SQLITE_FILES_NAME, VERSION, Config
 
 
 import logging
@@ -47,15 +42,19 @@ class Setting:
         self.searched_tags: List[str] = []
 
     def connect_to(self, path: pathlib.Path):
-        from .sql import FileConnection, VisitConnection
-        self.conn = FileConnection(path / SQLITE_FILES_NAME)
+        from .core.workspace import Workspace
+        self.close()
+        workspace = Workspace(path, self.config)
+        self.conn = workspace.conn
+        self.visit_conn_w = workspace.visit_conn_w
+        self.visit_conns_r = workspace.visit_conns_r
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close_db()
+        for conn in self.visit_conns_r:
+            conn.close_db()
         self.visit_conns_r.clear()
-        w_name = self.config.get_sqlite_visit_name()
-        for vpath in path.glob("VISIT_TIME*.sqlite3"):
-            if vpath.name != w_name:
-                self.visit_conns_r.append(VisitConnection(vpath))
-        self.visit_conn_w = VisitConnection(path / w_name)
-        self.visit_conns_r.insert(0, self.visit_conn_w)
 
     def set_root(self, root: str):
         self.root_path = pathlib.Path(root).absolute()
@@ -80,30 +79,3 @@ class Setting:
 
 
 setting = Setting()
-
-
-@dataclasses.dataclass
-class Config:
-    default: str = ""
-    workspaces: Dict[str, str] = dataclasses.field(default_factory=dict)
-    hide_search_tag_in_result: bool = False
-    file_name_regex: bool = False
-    path_mapping: Dict[str, str] = dataclasses.field(default_factory=dict)
-    pc_name_override: str = ""
-
-    @cached_property
-    def path_convert(self):
-        return {pathlib.Path(k): pathlib.Path(v) for k, v in self.path_mapping.items()}
-
-    @classmethod
-    def from_json(cls, s: str):
-        d: dict = json.loads(s)
-        d = {k: v for k, v in d.items() if k in cls.__dataclass_fields__}
-        return cls(**d)
-
-    def get_sqlite_visit_name(self):
-        if self.pc_name_override:
-            name = self.pc_name_override
-        else:
-            name = platform.node()
-        return f"VISIT_TIME_{name}.sqlite3"
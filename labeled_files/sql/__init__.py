@@ -1,3 +1,4 @@
 from .base import on_close
 from .files import Connection as FileConnection, File
-from .visit_times import Connection as VisitConnection
\ No newline at end of file
+from .visit_times import Connection as VisitConnection
+from .visit_view import VisitView
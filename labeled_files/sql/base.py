@@ -3,37 +3,69 @@ from contextlib import contextmanager
 from pathlib import Path
 import sqlite3
 from weakref import  ReferenceType, ref
-from typing import List
-from PySide6.QtCore import QTimer
+from typing import Callable, Dict, List, Protocol, Tuple
 
 connections:List[ReferenceType['BaseConnection']] = []
 
+
+class IdleTimer(Protocol):
+    def start(self, msec: int): ...
+    def stop(self): ...
+    def isActive(self) -> bool: ...
+
+
+# makes the timer closing a connection after it is idle, the GUI uses a QTimer.
+# without it connections stay open until close_db, which suits short commands
+idle_timer_factory: Callable[[Callable[[], None]], IdleTimer] | None = None
+
 class BaseConnection(ABC):
-    def __init__(self, path: Path) -> None:
+    def __init__(self, path: Path, persistent: bool = False, pragmas: Dict[str, str | int] | None = None) -> None:
+        """
+            persistent: keep the connection open until `close_db`,
+                otherwise it is closed after 10 seconds idle
+            pragmas: applied to every new sqlite connection
+        """
         self.path = path
+        self.persistent = persistent
+        self.pragmas = pragmas or {}
         self._conn: sqlite3.Connection | None = None
-        self._timer = QTimer()
-        self._timer.timeout.connect(self.close_db)
+        self._depth = 0
+        self._timer = idle_timer_factory(
+            self.close_db) if idle_timer_factory else None
         if not path.exists():
             self.init_db()
         else:
             self.update_db()
         connections.append(ref(self))
 
+    def open_db(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        print("db connect", self.path)
+        for key, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {key} = {value}")
+        return conn
+
     @contextmanager
     def connect(self):
-        if self._conn:
-            yield self._conn
-            if self._timer.isActive():
-                self._timer.stop()
-                self._timer.start(10 * 1000)
-        else:
-            conn = self._conn = sqlite3.connect(self.path)
-            print("db connect", self.path)
-            with conn:
+        """
+            the outermost context commits on exit
+        """
+        if self._timer is not None and self._timer.isActive():
+            self._timer.stop()
+        if self._conn is None:
+            self._conn = self.open_db()
+        conn = self._conn
+        self._depth += 1
+        try:
+            if self._depth == 1:
+                with conn:
+                    yield conn
+            else:
                 yield conn
-            self._timer.start(10 * 1000)
-
+        finally:
+            self._depth -= 1
+            if not self._depth and not self.persistent and self._timer is not None:
+                self._timer.start(10 * 1000)
 
     def close_db(self):
         if self._conn:
@@ -41,7 +73,7 @@ class BaseConnection(ABC):
             self._conn.commit()
             self._conn.close()
             self._conn = None
-    
+
     def __del__(self):
         self.close_db()
 
@@ -58,10 +90,25 @@ class BaseConnection(ABC):
     def init_db(self):
         pass
 
+def is_current(conn: sqlite3.Connection, pending_keys: Tuple[str, ...] = ()) -> bool:
+    """
+        the database is of this version and has no migration to resume,
+        then the updaters are not imported at all
+    """
+    from ..core.config import VERSION
+    try:
+        return not conn.execute(
+            f'SELECT COUNT(*) FROM infos WHERE key = "version" AND value != ? OR key IN ({",".join("?" * len(pending_keys))})',
+            (VERSION, *pending_keys)).fetchone()[0]
+    except sqlite3.OperationalError:
+        # no infos table, older than 0.1.1
+        return False
+
+
 def on_close():
     for conn_ref in connections:
         conn = conn_ref()
         if conn is not None:
-            if conn._timer.isActive():
+            if conn._timer is not None and conn._timer.isActive():
                 conn._timer.stop()
-            conn.close_db()
\ No newline at end of file
+            conn.close_db()
@@ -1,17 +1,36 @@
+from collections import defaultdict
 from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
+from functools import cached_property
+import heapq
+import json
 import sqlite3
-from typing import Iterable, Union
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
 from inspect import cleandoc
 
-from . import files_updater
-from ..path_types import File
-from .base import BaseConnection
+from ..core.file import File, icon_hash
+from ..core.trace import span
+from .base import BaseConnection, is_current
+from .visit_view import VisitView
 
 file_types = {}
 
 
+def get_prefixes(tags: Iterable[str]) -> set[str]:
+    """
+        A/B/C -> A, A/B, A/B/C
+    """
+    prefixes = set()
+    for tag in tags:
+        ind = tag.find('/')
+        while ind > 0:
+            prefixes.add(tag[:ind])
+            ind = tag.find('/', ind + 1)
+        prefixes.add(tag)
+    return prefixes
+
+
 @dataclass
 class PinTag:
     tag: str
@@ -19,9 +38,100 @@ class PinTag:
     rank: int = 100
 
 
+def create_fts(conn: sqlite3.Connection) -> bool:
+    """
+        full text index over name, description and path, synced by triggers
+        return False if this sqlite is built without fts5 or trigram
+    """
+    try:
+        conn.execute(cleandoc("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+                name, description, path, tokenize = 'trigram')"""))
+    except sqlite3.OperationalError:
+        return False
+    conn.executescript(cleandoc("""
+        CREATE TRIGGER IF NOT EXISTS files_fts_insert AFTER INSERT ON files BEGIN
+            INSERT OR REPLACE INTO files_fts(rowid, name, description, path)
+                VALUES(new.id, new.name, new.description, new.path);
+        END;
+        CREATE TRIGGER IF NOT EXISTS files_fts_update AFTER UPDATE OF name, description, path ON files BEGIN
+            INSERT OR REPLACE INTO files_fts(rowid, name, description, path)
+                VALUES(new.id, new.name, new.description, new.path);
+        END;
+        CREATE TRIGGER IF NOT EXISTS files_fts_delete AFTER DELETE ON files BEGIN
+            DELETE FROM files_fts WHERE rowid = old.id;
+        END;"""))
+    return True
+
+
+def create_tag_nodes(conn: sqlite3.Connection):
+    """
+        distinct file count and latest vtime of every tag and tag prefix,
+        kept up to date with label_prefixes and files.vtime by triggers
+    """
+    # a broad tag has a file among the latest files, read through files_vtime,
+    # only a narrow one, cheap to scan, is scanned
+    latest = cleandoc("""
+        IFNULL(
+                    (SELECT vtime FROM (SELECT id, vtime FROM files ORDER BY vtime DESC LIMIT 1000) AS f
+                        WHERE EXISTS (SELECT 1 FROM label_prefixes WHERE prefix = {0} AND file_id = f.id)
+                        ORDER BY vtime DESC LIMIT 1),
+                    (SELECT MAX(files.vtime) FROM label_prefixes JOIN files ON files.id = label_prefixes.file_id
+                        WHERE prefix = {0}))""")
+    conn.executescript(cleandoc(f"""
+        CREATE TABLE IF NOT EXISTS tag_nodes(
+            path TEXT PRIMARY KEY,
+            distinct_file_count INTEGER,
+            last_vtime DATETIME) WITHOUT ROWID;
+        CREATE TRIGGER IF NOT EXISTS tag_nodes_insert AFTER INSERT ON label_prefixes BEGIN
+            INSERT INTO tag_nodes(path, distinct_file_count, last_vtime)
+                VALUES(new.prefix, 1, (SELECT vtime FROM files WHERE id = new.file_id))
+                ON CONFLICT(path) DO UPDATE SET
+                    distinct_file_count = distinct_file_count + 1,
+                    last_vtime = MAX(last_vtime, excluded.last_vtime);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tag_nodes_delete AFTER DELETE ON label_prefixes BEGIN
+            UPDATE tag_nodes SET distinct_file_count = distinct_file_count - 1 WHERE path = old.prefix;
+            DELETE FROM tag_nodes WHERE path = old.prefix AND distinct_file_count <= 0;
+            -- only the latest file leaving the tag needs a scan of the tag,
+            -- so the rows are deleted before their file
+            UPDATE tag_nodes SET last_vtime = {latest.format("old.prefix")}
+                WHERE path = old.prefix
+                    AND (SELECT vtime FROM files WHERE id = old.file_id) >= last_vtime;
+        END;
+        CREATE TRIGGER IF NOT EXISTS tag_nodes_vtime AFTER UPDATE OF vtime ON files BEGIN
+            UPDATE tag_nodes SET last_vtime = MAX(last_vtime, new.vtime)
+                WHERE path IN (SELECT prefix FROM label_prefixes WHERE file_id = new.id);
+            UPDATE tag_nodes SET last_vtime = {latest.format("tag_nodes.path")}
+                WHERE new.vtime < old.vtime AND last_vtime = old.vtime
+                    AND path IN (SELECT prefix FROM label_prefixes WHERE file_id = new.id);
+        END;"""))
+
+
+def rebuild_tag_nodes(conn: sqlite3.Connection):
+    """
+        tag_nodes and its triggers anew, filled from label_prefixes
+    """
+    conn.executescript(cleandoc("""
+        DROP TRIGGER IF EXISTS tag_nodes_insert;
+        DROP TRIGGER IF EXISTS tag_nodes_delete;
+        DROP TRIGGER IF EXISTS tag_nodes_vtime;
+        DROP TABLE IF EXISTS tag_nodes;"""))
+    create_tag_nodes(conn)
+    conn.execute(cleandoc("""
+        INSERT INTO tag_nodes(path, distinct_file_count, last_vtime)
+            SELECT prefix, COUNT(*), MAX(files.vtime)
+            FROM label_prefixes JOIN files ON files.id = label_prefixes.file_id
+            GROUP BY prefix"""))
+
+
+def escape_like(s: str) -> str:
+    return s.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
 class Connection(BaseConnection):
     def init_db(self):
-        from .. import setting
+        from ..core.config import VERSION
         with self.connect() as conn:
             conn.executescript(cleandoc(f"""
                 CREATE TABLE IF NOT EXISTS file_labels(
@@ -30,6 +140,12 @@ class Connection(BaseConnection):
                     PRIMARY KEY(file_id, label));
                 CREATE INDEX IF NOT EXISTS file_labels_label
                     ON file_labels(label, file_id);
+                CREATE TABLE IF NOT EXISTS label_prefixes(
+                    prefix TEXT,
+                    file_id INTEGER,
+                    PRIMARY KEY(prefix, file_id)) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS label_prefixes_file_id
+                    ON label_prefixes(file_id);
                 CREATE TABLE IF NOT EXISTS files(
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     name TEXT,
@@ -38,7 +154,11 @@ class Connection(BaseConnection):
                     ctime DATETIME,
                     vtime DATETIME,
                     icon TEXT,
-                    description TEXT);
+                    description TEXT,
+                    transfer TEXT DEFAULT '');
+                CREATE TABLE IF NOT EXISTS icons(
+                    hash TEXT PRIMARY KEY,
+                    png BLOB);
                 CREATE TABLE IF NOT EXISTS pin_label(
                     label TEXT PRIMARY KEY,
                     icon TEXT,
@@ -46,60 +166,456 @@ class Connection(BaseConnection):
                 CREATE TABLE IF NOT EXISTS infos(
                     key VARCHAR(20) PRIMARY KEY,
                     value TEXT);
-                INSERT INTO infos(key, value) VALUES("version", "{setting.VERSION}");
+                INSERT INTO infos(key, value) VALUES("version", "{VERSION}");
                 CREATE INDEX IF NOT EXISTS files_name
                     ON files(name);
                 CREATE INDEX IF NOT EXISTS files_ctime
                     ON files(ctime);
                 CREATE INDEX IF NOT EXISTS files_vtime
                     ON files(vtime); """))
+            create_fts(conn)
+            create_tag_nodes(conn)
 
     def update_db(self):
         with self.connect() as conn:
+            if is_current(conn, ("fts_backfill",)):
+                return
+            from . import files_updater
             files_updater.update(conn)
+            files_updater.resume(conn)
+
+    @property
+    def needs_vacuum(self) -> bool:
+        with self.connect() as conn:
+            return bool(conn.execute(
+                'SELECT COUNT(*) FROM infos WHERE key = "vacuum"').fetchone()[0])
+
+    def vacuum(self):
+        """
+            rewrite the file to give the space of deleted rows back,
+            it takes as long as copying the database
+        """
+        with self.connect() as conn:
+            conn.execute("VACUUM")
+            conn.execute('DELETE FROM infos WHERE key = "vacuum"')
+
+    @cached_property
+    def has_fts(self) -> bool:
+        with self.connect() as conn:
+            return bool(conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name = 'files_fts'").fetchone()[0])
 
     def fetch_files(self, *args, **kwds) -> list[File]:
         """
             please use SELECT * FROM
         """
-        with self.connect() as conn:
+        with self.connect() as conn, span("fetch_files") as s:
             cursor = conn.execute(*args, **kwds)
             cursor.row_factory = sqlite3.Row
-            row: sqlite3.Row
-            ret = []
-            for row in cursor:
-                ret.append(File(
+            rows: List[sqlite3.Row] = cursor.fetchall()
+            s.set(rows=len(rows))
+            return self.files_of_rows(rows)
+
+    def files_of_rows(self, rows: List[sqlite3.Row]) -> list[File]:
+        """
+            rows of SELECT * FROM files, other columns are ignored
+        """
+        with self.connect():
+            tags = self.fetch_files_tags([row['id'] for row in rows])
+            return [
+                File(
                     row['id'],
                     row['name'],
                     row['type'],
                     row['path'],
-                    self.fetch_file_tags(row['id']),
+                    tags.get(row['id'], []),
                     datetime.fromisoformat(row['ctime']),
                     datetime.fromisoformat(row['vtime']),
                     row['icon'],
-                    row['description']))
-            return ret
+                    row['description'],
+                    row['transfer'])
+                for row in rows]
+
+    def search_files(self, keyword: str, tags: List[str], limit: int | None = None) -> list[File]:
+        """
+            files under every tag in `tags` which contain `keyword` in name,
+            description or path.
+            keyword results are ranked by bm25 decayed by vtime,
+            or by vtime for keywords shorter than 3 characters
+        """
+        sql = "SELECT * FROM files"
+        conditions = []
+        params = []
+        order = ""
+        if keyword and len(keyword) >= 3 and self.has_fts:
+            # trigram tokenizer needs at least 3 characters
+            sql = "SELECT files.* FROM files_fts JOIN files ON files.id = files_fts.rowid"
+            conditions.append("files_fts MATCH ?")
+            params.append('"{}"'.format(keyword.replace('"', '""')))
+            order = cleandoc("""
+                ORDER BY bm25(files_fts, 4.0, 1.0, 2.0)
+                    / (1 + (julianday('now') - julianday(files.vtime)) / 30)""")
+        elif keyword:
+            conditions.append(
+                "(name LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\' OR path LIKE ? ESCAPE '\\')")
+            params.extend([f"%{escape_like(keyword)}%"] * 3)
+            order = " ORDER BY vtime DESC"
+        if tags:
+            tags = sorted(set(tags))
+            conditions.append(cleandoc(f"""
+                id IN (
+                    SELECT file_id FROM label_prefixes
+                    WHERE prefix IN ({','.join('?' * len(tags))})
+                    GROUP BY file_id
+                    HAVING COUNT(DISTINCT prefix) = ?)"""))
+            params.extend(tags)
+            params.append(len(tags))
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if limit is not None:
+            order += " LIMIT ?"
+            params.append(limit)
+        return self.fetch_files(sql + order, params)
+
+    def iter_search_files(self, keyword: str, tags: List[str], visit_view: VisitView, page_size: int = 200) -> Iterator[list[File]]:
+        """
+            pages of search_files, f.vtime is the effective visit time.
+            every page is a keyset query continuing after the rank, or the
+            effective visit time, of the last file
+        """
+        self.refresh_vtimes(visit_view)
+        fts = len(keyword) >= 3 and self.has_fts
+        params = {"page_size": page_size}
+        if fts:
+            with self.connect() as conn:
+                # fixed, so the rank of a file is the same on every page
+                params["now"] = conn.execute("SELECT julianday('now')").fetchone()[0]
+            params["match"] = '"{}"'.format(keyword.replace('"', '""'))
+            key = "bm25(files_fts, 4.0, 1.0, 2.0) / (1 + (:now - julianday(files.vtime)) / 30)"
+            sql = cleandoc(f"""
+                SELECT files.id, files.name, type, files.path, ctime, v.vtime AS vtime, icon,
+                    files.description, transfer, {key} AS key
+                FROM files_fts JOIN files ON files.id = files_fts.rowid
+                JOIN temp.file_vtime AS v ON v.file_id = files.id
+                WHERE files_fts MATCH :match AND {{}}
+                ORDER BY key, files.id LIMIT :page_size""")
+            after = f"({key}, files.id) > (:key, :id)"
+        else:
+            params["like"] = f"%{escape_like(keyword)}%"
+            sql = cleandoc("""
+                SELECT files.id, name, type, path, ctime, v.vtime AS vtime, icon, description, transfer,
+                    v.vtime AS key
+                FROM temp.file_vtime AS v JOIN files ON files.id = v.file_id
+                WHERE (name LIKE :like ESCAPE '\\' OR description LIKE :like ESCAPE '\\'
+                    OR path LIKE :like ESCAPE '\\') AND {}
+                ORDER BY v.vtime DESC, v.file_id DESC LIMIT :page_size""")
+            after = "(v.vtime, v.file_id) < (:key, :id)"
+        conditions = []
+        if tags:
+            tags = sorted(set(tags))
+            conditions.append(cleandoc(f"""
+                files.id IN (
+                    SELECT file_id FROM label_prefixes
+                    WHERE prefix IN ({','.join(f':tag{i}' for i in range(len(tags)))})
+                    GROUP BY file_id
+                    HAVING COUNT(DISTINCT prefix) = :tag_count)"""))
+            params.update((f"tag{i}", tag) for i, tag in enumerate(tags))
+            params["tag_count"] = len(tags)
+        first = True
+        while True:
+            with self.connect() as conn, span("fetch_files") as s:
+                cursor = conn.execute(
+                    sql.format(" AND ".join(conditions if first else [after, *conditions]) or "true"),
+                    params)
+                cursor.row_factory = sqlite3.Row
+                rows: List[sqlite3.Row] = cursor.fetchall()
+                s.set(rows=len(rows))
+                files = self.files_of_rows(rows)
+            if not files:
+                return
+            yield files
+            if len(files) < page_size:
+                return
+            first = False
+            params["key"], params["id"] = rows[-1]["key"], rows[-1]["id"]
+
+    def refresh_vtimes(self, visit_view: VisitView):
+        """
+            temp.file_vtime holds the effective visit time of every file,
+            the latest of files.vtime and the visits of all PCs.
+            only files and visits added since the last call are read.
+            commits, so call it out of a write transaction
+        """
+        with self.connect() as conn:
+            created = not conn.execute(
+                "SELECT COUNT(*) FROM sqlite_temp_master WHERE name = 'file_vtime'").fetchone()[0]
+            if created:
+                conn.execute(cleandoc("""
+                    CREATE TEMP TABLE file_vtime(
+                        file_id INTEGER PRIMARY KEY,
+                        vtime DATETIME)"""))
+                self._vtime_marks = 0, {}
+            last_id, visit_marks = self._vtime_marks
+            upsert = cleandoc("""
+                INSERT INTO temp.file_vtime(file_id, vtime) {}
+                ON CONFLICT(file_id) DO UPDATE SET vtime = MAX(vtime, excluded.vtime)""")
+            conn.execute(
+                upsert.format("SELECT id, vtime FROM files WHERE id > ?"), (last_id,))
+            with span("search.visits") as s:
+                visits, visit_marks = visit_view.get_visits_since(visit_marks)
+                conn.executemany(upsert.format("VALUES(?,?)"), visits)
+                s.set(rows=len(visits))
+            last_id = conn.execute(
+                "SELECT MAX(id) FROM files").fetchone()[0] or last_id
+            # faster to index after the first bulk load
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS temp.file_vtime_vtime ON file_vtime(vtime, file_id)")
+            # an interrupted search rolls back its transaction, but not the
+            # table, so the rows are committed before the marks move
+            conn.commit()
+            self._vtime_marks = last_id, visit_marks
+
+    def iter_files(self, tags: List[str], visit_view: VisitView, page_size: int = 200) -> Iterator[list[File]]:
+        """
+            pages of files under every tag in `tags`, ordered by effective
+            visit time, newest first. f.vtime is the effective visit time.
+            every page is a keyset query continuing after the last file,
+            on the visit times read for the first page
+        """
+        self.refresh_vtimes(visit_view)
+        conditions = [
+            "EXISTS (SELECT 1 FROM label_prefixes WHERE prefix = ? AND file_id = v.file_id)"] * len(tags)
+        sql = cleandoc("""
+            SELECT files.id, name, type, path, ctime, v.vtime AS vtime, icon, description, transfer
+            FROM temp.file_vtime AS v JOIN files ON files.id = v.file_id
+            WHERE {}
+            ORDER BY v.vtime DESC, v.file_id DESC LIMIT ?""")
+        last = None
+        while True:
+            with self.connect() as conn, span("fetch_files") as s:
+                if last is None:
+                    cursor = conn.execute(
+                        sql.format(" AND ".join(conditions) or "true"),
+                        [*tags, page_size])
+                else:
+                    cursor = conn.execute(
+                        sql.format(" AND ".join(
+                            ["(v.vtime, v.file_id) < (?, ?)", *conditions])),
+                        [*last, *tags, page_size])
+                cursor.row_factory = sqlite3.Row
+                rows: List[sqlite3.Row] = cursor.fetchall()
+                s.set(rows=len(rows))
+                files = self.files_of_rows(rows)
+            if not files:
+                return
+            yield files
+            if len(files) < page_size:
+                return
+            # the stored text, a datetime may not print the same
+            last = rows[-1]["vtime"], rows[-1]["id"]
+
+    def latest_files(self, tags: List[str], visit_view: VisitView, limit: int) -> list[File]:
+        """
+            the first page of iter_files for a single query, without
+            temp.file_vtime. the files under the tags are ordered by their
+            effective visit time, f.vtime
+        """
+        if not tags:
+            return self.latest_visited(visit_view, limit)
+        tags = sorted(set(tags))
+        with self.connect() as conn:
+            vtimes = dict(conn.execute(cleandoc(f"""
+                SELECT id, vtime FROM files WHERE id IN (
+                    SELECT file_id FROM label_prefixes
+                    WHERE prefix IN ({','.join('?' * len(tags))})
+                    GROUP BY file_id
+                    HAVING COUNT(DISTINCT prefix) = ?)"""), [*tags, len(tags)]))
+        # the latest visits are read until older ones cannot be shown,
+        # or the visits of every file under the tags if they are fewer
+        count = limit
+        while len(vtimes) > limit:
+            visited = visit_view.get_files_by_time(count)
+            for file_id, time in visited:
+                if file_id in vtimes:
+                    vtimes[file_id] = max(vtimes[file_id], str(time))
+            last = heapq.nlargest(limit, vtimes.values())[-1]
+            if len(visited) < count or str(visited[-1][1]) <= last:
+                return self.fetch_shown(vtimes, limit)
+            if count >= len(vtimes):
+                break
+            count *= 4
+        for file_id, time in visit_view.get_file_times(list(vtimes)).items():
+            vtimes[file_id] = max(vtimes[file_id], str(time))
+        return self.fetch_shown(vtimes, limit)
+
+    def latest_visited(self, visit_view: VisitView, limit: int) -> list[File]:
+        """
+            latest_files of all files, the latest by files.vtime
+            and the latest visited ones
+        """
+        with self.connect() as conn:
+            vtimes = dict(conn.execute(
+                "SELECT id, vtime FROM files ORDER BY vtime DESC, id DESC LIMIT ?", (limit,)))
+        for file_id, time in visit_view.get_files_by_time(limit):
+            vtimes[file_id] = max(vtimes.get(file_id, ""), str(time))
+        # a visited file may be deleted
+        return self.fetch_shown(vtimes, limit)
+
+    def fetch_shown(self, vtimes: Dict[int, str], limit: int) -> list[File]:
+        """
+            the `limit` latest of the files, by the effective visit times in `vtimes`
+        """
+        shown = sorted(((vtime, file_id) for file_id, vtime in vtimes.items()), reverse=True)
+        files = []
+        while shown and len(files) < limit:
+            batch, shown = shown[:limit - len(files)], shown[limit - len(files):]
+            found = {f.id: f for f in self.fetch_files(
+                "SELECT * FROM files WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps([file_id for _, file_id in batch]),))}
+            for vtime, file_id in batch:
+                if file_id in found:
+                    f = found[file_id]
+                    f.vtime = datetime.fromisoformat(vtime)
+                    files.append(f)
+        return files
+
+    def count_tags(self, tags: List[str], keyword: str = "") -> List[Tuple[str, int, datetime]]:
+        """
+            tag or tag prefix, distinct file count and latest effective visit
+            time of every tag of the files search_files finds.
+            call refresh_vtimes first
+        """
+        conditions = []
+        params = []
+        if keyword and len(keyword) >= 3 and self.has_fts:
+            conditions.append("file_id IN (SELECT rowid FROM files_fts WHERE files_fts MATCH ?)")
+            params.append('"{}"'.format(keyword.replace('"', '""')))
+        elif keyword:
+            conditions.append(cleandoc("""
+                file_id IN (
+                    SELECT id FROM files
+                    WHERE name LIKE ?1 ESCAPE '\\' OR description LIKE ?1 ESCAPE '\\' OR path LIKE ?1 ESCAPE '\\')"""))
+            params.append(f"%{escape_like(keyword)}%")
+        if tags:
+            tags = sorted(set(tags))
+            conditions.append(cleandoc(f"""
+                file_id IN (
+                    SELECT file_id FROM label_prefixes
+                    WHERE prefix IN ({','.join('?' * len(tags))})
+                    GROUP BY file_id
+                    HAVING COUNT(DISTINCT prefix) = ?)"""))
+            params.extend(tags)
+            params.append(len(tags))
+        with self.connect() as conn:
+            return [
+                (label, count, datetime.fromisoformat(vtime))
+                for label, count, vtime in conn.execute(cleandoc(f"""
+                    SELECT prefix, COUNT(*), MAX(v.vtime)
+                    FROM label_prefixes JOIN temp.file_vtime AS v USING(file_id)
+                    WHERE {" AND ".join(conditions) or "true"}
+                    GROUP BY prefix"""), params)]
+
+    def fetch_tag_nodes(self) -> List[Tuple[str, int, datetime]]:
+        """
+            every tag and tag prefix with its distinct file count and latest vtime
+        """
+        with self.connect() as conn:
+            return [
+                (path, count, datetime.fromisoformat(vtime) if vtime else datetime(1970, 1, 1))
+                for path, count, vtime in conn.execute(
+                    "SELECT path, distinct_file_count, last_vtime FROM tag_nodes")]
 
     def fetch_file_tags(self, file_id: int) -> list[str]:
         with self.connect() as conn:
             return [tag for tag, in conn.execute("SELECT label FROM file_labels WHERE file_id = ?", (file_id, ))]
 
+    def fetch_files_tags(self, file_ids: List[int]) -> Dict[int, List[str]]:
+        """
+            tags of all given files in one query
+        """
+        tags: Dict[int, List[str]] = defaultdict(list)
+        if not file_ids:
+            return tags
+        with self.connect() as conn:
+            for file_id, tag in conn.execute(
+                    "SELECT file_id, label FROM file_labels WHERE file_id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(file_ids),)):
+                tags[file_id].append(tag)
+        return tags
+
+    def put_icon(self, png: bytes) -> str:
+        """
+            store png in the icons table, return its hash
+        """
+        key = icon_hash(png)
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO icons(hash, png) VALUES(?,?)", (key, png))
+        return key
+
+    def get_icon(self, key: str) -> bytes | None:
+        with self.connect() as conn:
+            ret = conn.execute(
+                "SELECT png FROM icons WHERE hash = ?", (key,)).fetchone()
+            return ret[0] if ret else None
+
+    def store_file_icon(self, f: File):
+        """
+            write png bytes of f.icon to the icons table and replace them by the hash
+        """
+        if isinstance(f.icon, bytes):
+            f.icon = self.put_icon(f.icon) if f.icon else ""
+
     def insert_file(self, f: File):
+        self.insert_files([f])
+
+    def insert_files(self, files: List[File]):
+        """
+            insert files with their icons and tags in one transaction,
+            f.id and f.vtime are set
+        """
+        if not files:
+            return
+        now = datetime.now()
+        pngs: Dict[str, bytes] = {}
+        for f in files:
+            f.vtime = now
+            if isinstance(f.icon, bytes):
+                if f.icon:
+                    key = icon_hash(f.icon)
+                    pngs[key] = f.icon
+                    f.icon = key
+                else:
+                    f.icon = ""
         with self.connect() as conn:
-            f.vtime = datetime.now()
-            cur = conn.execute(
-                f"INSERT INTO files(name, type, path, ctime, vtime, icon, description) VALUES(?,?,?,?,?,?,?)",
-                (f.name, f.type, f.path, str(f.ctime), str(f.vtime), f.icon, f.description))
-            f.id = cur.lastrowid
-            self.update_file_tags(f.id, f.tags)
+            conn.executemany(
+                "INSERT OR IGNORE INTO icons(hash, png) VALUES(?,?)", pngs.items())
+            # one row at a time for its id, sqlite does not promise
+            # consecutive ids to the rows of one statement
+            for f in files:
+                f.id = conn.execute(
+                    "INSERT INTO files(name, type, path, ctime, vtime, icon, description, transfer) VALUES(?,?,?,?,?,?,?,?)",
+                    (f.name, f.type, f.path, str(f.ctime), str(f.vtime), f.icon, f.description, f.transfer)).lastrowid
+            conn.executemany(
+                "INSERT INTO file_labels(file_id, label) VALUES(?,?)",
+                [(f.id, tag) for f in files for tag in set(f.tags)])
+            conn.executemany(
+                "INSERT INTO label_prefixes(file_id, prefix) VALUES(?,?)",
+                [(f.id, prefix) for f in files for prefix in get_prefixes(f.tags)])
 
     def delete_file(self, file_ids: list[str]):
         if not file_ids:
             return
         with self.connect() as conn:
             ids = ",".join(str(id) for id in file_ids)
-            conn.execute(f"DELETE FROM files WHERE id in ({ids})")
+            # the triggers of tag_nodes read the vtime of the file. oldest
+            # first, a tag looks for its new latest file once, not once per
+            # deleted file newer than the rest
+            conn.executemany(
+                "DELETE FROM label_prefixes WHERE file_id = ?",
+                conn.execute(f"SELECT id FROM files WHERE id in ({ids}) ORDER BY vtime"))
             conn.execute(f"DELETE FROM file_labels WHERE file_id in ({ids})")
+            conn.execute(f"DELETE FROM files WHERE id in ({ids})")
 
     def update_file_tags(self, file_id: int, new_tags: Iterable[str]):
         with self.connect() as conn:
@@ -113,9 +629,18 @@ class Connection(BaseConnection):
                 conn.executemany(
                     "DELETE FROM file_labels WHERE file_id = ? AND label = ?",
                     [(file_id, tag) for tag in tags - new_tags])
+                prefixes = get_prefixes(tags)
+                new_prefixes = get_prefixes(new_tags)
+                conn.executemany(
+                    "INSERT INTO label_prefixes(file_id, prefix) VALUES(?,?)",
+                    [(file_id, prefix) for prefix in new_prefixes - prefixes])
+                conn.executemany(
+                    "DELETE FROM label_prefixes WHERE file_id = ? AND prefix = ?",
+                    [(file_id, prefix) for prefix in prefixes - new_prefixes])
 
     def update_file(self, file: File):
         with self.connect() as conn:
+            self.store_file_icon(file)
             conn.execute(
                 "UPDATE files SET name = ?, path = ?, ctime = ?, icon = ?, description = ? WHERE id = ?", (file.name, file.path, str(file.ctime), file.icon, file.description, file.id))
             self.update_file_tags(file.id, file.tags)
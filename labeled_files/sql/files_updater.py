@@ -1,9 +1,13 @@
 
+import base64
+import binascii
 import sqlite3
 from typing import Callable, List, Tuple
 
 from packaging.version import Version
 
+from ..core.config import VERSION
+
 updaters: List[Tuple[Version, Callable[[sqlite3.Connection], None]]] = []
 
 
@@ -63,6 +67,112 @@ CREATE TABLE IF NOT EXISTS pin_label(
     conn.execute('UPDATE infos SET value = "0.3.3" WHERE key = "version"')
 
 
+@Register(Version("0.6.0"))
+def update_to_0_6_0(conn: sqlite3.Connection):
+    from .files import get_prefixes
+    conn.executescript("""
+CREATE TABLE IF NOT EXISTS label_prefixes(
+    prefix TEXT,
+    file_id INTEGER,
+    PRIMARY KEY(prefix, file_id)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS label_prefixes_file_id
+    ON label_prefixes(file_id);
+    """)
+    file_tags = {}
+    for file_id, label in conn.execute("SELECT file_id, label FROM file_labels"):
+        file_tags.setdefault(file_id, []).append(label)
+    conn.executemany(
+        "INSERT OR IGNORE INTO label_prefixes(file_id, prefix) VALUES(?,?)",
+        ((file_id, prefix)
+         for file_id, tags in file_tags.items()
+         for prefix in get_prefixes(tags)))
+    conn.execute('UPDATE infos SET value = "0.6.0" WHERE key = "version"')
+
+
+@Register(Version("0.6.1"))
+def update_to_0_6_1(conn: sqlite3.Connection):
+    from .files import create_fts
+    if create_fts(conn):
+        # files are indexed in batches by `resume`, from the newest to the oldest
+        conn.execute(
+            'INSERT INTO infos(key, value) SELECT "fts_backfill", MAX(id) FROM files')
+    conn.execute('UPDATE infos SET value = "0.6.1" WHERE key = "version"')
+
+
+@Register(Version("0.6.2"))
+def update_to_0_6_2(conn: sqlite3.Connection):
+    from ..core.file import icon_hash
+    conn.execute("""
+CREATE TABLE IF NOT EXISTS icons(
+    hash TEXT PRIMARY KEY,
+    png BLOB);
+    """)
+    files = []
+    icons = {}
+    for id, icon in conn.execute("SELECT id, icon FROM files WHERE icon IS NOT NULL AND icon != ''"):
+        try:
+            png = base64.b64decode(icon)
+        except binascii.Error:
+            png = b""
+        if png:
+            key = icon_hash(png)
+            icons[key] = png
+        else:
+            key = ""
+        files.append((key, id))
+    conn.executemany(
+        "INSERT OR IGNORE INTO icons(hash, png) VALUES(?,?)", icons.items())
+    conn.executemany("UPDATE files SET icon = ? WHERE id = ?", files)
+    # the space of base64 icons is given back by Connection.vacuum,
+    # a full rewrite of the file is not run at startup
+    conn.execute('INSERT OR REPLACE INTO infos(key, value) VALUES("vacuum", "")')
+    conn.execute('UPDATE infos SET value = "0.6.2" WHERE key = "version"')
+
+
+@Register(Version("0.6.3"))
+def update_to_0_6_3(conn: sqlite3.Connection):
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(files)")]
+    if "transfer" not in columns:
+        conn.execute("ALTER TABLE files ADD COLUMN transfer TEXT DEFAULT ''")
+    conn.execute('UPDATE infos SET value = "0.6.3" WHERE key = "version"')
+
+
+@Register(Version("0.6.4"))
+def update_to_0_6_4(conn: sqlite3.Connection):
+    from .files import rebuild_tag_nodes
+    rebuild_tag_nodes(conn)
+    conn.execute('UPDATE infos SET value = "0.6.4" WHERE key = "version"')
+
+
+def resume(conn: sqlite3.Connection, batch: int = 5000):
+    """
+        continue long running migrations, committing after every batch
+        so an interrupted one goes on at the next start
+    """
+    while True:
+        ret = conn.execute(
+            'SELECT value FROM infos WHERE key = "fts_backfill"').fetchone()
+        if ret is None:
+            return
+        if ret[0] is None:
+            bottom = None
+        else:
+            last_id = int(ret[0])
+            bottom = conn.execute(
+                "SELECT MIN(id) FROM (SELECT id FROM files WHERE id <= ? ORDER BY id DESC LIMIT ?)",
+                (last_id, batch)).fetchone()[0]
+        with conn:
+            if bottom is None:
+                conn.execute('DELETE FROM infos WHERE key = "fts_backfill"')
+            else:
+                conn.execute(
+                    """INSERT OR REPLACE INTO files_fts(rowid, name, description, path)
+                    SELECT id, name, description, path FROM files WHERE id BETWEEN ? AND ?""",
+                    (bottom, last_id))
+                conn.execute(
+                    'UPDATE infos SET value = ? WHERE key = "fts_backfill"', (bottom - 1,))
+
+
 def update(conn: sqlite3.Connection):
     updaters.sort(key=lambda v: v[0])
 
@@ -73,9 +183,12 @@ def update(conn: sqlite3.Connection):
         version = "0.0.0"
     version = Version(version)
 
-    if not updaters or updaters[-1][0] <= version:
-        return
     for ver, updater in updaters:
         if ver > version:
             with conn:
                 updater(conn)
+    # also when no updater applies, so is_current holds from the next start
+    if version < Version(VERSION):
+        with conn:
+            conn.execute(
+                'UPDATE infos SET value = ? WHERE key = "version"', (VERSION,))
@@ -3,17 +3,15 @@ from datetime import datetime
 from inspect import cleandoc
 from pathlib import Path
 import sqlite3
-from typing import List
+from typing import Dict, List
 
 
-from .base import BaseConnection
-from ..path_types import File
-from . import visit_updater
+from .base import BaseConnection, is_current
 
 
 class Connection(BaseConnection):
     def init_db(self):
-        from .. import setting
+        from ..core.config import VERSION
         with self.connect() as conn:
             conn.executescript(cleandoc(f"""
                 CREATE TABLE IF NOT EXISTS file_visit(
@@ -29,11 +27,14 @@ class Connection(BaseConnection):
                     key VARCHAR(20) PRIMARY KEY,
                     value TEXT);
                 INSERT INTO infos(key, value)
-                    VALUES("version", "{setting.VERSION}");
+                    VALUES("version", "{VERSION}");
             """))
 
     def update_db(self):
         with self.connect() as conn:
+            if is_current(conn):
+                return
+            from . import visit_updater
             visit_updater.update(conn)
 
     def visit_file(self, file_id: int, tags: List[str]):
@@ -63,6 +64,12 @@ class Connection(BaseConnection):
             "SELECT time FROM tag_visit WHERE tag = ?",
             tag)
 
+    def get_tag_times(self) -> Dict[str, datetime]:
+        with self.connect() as conn:
+            return {
+                tag: datetime.fromisoformat(time)
+                for tag, time in conn.execute("SELECT tag, time FROM tag_visit")}
+
     def get_files_by_time(self, limit: int):
         with self.connect() as conn:
             return [
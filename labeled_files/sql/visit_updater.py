@@ -4,6 +4,8 @@ from typing import Callable, List, Tuple
 
 from packaging.version import Version
 
+from ..core.config import VERSION
+
 updaters: List[Tuple[Version, Callable[[sqlite3.Connection], None]]] = []
 
 
@@ -19,9 +21,12 @@ def update(conn:sqlite3.Connection):
     ).fetchone()[0]
     version = Version(version)
 
-    if not updaters or updaters[-1][0] <=version:
-        return
     for ver, updater in updaters:
-        if ver>version:
+        if ver > version:
             with conn:
-                updater(conn)
\ No newline at end of file
+                updater(conn)
+    # also when no updater applies, so is_current holds from the next start
+    if version < Version(VERSION):
+        with conn:
+            conn.execute(
+                'UPDATE infos SET value = ? WHERE key = "version"', (VERSION,))
\ No newline at end of file
@@ -0,0 +1,120 @@
+from datetime import datetime
+import json
+from pathlib import Path
+import sqlite3
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+class VisitView:
+    """
+        all VISIT_TIME_*.sqlite3 attached read-only to in-memory connections,
+        so visit times of every PC are merged by one query.
+        each connection attaches at most SQLITE_LIMIT_ATTACHED files
+    """
+
+    def __init__(self, paths: List[Path]) -> None:
+        self.paths = paths
+        # connection, {schema: path}
+        self._conns: List[Tuple[sqlite3.Connection, Dict[str, Path]]] = []
+        self._progress_handler: Tuple[Callable[[], bool], int] | None = None
+
+    def set_progress_handler(self, handler: Callable[[], bool] | None, n: int):
+        """
+            as sqlite3.Connection.set_progress_handler, for every connection
+        """
+        self._progress_handler = (handler, n) if handler is not None else None
+        for conn, _ in self._conns:
+            conn.set_progress_handler(handler, n)
+
+    def open_db(self):
+        paths = list(self.paths)
+        while paths:
+            # the attached files are uris only if the connection is opened as one
+            conn = sqlite3.connect(":memory:", uri=True)
+            if self._progress_handler is not None:
+                conn.set_progress_handler(*self._progress_handler)
+            limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+            schemas = {}
+            for i, path in enumerate(paths[:limit]):
+                conn.execute(f"ATTACH DATABASE ? AS v{i}",
+                             (f"{path.absolute().as_uri()}?mode=ro",))
+                schemas[f"v{i}"] = path
+            paths = paths[limit:]
+            self._conns.append((conn, schemas))
+            print("db attach", len(schemas), "visit files")
+
+    def close_db(self):
+        for conn, _ in self._conns:
+            conn.close()
+        self._conns.clear()
+
+    def execute_union(self, select: str, outer: str, params=()) -> Iterable[Tuple]:
+        """
+            `select` is formatted with every attached {schema} and joined
+            by UNION ALL as `union` in `outer`.
+            results of all connections are concatenated
+        """
+        if not self._conns:
+            self.open_db()
+        for conn, schemas in self._conns:
+            union = " UNION ALL ".join(
+                select.format(schema=schema) for schema in schemas)
+            yield from conn.execute(outer.format(union=union), params)
+
+    @staticmethod
+    def merge_max(rows: Iterable[Tuple]) -> Dict:
+        ret = {}
+        for key, time in rows:
+            if ret.get(key, "") < time:
+                ret[key] = time
+        return {key: datetime.fromisoformat(time) for key, time in ret.items()}
+
+    def get_file_times(self, file_ids: List[int]) -> Dict[int, datetime]:
+        """
+            latest visit of the given files on any PC
+        """
+        if not file_ids:
+            return {}
+        return self.merge_max(self.execute_union(
+            "SELECT file_id, time FROM {schema}.file_visit WHERE file_id IN (SELECT value FROM json_each(?1))",
+            "SELECT file_id, MAX(time) FROM ({union}) GROUP BY file_id",
+            (json.dumps(file_ids),)))
+
+    def get_files_by_time(self, limit: int) -> List[Tuple[int, datetime]]:
+        """
+            the latest visited files of all PCs
+        """
+        times = self.merge_max(self.execute_union(
+            "SELECT * FROM (SELECT file_id, time FROM {schema}.file_visit ORDER BY time DESC LIMIT ?1)",
+            "SELECT file_id, MAX(time) FROM ({union}) GROUP BY file_id",
+            (limit,)))
+        return sorted(times.items(), key=lambda v: v[1], reverse=True)[:limit]
+
+    def get_visits_since(self, marks: Dict[str, str]) -> Tuple[List[Tuple[int, str]], Dict[str, str]]:
+        """
+            latest visit of the files visited after marks[path] in every file.
+            return the visits and the marks to pass next time
+        """
+        if not self._conns:
+            self.open_db()
+        visits: Dict[int, str] = {}
+        new_marks = {}
+        for conn, schemas in self._conns:
+            for schema, path in schemas.items():
+                mark = marks.get(str(path), "")
+                rows = conn.execute(
+                    f"SELECT file_id, time FROM {schema}.file_visit WHERE time > ?", (mark,)).fetchall()
+                for file_id, time in rows:
+                    if visits.get(file_id, "") < time:
+                        visits[file_id] = time
+                new_marks[str(path)] = max(
+                    (time for _, time in rows), default=mark)
+        return list(visits.items()), new_marks
+
+    def get_tag_times(self) -> Dict[str, datetime]:
+        """
+            latest visit of every tag on any PC
+        """
+        return self.merge_max(self.execute_union(
+            "SELECT tag, time FROM {schema}.tag_visit",
+            "SELECT tag, MAX(time) FROM ({union}) GROUP BY tag"))
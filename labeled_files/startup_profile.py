@@ -0,0 +1,129 @@
+"""
+    python main.py --profile-startup
+
+    runs the window once under python -X importtime, reports the import time
+    by package and the time of each startup step up to the first paint
+"""
+from collections import defaultdict
+import os
+from pathlib import Path
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from PySide6 import QtCore
+
+FLAG = "--profile-startup"
+MARKS_ENV = "LABELED_FILES_STARTUP_MARKS"  # file the steps are written to
+TIMEOUT = 10000  # ms, quit even if no results come
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+\d+ \| *(\S+)")
+
+
+class StartupMarks(QtCore.QObject):
+    """
+        in the profiled process, writes the time of each step since start,
+        quits after the window is painted and the first results are shown
+    """
+
+    def __init__(self, start: float) -> None:
+        super().__init__()
+        self.start = start
+        self.out = open(os.environ[MARKS_ENV], "a", encoding="utf-8")
+        self.painted = False
+        self.results = False
+        self.wait_results = False
+
+    def mark(self, name: str):
+        ms = (time.perf_counter() - self.start) * 1000
+        self.out.write(f"{ms:.1f} {name}\n")
+        self.out.flush()
+
+    def watch(self, win):
+        """
+            call before the first search, wait_results is set once it is known
+            whether there is a workspace to search
+        """
+        win.installEventFilter(self)
+        win.search_worker.finished.connect(
+            self.results_shown, QtCore.Qt.ConnectionType.QueuedConnection)
+        QtCore.QTimer.singleShot(TIMEOUT, self.quit)
+
+    def eventFilter(self, obj, event) -> bool:
+        if not self.painted and event.type() == QtCore.QEvent.Type.Paint:
+            self.painted = True
+            self.mark("first paint")
+            obj.removeEventFilter(self)
+            QtCore.QTimer.singleShot(0, self.quit_if_done)
+        return False
+
+    def results_shown(self, *args):
+        if not self.results:
+            self.results = True
+            self.mark("first results")
+            self.quit_if_done()
+
+    def quit_if_done(self):
+        if self.painted and (self.results or not self.wait_results):
+            self.quit()
+
+    def quit(self):
+        QtCore.QCoreApplication.instance().closeAllWindows()
+        QtCore.QCoreApplication.quit()
+
+
+def import_times(lines: Iterable[str]) -> Dict[str, float]:
+    """
+        self time in ms of the modules in the output of -X importtime,
+        by package, and by subpackage of labeled_files
+    """
+    groups = defaultdict(float)
+    for line in lines:
+        m = IMPORT_LINE.match(line)
+        if m is None:
+            continue
+        parts = m.group(2).split(".")
+        group = ".".join(parts[:2]) if parts[0] == "labeled_files" else parts[0]
+        groups[group] += int(m.group(1)) / 1000
+    return groups
+
+
+def report(marks: List[Tuple[float, str]], imports: Dict[str, float], top: int = 15) -> str:
+    lines = [f"imports {sum(imports.values()):.1f} ms"]
+    for group, ms in sorted(imports.items(), key=lambda i: -i[1])[:top]:
+        lines.append(f"  {ms:8.1f}  {group}")
+    lines.append("steps, ms since start")
+    last = 0
+    for ms, name in marks:
+        lines.append(f"  {ms:8.1f}  +{ms - last:7.1f}  {name}")
+        last = ms
+    return "\n".join(lines)
+
+
+def run(script: str) -> int:
+    """
+        profile the script in a new process, its output other than the
+        import times is passed through
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        marks_path = Path(tmp, "marks.txt")
+        marks_path.touch()
+        args = [sys.executable, "-X", "importtime", script, FLAG]
+        start = time.perf_counter()
+        proc = subprocess.run(args, stderr=subprocess.PIPE, text=True,
+                              env={**os.environ, MARKS_ENV: str(marks_path)})
+        wall = (time.perf_counter() - start) * 1000
+        marks = []
+        for line in marks_path.read_text(encoding="utf-8").splitlines():
+            ms, name = line.split(maxsplit=1)
+            marks.append((float(ms), name))
+    err = [line for line in proc.stderr.splitlines()
+           if not line.startswith("import time:")]
+    if err:
+        print("\n".join(err), file=sys.stderr)
+    print(report(marks, import_times(proc.stderr.splitlines())))
+    print(f"process {wall:.1f} ms, including the interpreter start and exit")
+    return proc.returncode
@@ -0,0 +1,56 @@
+import json
+import subprocess
+import sys
+
+from ..cli import main
+
+
+def test_no_qt():
+    code = "\n".join([
+        "import sys",
+        "import labeled_files.cli, labeled_files.core.search",
+        "import labeled_files.core.workspace, labeled_files.core.ingest",
+        "assert not [m for m in sys.modules if m.startswith('PySide6')]"])
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_cli(tmp_path, capsys):
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    (tmp_path / "a.txt").write_text("a")
+
+    def run(*args):
+        main(["--workspace", str(ws), "--config", str(tmp_path / "config.json"),
+              "--json", *args])
+        return json.loads(capsys.readouterr().out)
+
+    added = run("add", str(tmp_path / "a.txt"), "https://example.com/",
+                "--tag", "A/B", "--tag", "C")
+    assert [(f["name"], f["type"], f["tags"]) for f in added] == [
+        ("a.txt", "file", ["A/B", "C"]),
+        ("example.com", "url", ["A/B", "C"])]
+    assert [f["name"] for f in run("search", "--tag", "A")] == \
+        ["example.com", "a.txt"]
+    assert [f["name"] for f in run("search", "--kw", "example")] == \
+        ["example.com"]
+    assert [f["name"] for f in run("search", "--limit", "1")] == \
+        ["example.com"]
+
+    tagged = run("tag", str(added[0]["id"]), "--add", "D", "--remove", "C")
+    assert tagged[0]["tags"] == ["A/B", "D"]
+    assert [f["name"] for f in run("search", "--tag", "D")] == ["a.txt"]
+    assert run("vacuum") == []
+
+
+def test_cli_json_after_command(tmp_path, capsys):
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    args = ["--workspace", str(ws), "--config", str(tmp_path / "config.json")]
+    main([*args, "add", "https://example.com/", "--tag", "A/B"])
+    capsys.readouterr()
+    main([*args, "search", "--tag", "A/B", "--kw", "example", "--json"])
+    assert [f["name"] for f in json.loads(capsys.readouterr().out)] == ["example.com"]
+    main([*args, "--json", "search"])
+    assert [f["name"] for f in json.loads(capsys.readouterr().out)] == ["example.com"]
+    main([*args, "search"])
+    assert capsys.readouterr().out.split("\t")[1] == "example.com"
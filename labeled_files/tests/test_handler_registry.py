@@ -0,0 +1,47 @@
+import subprocess
+import sys
+
+from ..path_types.base import HandlerRegistry
+from ..startup_profile import import_times
+
+
+def test_lazy_registry(monkeypatch):
+    registry = HandlerRegistry()
+    registry.register(".url", "url")
+    registry.register(".vscode", "vscode")
+    assert registry.handlers == {}
+
+    from ..path_types import url
+    assert registry["url"] is url.Handler
+    assert list(registry.modules) == ["vscode"]
+
+    # dropped, as init_var finds no vscode
+    monkeypatch.setenv("PATH", "/usr/bin")
+    assert "vscode" not in registry
+    assert list(registry) == ["url"]
+    assert registry.modules == {}
+
+
+def test_lazy_imports():
+    code = "\n".join([
+        "import sys",
+        "from labeled_files.path_types import init_handlers, path_handler_types",
+        "import labeled_files.mainUiPy",
+        "init_handlers()",
+        "assert path_handler_types['url'].mime_acceptable('https://a.com')",
+        "lazy = ['requests', 'bs4', 'multiprocessing', 'labeled_files.path_types.file']",
+        "assert not [m for m in lazy if m in sys.modules], [m for m in lazy if m in sys.modules]"])
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_import_times():
+    lines = [
+        "import time: self [us] | cumulative | imported package",
+        "import time:      1000 |       1000 |   PySide6.QtCore",
+        "import time:       500 |       1500 | PySide6",
+        "import time:      2000 |       2000 |     labeled_files.sql.files",
+        "import time:       250 |       2250 |   labeled_files.sql",
+        "import time:       100 |       2350 | labeled_files",
+        "db connect"]
+    assert import_times(lines) == {
+        "PySide6": 1.5, "labeled_files.sql": 2.25, "labeled_files": 0.1}
@@ -0,0 +1,29 @@
+from ..path_types.icon_cache import IconCache
+
+
+def test_icon_cache():
+    cache = IconCache(10, cost=len)
+    calls = []
+
+    def factory(value):
+        def f():
+            calls.append(value)
+            return value
+        return f
+
+    assert cache.get("a", factory("aaaa")) == "aaaa"
+    assert cache.get("a", factory("other")) == "aaaa"
+    assert cache.get("b", factory("bbbb")) == "bbbb"
+    assert (cache.hits, cache.misses, cache.bytes) == (1, 2, 8)
+
+    # a is used more recently, b is evicted
+    cache.get("a", factory("aaaa"))
+    cache.get("c", factory("cccc"))
+    assert cache.bytes == 8
+    assert cache.get("b", factory("bbbb")) == "bbbb"
+    assert calls == ["aaaa", "bbbb", "cccc", "bbbb"]
+
+    cache.resize(4)
+    assert len(cache) == 1 and cache.bytes == 4
+    assert cache.get("none", lambda: None) is None
+    assert len(cache) == 1
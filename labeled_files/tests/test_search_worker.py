@@ -0,0 +1,62 @@
+from ..search_worker import SearchRequest, SearchWorker
+from ..sql import FileConnection, VisitConnection
+from .test_sql_files import new_file
+
+
+def test_search_worker(tmp_path):
+    conn = FileConnection(tmp_path / "files.sqlite3")
+    with conn.connect():
+        for i in range(5):
+            conn.insert_file(new_file(f"file{i}", ["A/B"] if i % 2 else ["C"]))
+    conn.close_db()
+    VisitConnection(tmp_path / "visit.sqlite3").close_db()
+
+    worker = SearchWorker(2)
+    results = []
+    pages = []
+    tree_tags = []
+    worker.finished.connect(results.append)
+    worker.tags_ready.connect(lambda serial, tags: tree_tags.append((serial, tags)))
+    worker.page_ready.connect(lambda serial, files: pages.append(files))
+
+    def request(serial, keyword, tags):
+        return SearchRequest(serial, tmp_path / "files.sqlite3",
+                             [tmp_path / "visit.sqlite3"], keyword, tags)
+
+    # an outdated request is dropped
+    worker.latest = 2
+    worker.search(request(1, "", []))
+    assert results == [] and tree_tags == []
+
+    worker.search(request(2, "", []))
+    result, = results
+    assert [f.name for f in result.files] == ["file4", "file3"]
+    assert result.more
+    # sent after the first page
+    serial, tags = tree_tags[-1]
+    assert serial == 2
+    assert {t.tag: t.count for t in tags} == {"A": 2, "A/B": 2, "C": 3}
+
+    worker.fetch_page(2)
+    worker.fetch_page(2)
+    assert [[f.name for f in page] for page in pages] == [
+        ["file2", "file1"], ["file0"]]
+    worker.fetch_page(2)
+    assert len(pages) == 2
+
+    worker.latest = 3
+    worker.search(request(3, "file", ["A"]))
+    assert sorted(f.name for f in results[-1].files) == ["file1", "file3"]
+    assert {t.tag: t.count for t in tree_tags[-1][1]} == {"A": 2, "A/B": 2}
+
+    # keyword results are paged too, for short keywords as well
+    for serial, keyword in [(4, "file"), (5, "fi")]:
+        worker.latest = serial
+        worker.search(request(serial, keyword, []))
+        assert results[-1].more
+        worker.fetch_page(serial)
+        worker.fetch_page(serial)
+        names = [f.name for f in results[-1].files] + [f.name for f in pages[-2] + pages[-1]]
+        assert sorted(names) == [f"file{i}" for i in range(5)]
+        assert {t.tag: t.count for t in tree_tags[-1][1]} == {"A": 2, "A/B": 2, "C": 3}
+    worker.close()
@@ -0,0 +1,30 @@
+from ..core.config import Config
+from ..core.ingest import add_files
+from ..core.search import run_search
+from ..core.snapshot import Snapshot, load_snapshot, save_snapshot, snapshot_path, workspace_key
+from ..core.workspace import Workspace
+
+
+def test_snapshot(tmp_path):
+    root = tmp_path / "ws"
+    root.mkdir()
+    config = Config(pc_name_override="pc")
+    workspace = Workspace(root, config)
+    add_files(workspace.conn, [f"https://example.com/{i}" for i in range(3)], ["A/B"])
+    view = workspace.visit_view()
+    files, pages, tree_tags = run_search(workspace.conn, view, "", [], 2)
+    view.close_db()
+    workspace.close()
+
+    path = snapshot_path(root, tmp_path / "snapshots")
+    assert load_snapshot(path, workspace_key(root)) is None
+    save_snapshot(path, Snapshot(workspace_key(root), files, tree_tags))
+    snapshot = load_snapshot(path, workspace_key(root))
+    assert snapshot.files == files
+    assert snapshot.tree_tags == tree_tags
+
+    # stale once a database is written
+    workspace = Workspace(root, config)
+    workspace.visit_conn_w.visit_file(files[0].id, files[0].tags)
+    workspace.close()
+    assert load_snapshot(path, workspace_key(root)) is None
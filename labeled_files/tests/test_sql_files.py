@@ -0,0 +1,478 @@
+from datetime import datetime
+
+from ..path_types import File
+from ..sql import FileConnection
+
+
+def new_file(name: str, tags: list[str]):
+    return File(None, name, "file", name, tags,
+                datetime.now(), datetime.now(), "", "")
+
+
+def test_fetch_files_tags(tmp_path):
+    conn = FileConnection(tmp_path / "files.sqlite3")
+    with conn.connect():
+        a = new_file("a", ["A/B", "C"])
+        b = new_file("b", [])
+        c = new_file("c", ["C"])
+        for f in [a, b, c]:
+            conn.insert_file(f)
+        files = conn.fetch_files("SELECT * FROM files ORDER BY id")
+        assert [f.name for f in files] == ["a", "b", "c"]
+        assert [sorted(f.tags) for f in files] == [["A/B", "C"], [], ["C"]]
+        assert conn.fetch_files("SELECT * FROM files WHERE id = ?", (-1,)) == []
+    conn.close_db()
+
+
+def prefix_rows(conn: FileConnection):
+    return set(conn.execute("SELECT file_id, prefix FROM label_prefixes"))
+
+
+def test_label_prefixes(tmp_path):
+    conn = FileConnection(tmp_path / "files.sqlite3")
+    with conn.connect():
+        a = new_file("a", ["A/B/C", "A/D"])
+        conn.insert_file(a)
+        assert prefix_rows(conn) == {
+            (a.id, "A"), (a.id, "A/B"), (a.id, "A/B/C"), (a.id, "A/D")}
+        conn.update_file_tags(a.id, ["A/D", "E"])
+        assert prefix_rows(conn) == {(a.id, "A"), (a.id, "A/D"), (a.id, "E")}
+        conn.delete_file([a.id])
+        assert prefix_rows(conn) == set()
+    conn.close_db()
+
+
+def test_label_prefixes_migration(tmp_path):
+    path = tmp_path / "files.sqlite3"
+    conn = FileConnection(path)
+    with conn.connect():
+        a = new_file("a", ["A/B", "A/C"])
+        conn.insert_file(a)
+        conn.execute("DROP TABLE label_prefixes")
+        conn.execute('UPDATE infos SET value = "0.5.6" WHERE key = "version"')
+    conn.close_db()
+
+    conn = FileConnection(path)
+    with conn.connect():
+        assert prefix_rows(conn) == {(a.id, "A"), (a.id, "A/B"), (a.id, "A/C")}
+    conn.close_db()
+
+
+def test_search_files(tmp_path):
+    conn = FileConnection(tmp_path / "files.sqlite3")
+    with conn.connect():
+        for name, tags in [
+                ("a", ["A/B", "C"]),
+                ("b", ["A/C", "C/D"]),
+                ("ab", ["A"]),
+                ("50%'\"", ["A/B"])]:
+            conn.insert_file(new_file(name, tags))
+
+        def names(keyword, tags):
+            return sorted(f.name for f in conn.search_files(keyword, tags))
+
+        assert names("", ["A"]) == ["50%'\"", "a", "ab", "b"]
+        assert names("", ["A/B"]) == ["50%'\"", "a"]
+        assert names("", ["A", "C"]) == ["a", "b"]
+        assert names("", ["A/B", "C/D"]) == []
+        assert names("b", ["A"]) == ["ab", "b"]
+        assert names("b", []) == ["ab", "b"]
+        assert names("%'\"", []) == ["50%'\""]
+        assert names("_", []) == []
+    conn.close_db()
+
+
+def test_search_files_fts(tmp_path):
+    conn = FileConnection(tmp_path / "files.sqlite3")
+    with conn.connect():
+        a = new_file("中文测试文件", ["A"])
+        b = new_file("report", ["B"])
+        b.description = "quarterly numbers"
+        c = new_file("notes", ["A"])
+        c.path = "projects/report/notes.md"
+        for f in [a, b, c]:
+            conn.insert_file(f)
+
+        def names(keyword, tags=[]):
+            return sorted(f.name for f in conn.search_files(keyword, tags))
+
+        assert conn.has_fts
+        assert names("文测试") == ["中文测试文件"]
+        assert names("REPORT") == ["notes", "report"]
+        assert names("report", ["A"]) == ["notes"]
+        assert names("terly") == ["report"]
+        assert names("测试") == ["中文测试文件"]
+
+        c.name = "todo"
+        conn.update_file(c)
+        assert names("todo") == ["todo"]
+        conn.delete_file([c.id])
+        assert names("report") == ["report"]
+    conn.close_db()
+
+
+def test_search_files_fts_migration(tmp_path):
+    path = tmp_path / "files.sqlite3"
+    conn = FileConnection(path)
+    with conn.connect():
+        for i in range(10):
+            conn.insert_file(new_file(f"file {i}", []))
+        conn.execute("DROP TABLE files_fts")
+        conn.execute('UPDATE infos SET value = "0.6.0" WHERE key = "version"')
+    conn.close_db()
+
+    conn = FileConnection(path)
+    with conn.connect():
+        assert len(conn.search_files("file", [])) == 10
+        # pretend the backfill was interrupted after indexing ids above 7
+        conn.execute("DELETE FROM files_fts")
+        conn.execute('INSERT INTO infos(key, value) VALUES("fts_backfill", 7)')
+    conn.close_db()
+
+    conn = FileConnection(path)
+    with conn.connect():
+        assert sorted(f.name for f in conn.search_files("file", [])) == \
+            [f"file {i}" for i in range(7)]
+        assert conn.execute(
+            'SELECT COUNT(*) FROM infos WHERE key = "fts_backfill"').fetchone()[0] == 0
+    conn.close_db()
+
+
+def test_persistent_connection(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "files.sqlite3"
+    conn = FileConnection(path, True, {"journal_mode": "WAL"})
+    with conn.connect() as c:
+        conn.insert_file(new_file("a", []))
+    # committed by the outermost context but still open
+    assert conn._conn is c
+    assert c.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    other = sqlite3.connect(path)
+    assert other.execute("SELECT name FROM files").fetchall() == [("a",)]
+    other.close()
+    conn.close_db()
+
+
+def test_icons(tmp_path):
+    conn = FileConnection(tmp_path / "files.sqlite3")
+    with conn.connect():
+        a = new_file("a", [])
+        a.icon = b"png a"
+        b = new_file("b", [])
+        b.icon = b"png a"
+        c = new_file("c", [])
+        for f in [a, b, c]:
+            conn.insert_file(f)
+        assert a.icon == b.icon and isinstance(a.icon, str)
+        assert c.icon == ""
+        assert conn.execute("SELECT COUNT(*) FROM icons").fetchone()[0] == 1
+        assert conn.get_icon(a.icon) == b"png a"
+
+        c.icon = b"png c"
+        conn.update_file(c)
+        files = conn.fetch_files("SELECT * FROM files ORDER BY id")
+        assert [conn.get_icon(f.icon) for f in files] == \
+            [b"png a", b"png a", b"png c"]
+    conn.close_db()
+
+
+def test_icons_migration(tmp_path):
+    import base64
+
+    path = tmp_path / "files.sqlite3"
+    conn = FileConnection(path)
+    with conn.connect():
+        for name, icon in [("a", base64.b64encode(b"png a")),
+                           ("b", base64.b64encode(b"png a").decode()),
+                           ("c", "")]:
+            conn.insert_file(new_file(name, []))
+            conn.execute(
+                "UPDATE files SET icon = ? WHERE name = ?", (icon, name))
+        conn.execute("DROP TABLE icons")
+        conn.execute('UPDATE infos SET value = "0.6.1" WHERE key = "version"')
+    conn.close_db()
+
+    conn = FileConnection(path)
+    with conn.connect():
+        files = conn.fetch_files("SELECT * FROM files ORDER BY id")
+        assert files[0].icon == files[1].icon != ""
+        assert files[2].icon == ""
+        assert conn.get_icon(files[0].icon) == b"png a"
+        # left to an explicit vacuum
+        assert conn.needs_vacuum
+    conn.vacuum()
+    assert not conn.needs_vacuum
+    conn.close_db()
+
+
+def test_iter_files(tmp_path):
+    from ..sql import VisitConnection, VisitView
+
+    conn = FileConnection(tmp_path / "files.sqlite3")
+    visit = VisitConnection(tmp_path / "VISIT_TIME_pc.sqlite3")
+    view = VisitView([visit.path])
+    with conn.connect():
+        for i in range(10):
+            f = new_file(f"f{i}", ["A/B"] if i % 2 else ["A/C", "D"])
+            conn.insert_file(f)
+            conn.execute("UPDATE files SET vtime = ? WHERE id = ?",
+                         (str(datetime(2022, 1, 1 + i)), f.id))
+
+        def names(tags, page_size):
+            return [[f.name for f in page]
+                    for page in conn.iter_files(tags, view, page_size)]
+
+        assert names([], 4) == [
+            ["f9", "f8", "f7", "f6"], ["f5", "f4", "f3", "f2"], ["f1", "f0"]]
+        assert names(["A/B"], 2) == [["f9", "f7"], ["f5", "f3"], ["f1"]]
+        assert names(["A", "D"], 5) == [["f8", "f6", "f4", "f2", "f0"]]
+
+        # visits and new files show up in the next query
+        with visit.connect() as c:
+            c.execute("REPLACE INTO file_visit(file_id, time) VALUES(?,?)",
+                      (1, str(datetime(2023, 1, 1))))
+        conn.insert_file(new_file("new", ["D"]))
+        pages = conn.iter_files(["D"], view, 2)
+        first = next(pages)
+        assert [f.name for f in first] == ["new", "f0"]
+        assert first[1].vtime == datetime(2023, 1, 1)
+
+        # a file visited between pages is neither skipped nor repeated
+        with visit.connect() as c:
+            c.execute("REPLACE INTO file_visit(file_id, time) VALUES(?,?)",
+                      (5, str(datetime(2024, 1, 1))))
+        assert [f.name for page in pages for f in page] == ["f8", "f6", "f4", "f2"]
+
+        assert sorted(conn.count_tags(["A"])) == [
+            ("A", 10, datetime(2023, 1, 1)),
+            ("A/B", 5, datetime(2022, 1, 10)),
+            ("A/C", 5, datetime(2023, 1, 1)),
+            ("D", 5, datetime(2023, 1, 1))]
+    view.close_db()
+    visit.close_db()
+    conn.close_db()
+
+
+def test_iter_search_files(tmp_path):
+    from ..sql import VisitConnection, VisitView
+
+    conn = FileConnection(tmp_path / "files.sqlite3")
+    visit = VisitConnection(tmp_path / "VISIT_TIME_pc.sqlite3")
+    view = VisitView([visit.path])
+    with conn.connect():
+        for i in range(10):
+            f = new_file(f"file {i}", ["A"] if i % 2 else ["B"])
+            conn.insert_file(f)
+            conn.execute("UPDATE files SET vtime = ? WHERE id = ?",
+                         (str(datetime(2022, 1, 1 + i)), f.id))
+        with visit.connect() as c:
+            c.execute("REPLACE INTO file_visit(file_id, time) VALUES(?,?)",
+                      (1, str(datetime(2023, 1, 1))))
+
+        def names(keyword, tags, page_size):
+            return [[f.name for f in page]
+                    for page in conn.iter_search_files(keyword, tags, view, page_size)]
+
+        # the pages of a ranked search continue after the rank of the last file
+        ranked = [f.name for f in conn.search_files("file", [])]
+        assert sum(names("file", [], 3), []) == ranked
+        assert [len(page) for page in names("file", [], 3)] == [3, 3, 3, 1]
+        assert sum(names("file", ["A"], 2), []) == [
+            f.name for f in conn.search_files("file", ["A"])]
+        # short keywords by effective visit time
+        assert names("fi", ["B"], 2) == [
+            ["file 0", "file 8"], ["file 6", "file 4"], ["file 2"]]
+        first = next(conn.iter_search_files("file 0", [], view))
+        assert first[0].vtime == datetime(2023, 1, 1)
+
+        assert sorted(conn.count_tags(["B"], "fi")) == [("B", 5, datetime(2023, 1, 1))]
+        assert sorted(conn.count_tags([], "file 1")) == [("A", 1, datetime(2022, 1, 2))]
+    view.close_db()
+    visit.close_db()
+    conn.close_db()
+
+
+def test_iter_files_interrupted(tmp_path):
+    from ..sql import VisitConnection, VisitView
+
+    conn = FileConnection(tmp_path / "files.sqlite3")
+    visit = VisitConnection(tmp_path / "VISIT_TIME_pc.sqlite3")
+    view = VisitView([visit.path])
+    with conn.connect():
+        for i in range(3):
+            conn.insert_file(new_file(f"f{i}", ["A"]))
+    # a search interrupted after the visit times are read is rolled back
+    try:
+        with conn.connect():
+            next(conn.iter_files([], view))
+            raise InterruptedError()
+    except InterruptedError:
+        pass
+    with conn.connect():
+        assert len(next(conn.iter_files([], view))) == 3
+    view.close_db()
+    visit.close_db()
+    conn.close_db()
+
+
+def test_insert_files(tmp_path):
+    conn = FileConnection(tmp_path / "files.sqlite3")
+    with conn.connect():
+        conn.insert_file(new_file("first", []))
+        files = [new_file(f"bulk {i}", ["A/B", "C"] if i % 2 else ["A/B", "A/B"])
+                 for i in range(100)]
+        for f in files[:50]:
+            f.icon = b"png"
+        conn.insert_files(files)
+        conn.delete_file([files[-1].id])
+        conn.insert_file(new_file("last", []))
+
+    with conn.connect():
+        fetched = conn.fetch_files("SELECT * FROM files ORDER BY id")
+        assert [f.name for f in fetched] == \
+            ["first", *(f.name for f in files[:-1]), "last"]
+        assert [f.id for f in fetched[1:-1]] == [f.id for f in files[:-1]]
+        assert fetched[1].tags == ["A/B"]
+        assert sorted(fetched[2].tags) == ["A/B", "C"]
+        assert fetched[1].icon == files[0].icon != ""
+        assert conn.get_icon(files[0].icon) == b"png"
+        assert prefix_rows(conn) >= {(files[1].id, "A"), (files[1].id, "C")}
+        assert [f.name for f in conn.search_files("bulk 97", ["C"])] == ["bulk 97"]
+
+        # ids are read back, not counted, when a trigger inserts a row between
+        conn.execute(
+            "CREATE TEMP TRIGGER files_gap AFTER INSERT ON files WHEN new.name = 'gap 1' BEGIN "
+            "INSERT INTO files(name) VALUES('extra'); END")
+        files = [new_file(f"gap {i}", ["G"]) for i in range(3)]
+        conn.insert_files(files)
+        fetched = {f.id: f for f in conn.fetch_files("SELECT * FROM files WHERE name LIKE 'gap %'")}
+        assert [fetched[f.id].name for f in files] == ["gap 0", "gap 1", "gap 2"]
+        assert all(fetched[f.id].tags == ["G"] for f in files)
+    conn.close_db()
+
+
+def test_transfer_migration(tmp_path):
+    path = tmp_path / "files.sqlite3"
+    conn = FileConnection(path)
+    with conn.connect():
+        conn.insert_file(new_file("old", []))
+        conn.execute("ALTER TABLE files DROP COLUMN transfer")
+        conn.execute('UPDATE infos SET value = "0.6.2" WHERE key = "version"')
+    conn.close_db()
+
+    conn = FileConnection(path)
+    with conn.connect():
+        f = new_file("new", [])
+        f.transfer = "hardlink"
+        conn.insert_file(f)
+        fetched = conn.fetch_files("SELECT * FROM files ORDER BY id")
+        assert [f.transfer for f in fetched] == ["", "hardlink"]
+    conn.close_db()
+
+
+def test_tag_nodes(tmp_path):
+    conn = FileConnection(tmp_path / "files.sqlite3")
+
+    def nodes():
+        return sorted((path, count) for path, count, _ in conn.fetch_tag_nodes())
+
+    with conn.connect():
+        a, b, c = [new_file(name, tags) for name, tags in [
+            ("a", ["A/B", "A/C"]), ("b", ["A/B/D"]), ("c", ["E"])]]
+        conn.insert_files([a, b, c])
+        # a file with two tags under A is counted once
+        assert nodes() == [("A", 2), ("A/B", 2), ("A/B/D", 1),
+                           ("A/C", 1), ("E", 1)]
+
+        a.tags = ["A/C", "E"]
+        conn.update_file(a)
+        conn.delete_file([b.id])
+        assert nodes() == [("A", 1), ("A/C", 1), ("E", 2)]
+        assert max(vtime for _, _, vtime in conn.fetch_tag_nodes()) == c.vtime
+
+        conn.execute('UPDATE infos SET value = "0.6.3" WHERE key = "version"')
+        conn.execute("DROP TABLE tag_nodes")
+    conn.close_db()
+
+    conn = FileConnection(tmp_path / "files.sqlite3")
+    with conn.connect():
+        assert nodes() == [("A", 1), ("A/C", 1), ("E", 2)]
+        conn.insert_file(new_file("d", ["A/F"]))
+        assert nodes() == [("A", 2), ("A/C", 1), ("A/F", 1), ("E", 2)]
+
+        # a stale tag_nodes is rebuilt by 0.6.4
+        conn.execute("DELETE FROM tag_nodes")
+        conn.execute('UPDATE infos SET value = "0.6.3" WHERE key = "version"')
+    conn.close_db()
+
+    conn = FileConnection(tmp_path / "files.sqlite3")
+    with conn.connect():
+        assert nodes() == [("A", 2), ("A/C", 1), ("A/F", 1), ("E", 2)]
+    conn.close_db()
+
+
+def test_tag_nodes_vtime(tmp_path):
+    conn = FileConnection(tmp_path / "files.sqlite3")
+
+    def last_vtimes():
+        return {path: vtime.day for path, _, vtime in conn.fetch_tag_nodes()}
+
+    with conn.connect():
+        files = [new_file(f"f{i}", ["A/B"] if i % 2 else ["A"]) for i in range(4)]
+        conn.insert_files(files)
+        for i, f in enumerate(files):
+            conn.execute("UPDATE files SET vtime = ? WHERE id = ?",
+                         (str(datetime(2022, 1, 1 + i)), f.id))
+        assert last_vtimes() == {"A": 4, "A/B": 4}
+
+        # the latest file leaves the tag
+        conn.delete_file([files[3].id])
+        assert last_vtimes() == {"A": 3, "A/B": 2}
+        conn.update_file_tags(files[2].id, ["C"])
+        assert last_vtimes() == {"A": 2, "A/B": 2, "C": 3}
+
+        conn.execute("UPDATE files SET vtime = ? WHERE id = ?",
+                      (str(datetime(2022, 1, 9)), files[0].id))
+        assert last_vtimes() == {"A": 9, "A/B": 2, "C": 3}
+        conn.execute("UPDATE files SET vtime = ? WHERE id = ?",
+                      (str(datetime(2022, 1, 1)), files[0].id))
+        assert last_vtimes() == {"A": 2, "A/B": 2, "C": 3}
+
+        # the latest files leave the tags at once
+        more = [new_file(f"g{i}", ["A/D"] if i % 2 else ["A/B"]) for i in range(6)]
+        conn.insert_files(more)
+        for i, f in enumerate(more):
+            conn.execute("UPDATE files SET vtime = ? WHERE id = ?",
+                         (str(datetime(2022, 1, 10 + i)), f.id))
+        assert last_vtimes() == {"A": 15, "A/B": 14, "A/D": 15, "C": 3}
+        conn.delete_file([f.id for f in more[2:]] + [files[1].id])
+        assert last_vtimes() == {"A": 11, "A/B": 10, "A/D": 11, "C": 3}
+    conn.close_db()
+
+
+def test_latest_files(tmp_path):
+    from ..sql import VisitConnection, VisitView
+
+    conn = FileConnection(tmp_path / "files.sqlite3")
+    visit = VisitConnection(tmp_path / "VISIT_TIME_pc.sqlite3")
+    view = VisitView([visit.path])
+    with conn.connect():
+        for i in range(20):
+            f = new_file(f"f{i}", (["A"] if i % 2 else ["B"]) + (["C"] if i % 3 else []))
+            conn.insert_file(f)
+            conn.execute("UPDATE files SET vtime = ? WHERE id = ?",
+                         (str(datetime(2022, 1, 1 + i)), f.id))
+    with visit.connect() as c:
+        c.executemany("REPLACE INTO file_visit(file_id, time) VALUES(?,?)",
+                      [(i, str(datetime(2023, 1, i))) for i in range(1, 10)])
+
+    for tags in [[], ["A"], ["B"], ["A", "C"]]:
+        for limit in [1, 3, 15]:
+            expected = next(conn.iter_files(tags, view, limit))
+            files = conn.latest_files(tags, view, limit)
+            assert [(f.id, f.vtime) for f in files] == \
+                [(f.id, f.vtime) for f in expected]
+    view.close_db()
+    visit.close_db()
+    conn.close_db()
@@ -0,0 +1,80 @@
+from datetime import datetime
+import sqlite3
+
+import pytest
+
+from ..sql import VisitConnection, VisitView
+
+
+def test_visit_view(tmp_path):
+    conns = [VisitConnection(tmp_path / f"VISIT_TIME_{i}.sqlite3")
+             for i in range(3)]
+    for i, conn in enumerate(conns):
+        with conn.connect() as c:
+            c.executemany(
+                "REPLACE INTO file_visit(file_id, time) VALUES(?,?)",
+                [(file_id, str(datetime(2022, 1, 1 + i + file_id)))
+                 for file_id in range(1, 5) if file_id != i + 1])
+        conn.close_db()
+
+    view = VisitView([conn.path for conn in conns])
+    assert view.get_file_times([1, 2, 4, 10]) == {
+        1: datetime(2022, 1, 4),
+        2: datetime(2022, 1, 5),
+        4: datetime(2022, 1, 7)}
+    assert view.get_files_by_time(1) == [(4, datetime(2022, 1, 7))]
+    assert dict(view.get_files_by_time(3)) == {
+        2: datetime(2022, 1, 5),
+        3: datetime(2022, 1, 5),
+        4: datetime(2022, 1, 7)}
+
+    # attached read-only
+    conn, _ = view._conns[0]
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("DELETE FROM v0.file_visit")
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        f"VISIT_TIME_{i}.sqlite3" for i in range(3)]
+    view.close_db()
+
+
+def test_visit_view_tags(tmp_path):
+    conns = [VisitConnection(tmp_path / f"VISIT_TIME_{i}.sqlite3")
+             for i in range(2)]
+    for i, conn in enumerate(conns):
+        with conn.connect() as c:
+            c.executemany(
+                "REPLACE INTO tag_visit(tag, time) VALUES(?,?)",
+                [("A", str(datetime(2022, 1, 1 + i))),
+                 (f"B{i}", str(datetime(2022, 2, 1)))])
+        assert conn.get_tag_times() == {
+            "A": datetime(2022, 1, 1 + i), f"B{i}": datetime(2022, 2, 1)}
+        conn.close_db()
+
+    view = VisitView([conn.path for conn in conns])
+    assert view.get_tag_times() == {
+        "A": datetime(2022, 1, 2),
+        "B0": datetime(2022, 2, 1),
+        "B1": datetime(2022, 2, 1)}
+    view.close_db()
+
+
+def test_visit_version(tmp_path, monkeypatch):
+    from ..core.config import VERSION
+    from ..sql import visit_updater
+    path = tmp_path / "VISIT_TIME_pc.sqlite3"
+    conn = VisitConnection(path)
+    with conn.connect() as c:
+        c.execute('UPDATE infos SET value = "0.5.6" WHERE key = "version"')
+    conn.close_db()
+
+    # no updater applies, the version is stored all the same
+    conn = VisitConnection(path)
+    with conn.connect() as c:
+        assert c.execute(
+            'SELECT value FROM infos WHERE key = "version"').fetchone()[0] == VERSION
+    conn.close_db()
+
+    def update(conn):
+        raise AssertionError("already current")
+    monkeypatch.setattr(visit_updater, "update", update)
+    VisitConnection(path).close_db()
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from ..tree import TagFilterModel, TagRole, TagTreeModel, TreeTag
+
+
+def texts(model, parent=None):
+    from PySide6.QtCore import QModelIndex
+    parent = parent or QModelIndex()
+    return [(model.index(row, 0, parent).data(),
+             model.index(row, 1, parent).data(),
+             texts(model, model.index(row, 0, parent)))
+            for row in range(model.rowCount(parent))]
+
+
+def test_tag_tree_model():
+    model = TagTreeModel()
+    # a file tagged A/B/C and A/D is counted once under A
+    model.set_tags([TreeTag("A", 2, datetime(2022, 1, 3)),
+                    TreeTag("A/B", 2, datetime(2022, 1, 1)),
+                    TreeTag("A/B/C", 2, datetime(2022, 1, 1)),
+                    TreeTag("A/D", 1, datetime(2022, 1, 3)),
+                    TreeTag("E", 3, datetime(2022, 1, 2))])
+    assert texts(model) == [
+        ("A", "2", [("D", "1", []), ("B/C", "2", [])]),
+        ("E", "3", [])]
+    index = model.index(1, 0, model.index(0, 0))
+    assert index.data(TagRole) == "A/B/C"
+    assert model.parent(index) == model.index(0, 0)
+
+    model.set_tags([TreeTag("F", 1)])
+    assert texts(model) == [("F", "1", [])]
+
+
+def test_tag_filter_model():
+    model = TagTreeModel()
+    proxy = TagFilterModel()
+    proxy.setSourceModel(model)
+    model.set_tags([TreeTag("A", 2), TreeTag("A/B", 1), TreeTag("A/C", 1),
+                    TreeTag("D", 1), TreeTag("D/b", 1)])
+
+    # ancestors of matches are kept
+    proxy.set_keyword("b")
+    assert texts(proxy) == [("A", "2", [("B", "1", [])]),
+                            ("D/b", "1", [])]
+    proxy.set_keyword("a/c")
+    assert texts(proxy) == [("A", "2", [("C", "1", [])])]
+    proxy.set_keyword("")
+    assert len(texts(proxy)) == 2
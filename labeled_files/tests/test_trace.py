@@ -0,0 +1,46 @@
+import json
+
+from ..core.config import Config
+from ..core.ingest import add_files
+from ..core.search import run_search
+from ..core.trace import NULL_SPAN, context, span, tracer
+from ..core.workspace import Workspace
+
+
+def test_trace(tmp_path):
+    assert span("a") is NULL_SPAN
+    root = tmp_path / "ws"
+    root.mkdir()
+    workspace = Workspace(root, Config(pc_name_override="pc"))
+    add_files(workspace.conn, [f"https://example.com/{i}" for i in range(3)], ["A/B"])
+    view = workspace.visit_view()
+
+    path = tmp_path / "trace.jsonl"
+    tracer.enable(path)
+    try:
+        with context(serial=7):
+            run_search(workspace.conn, view, "", ["A"], 2)
+        try:
+            with span("failed", rows=1):
+                raise KeyError()
+        except KeyError:
+            pass
+    finally:
+        tracer.disable()
+        view.close_db()
+        workspace.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    spans = {s["name"]: s for s in lines if s.get("serial") == 7}
+    assert spans["search.files"]["rows"] == 2
+    assert spans["search.visits"]["parent"] == "search.files"
+    assert spans["fetch_files"]["rows"] == 2
+    assert spans["search.tags"]["rows"] == 2  # A and A/B
+    assert all(s["ms"] >= 0 for s in lines)
+    assert lines[-1] == tracer.spans(name="failed")[-1]
+    assert lines[-1]["error"] == "KeyError" and "serial" not in lines[-1]
+
+    # nothing is recorded once disabled
+    with span("a"):
+        pass
+    assert not tracer.spans(name="a")
@@ -0,0 +1,122 @@
+import errno
+import os
+
+import pytest
+
+from .. import transfer as transfer_module
+from ..transfer import Transfer, TransferCancelled, run_transfer
+
+
+def make_tree(root):
+    (root / "sub").mkdir(parents=True)
+    (root / "a.bin").write_bytes(os.urandom(3 * 1024))
+    (root / "sub" / "b.bin").write_bytes(os.urandom(5 * 1024))
+
+
+def assert_same_tree(a, b):
+    assert sorted(p.relative_to(a) for p in a.rglob("*")) == \
+        sorted(p.relative_to(b) for p in b.rglob("*"))
+    for p in a.rglob("*"):
+        if p.is_file():
+            assert p.read_bytes() == (b / p.relative_to(a)).read_bytes()
+
+
+def test_copy(tmp_path, monkeypatch):
+    monkeypatch.setattr(transfer_module, "CHUNK_SIZE", 1024)
+    make_tree(tmp_path / "src")
+    progress = []
+    t = Transfer(tmp_path / "src", tmp_path / "dst", "dst", False)
+    run_transfer(t, lambda t: progress.append(t.done))
+    assert_same_tree(tmp_path / "src", tmp_path / "dst")
+    assert t.total == t.done == 8 * 1024
+    assert progress == [i * 1024 for i in range(1, 9)]
+
+
+def cross_device(*args):
+    raise OSError(errno.EXDEV, "cross device")
+
+
+def test_copy_fallback(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "copy_file_range", cross_device, raising=False)
+    monkeypatch.setattr(os, "sendfile", cross_device, raising=False)
+    make_tree(tmp_path / "src")
+    run_transfer(Transfer(tmp_path / "src" / "a.bin",
+                 tmp_path / "a.bin", "a.bin", False))
+    assert (tmp_path / "a.bin").read_bytes() == \
+        (tmp_path / "src" / "a.bin").read_bytes()
+
+
+def test_cancel(tmp_path, monkeypatch):
+    monkeypatch.setattr(transfer_module, "CHUNK_SIZE", 1024)
+    make_tree(tmp_path / "src")
+    t = Transfer(tmp_path / "src", tmp_path / "dst", "dst", True)
+
+    def progress(t: Transfer):
+        if t.done >= 4 * 1024:
+            t.cancel()
+
+    # a cross device move, copied and then removed
+    monkeypatch.setattr(os, "rename", cross_device)
+    with pytest.raises(TransferCancelled):
+        run_transfer(t, progress)
+    # the partial target is removed, the source is kept
+    assert not (tmp_path / "dst").exists()
+    assert (tmp_path / "src" / "sub" / "b.bin").exists()
+
+    t = Transfer(tmp_path / "src", tmp_path / "dst", "dst", True)
+    run_transfer(t)
+    assert not (tmp_path / "src").exists()
+    assert (tmp_path / "dst" / "sub" / "b.bin").stat().st_size == 5 * 1024
+
+
+def test_move_rename(tmp_path):
+    make_tree(tmp_path / "src")
+    t = Transfer(tmp_path / "src", tmp_path / "dst", "dst", True)
+    run_transfer(t)
+    assert not (tmp_path / "src").exists()
+    assert (tmp_path / "dst" / "a.bin").exists()
+
+
+def test_cancel_queued_move(tmp_path):
+    make_tree(tmp_path / "src")
+    t = Transfer(tmp_path / "src", tmp_path / "dst", "dst", True)
+    t.cancel()
+    with pytest.raises(TransferCancelled):
+        run_transfer(t)
+    assert (tmp_path / "src" / "a.bin").exists()
+    assert not (tmp_path / "dst").exists()
+
+
+def test_hardlink(tmp_path):
+    make_tree(tmp_path / "src")
+    t = Transfer(tmp_path / "src", tmp_path / "dst", "dst", False,
+                 ("hardlink", "copy"), frozenset({".bin"}))
+    run_transfer(t)
+    assert_same_tree(tmp_path / "src", tmp_path / "dst")
+    assert (tmp_path / "dst" / "a.bin").stat().st_ino == \
+        (tmp_path / "src" / "a.bin").stat().st_ino
+    assert t.strategy == "hardlink"
+    assert t.done == t.total
+
+    # only files of the suffixes are linked
+    t = Transfer(tmp_path / "src" / "a.bin", tmp_path / "a.txt", "a.txt", False,
+                 ("hardlink", "copy"), frozenset({".txt"}))
+    run_transfer(t)
+    assert (tmp_path / "a.txt").stat().st_ino != \
+        (tmp_path / "src" / "a.bin").stat().st_ino
+    assert t.strategy == "copy"
+
+
+def test_reflink_fallback(tmp_path, monkeypatch):
+    def not_supported(*args):
+        raise OSError(errno.EOPNOTSUPP, "not supported")
+
+    monkeypatch.setattr(os, "link", cross_device)
+    monkeypatch.setattr(transfer_module, "reflink_file", not_supported)
+    make_tree(tmp_path / "src")
+    t = Transfer(tmp_path / "src", tmp_path / "dst", "dst", False,
+                 ("reflink", "hardlink", "copy"), frozenset({".bin"}))
+    run_transfer(t)
+    assert_same_tree(tmp_path / "src", tmp_path / "dst")
+    assert t.strategy == "copy"
+    assert t.done == t.total == 8 * 1024
@@ -0,0 +1,20 @@
+from ..core.config import Config
+from ..core.workspace import Workspace, is_shared_folder, workspace_pragmas
+
+
+def test_shared_folder(tmp_path):
+    pragmas = Config().sqlite_pragmas
+    assert not is_shared_folder(tmp_path)
+    assert workspace_pragmas(tmp_path, pragmas) is pragmas
+
+    root = tmp_path / "OneDrive - Company" / "ws"
+    root.mkdir(parents=True)
+    assert is_shared_folder(root)
+    assert workspace_pragmas(root, pragmas) == {**pragmas, "journal_mode": "DELETE"}
+    assert pragmas["journal_mode"] == "WAL"
+
+    workspace = Workspace(root, Config(pc_name_override="pc"))
+    with workspace.conn.connect() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    workspace.close()
+    assert not list(root.glob("*-wal"))
@@ -0,0 +1,264 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+import errno
+import os
+from pathlib import Path
+import shutil
+import sys
+import time
+from typing import Callable, FrozenSet, List, Tuple
+
+from PySide6 import QtCore
+
+CHUNK_SIZE = 8 * 1024 * 1024
+FICLONE = 0x40049409  # linux/fs.h, clone a file sharing its extents
+
+# errors of a file system which can not do the operation
+UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+               errno.ENOTSUP, errno.ENOTTY, errno.EPERM, errno.EMLINK}
+
+# File.transfer, how a file is brought into the workspace. strategies of a
+# copy, in the order of how much the target shares with the source
+MOVE = "move"
+HARDLINK = "hardlink"  # the same data, changes show up in both
+REFLINK = "reflink"  # shares blocks until either is changed
+COPY = "copy"
+SHARING = [HARDLINK, REFLINK, COPY]
+
+
+class TransferCancelled(Exception):
+    pass
+
+
+@dataclass(eq=False)
+class Transfer:
+    source: Path
+    target: Path
+    path: str  # file.path once transferred
+    move: bool
+    strategies: Tuple[str, ...] = (COPY,)
+    hardlink_suffixes: FrozenSet[str] = frozenset()
+    strategy: str = ""  # the one used, for a folder the most sharing one
+    total: int = 0
+    done: int = 0
+    state: str = "waiting"  # running, finished, cancelled, failed
+    error: Exception | None = None
+    cancel_requested: bool = False
+
+    @property
+    def name(self) -> str:
+        return self.source.name
+
+    @property
+    def percent(self) -> int:
+        return self.done * 100 // self.total if self.total else 0
+
+    def cancel(self):
+        self.cancel_requested = True
+
+
+def copy_data(fd_in: int, fd_out: int, copied: Callable[[int], None]):
+    """
+        copy in chunks, in the kernel by copy_file_range or sendfile
+        when possible, otherwise by read and write
+    """
+    if hasattr(os, "copy_file_range"):
+        mode = "copy_file_range"
+    elif sys.platform == "linux":
+        mode = "sendfile"
+    else:
+        mode = "read"
+    while True:
+        try:
+            if mode == "copy_file_range":
+                n = os.copy_file_range(fd_in, fd_out, CHUNK_SIZE)
+            elif mode == "sendfile":
+                n = os.sendfile(fd_out, fd_in, None, CHUNK_SIZE)
+            else:
+                data = os.read(fd_in, CHUNK_SIZE)
+                n = len(data)
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd_out, view):]
+        except OSError as e:
+            # not supported by the file systems, nothing was copied by this call
+            if mode == "read" or e.errno not in UNSUPPORTED:
+                raise
+            mode = "sendfile" if mode == "copy_file_range" and sys.platform == "linux" else "read"
+            continue
+        if not n:
+            return
+        copied(n)
+
+
+def reflink_file(source: Path, target: Path):
+    if sys.platform != "linux":
+        raise OSError(errno.ENOTSUP, "reflink is only supported on linux")
+    import fcntl
+    with open(source, "rb") as fsrc, open(target, "xb") as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    shutil.copymode(source, target)
+
+
+def copy_file(transfer: Transfer, source: Path, target: Path, copied: Callable[[int], None]) -> str:
+    """
+        by the first of transfer.strategies the file systems support,
+        returns the strategy used
+    """
+    for strategy in transfer.strategies:
+        try:
+            match strategy:
+                case "reflink":
+                    reflink_file(source, target)
+                case "hardlink":
+                    if source.suffix.lower() not in transfer.hardlink_suffixes:
+                        continue
+                    os.link(source, target)
+                case _:
+                    with open(source, "rb") as fsrc, open(target, "xb") as fdst:
+                        copy_data(fsrc.fileno(), fdst.fileno(), copied)
+                    shutil.copymode(source, target)
+                    return COPY
+        except OSError as e:
+            if strategy == COPY or e.errno not in UNSUPPORTED:
+                raise
+            if strategy == REFLINK:
+                remove_path(target)
+            continue
+        copied(source.stat().st_size)
+        return strategy
+    raise OSError(errno.ENOTSUP, f"no strategy to copy {source}")
+
+
+def copy_tree(transfer: Transfer, source: Path, target: Path, copied: Callable[[int], None]) -> str:
+    target.mkdir()
+    strategy = COPY
+    for path in source.iterdir():
+        if path.is_dir():
+            used = copy_tree(transfer, path, target / path.name, copied)
+        else:
+            used = copy_file(transfer, path, target / path.name, copied)
+        strategy = min(strategy, used, key=SHARING.index)
+    shutil.copystat(source, target)
+    return strategy
+
+
+def get_size(path: Path) -> int:
+    if not path.is_dir():
+        return path.stat().st_size
+    return sum(get_size(p) for p in path.iterdir())
+
+
+def remove_path(path: Path):
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    elif path.exists() or path.is_symlink():
+        path.unlink()
+
+
+def run_transfer(transfer: Transfer, progress: Callable[[Transfer], None] = lambda t: None):
+    """
+        a move in one file system is a rename. otherwise the data is copied,
+        the source of a move is removed after all data is copied,
+        a partial target is removed when cancelled or failed
+    """
+    transfer.state = "running"
+    # cancelled while queued
+    if transfer.cancel_requested:
+        raise TransferCancelled()
+    if transfer.move:
+        try:
+            os.rename(transfer.source, transfer.target)
+            transfer.strategy = MOVE
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+    transfer.total = get_size(transfer.source)
+
+    def copied(n: int):
+        transfer.done += n
+        if transfer.cancel_requested:
+            raise TransferCancelled()
+        progress(transfer)
+
+    try:
+        # or while the size was taken
+        if transfer.cancel_requested:
+            raise TransferCancelled()
+        if transfer.source.is_dir():
+            strategy = copy_tree(
+                transfer, transfer.source, transfer.target, copied)
+        else:
+            strategy = copy_file(
+                transfer, transfer.source, transfer.target, copied)
+    except BaseException:
+        remove_path(transfer.target)
+        raise
+    if transfer.move:
+        remove_path(transfer.source)
+        transfer.strategy = MOVE
+    else:
+        transfer.strategy = strategy
+
+
+class TransferQueue(QtCore.QObject):
+    """
+        runs transfers on a bounded thread pool.
+        signals are delivered in the thread of this object
+    """
+    progressed = QtCore.Signal(object)  # Transfer
+    finished = QtCore.Signal(object, object)  # Transfer, callback
+    changed = QtCore.Signal()  # transfers added or removed
+
+    def __init__(self, workers: int = 2) -> None:
+        super().__init__()
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="transfer")
+        self.transfers: List[Transfer] = []
+        self.finished.connect(
+            self.deliver, QtCore.Qt.ConnectionType.QueuedConnection)
+
+    def submit(self, transfer: Transfer, done: Callable[[Transfer], None]):
+        """
+            done is called with the transfer when it is finished, cancelled or failed
+        """
+        last_emit = 0
+
+        def progress(transfer: Transfer):
+            nonlocal last_emit
+            now = time.monotonic()
+            if now - last_emit > 0.2:
+                last_emit = now
+                self.progressed.emit(transfer)
+
+        def finished(future: Future):
+            e = None if future.cancelled() else future.exception()
+            if future.cancelled() or isinstance(e, TransferCancelled):
+                transfer.state = "cancelled"
+            elif e is None:
+                transfer.state = "finished"
+            else:
+                transfer.state = "failed"
+                transfer.error = e
+            self.finished.emit(transfer, done)
+
+        self.transfers.append(transfer)
+        self.changed.emit()
+        self.pool.submit(run_transfer, transfer, progress).add_done_callback(finished)
+
+    def deliver(self, transfer: Transfer, done: Callable[[Transfer], None]):
+        self.transfers.remove(transfer)
+        self.changed.emit()
+        done(transfer)
+
+    def cancel_all(self):
+        for transfer in self.transfers:
+            transfer.cancel()
+
+    def close(self):
+        """
+            cancel all transfers, the finished ones are still delivered
+        """
+        self.cancel_all()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        QtCore.QCoreApplication.sendPostedEvents(self, QtCore.QEvent.Type.MetaCall)
@@ -0,0 +1,47 @@
+from PySide6 import QtWidgets
+
+from .transfer import Transfer, TransferQueue
+
+
+class TransferWidget(QtWidgets.QWidget):
+    """
+        overall progress of the transfer queue for the status bar,
+        the menu of the button shows every transfer and cancels it
+    """
+
+    def __init__(self, queue: TransferQueue, parent=None) -> None:
+        super().__init__(parent)
+        self.queue = queue
+        layout = QtWidgets.QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.progressBar = QtWidgets.QProgressBar()
+        self.progressBar.setMaximumWidth(150)
+        self.button = QtWidgets.QToolButton()
+        self.button.setPopupMode(
+            QtWidgets.QToolButton.ToolButtonPopupMode.InstantPopup)
+        self.menu = QtWidgets.QMenu(self.button)
+        self.menu.aboutToShow.connect(self.menu_refresh)
+        self.button.setMenu(self.menu)
+        layout.addWidget(self.progressBar)
+        layout.addWidget(self.button)
+
+        queue.changed.connect(self.refresh)
+        queue.progressed.connect(self.refresh)
+        self.refresh()
+
+    def refresh(self, *args):
+        transfers = self.queue.transfers
+        self.setVisible(bool(transfers))
+        total = sum(t.total for t in transfers)
+        done = sum(t.done for t in transfers)
+        self.progressBar.setValue(done * 100 // total if total else 0)
+        self.button.setText(f"正在传输 {len(transfers)} 个文件")
+
+    def menu_refresh(self):
+        self.menu.clear()
+        for transfer in self.queue.transfers:
+            action = self.menu.addAction(
+                f"取消 {transfer.name} ({transfer.percent}%)")
+            action.triggered.connect(transfer.cancel)
+        self.menu.addSeparator()
+        self.menu.addAction("全部取消").triggered.connect(self.queue.cancel_all)
@@ -1,64 +1,116 @@
-from collections import defaultdict
-from dataclasses import dataclass, field
-from datetime import datetime
-from typing import DefaultDict, Dict
-from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem, QHeaderView
-
-
-@dataclass
-class TreeTag:
-    tag: str
-    count: int = 0
-    time: datetime = datetime(1970, 1, 1)
-
-
-@dataclass
-class Node:
-    count: int = 0
-    vtime: datetime = datetime(1970, 1, 1)
-    sub_nodes: DefaultDict[str, 'Node'] = field(
-        default_factory=lambda: defaultdict(Node))
-
-    def build_node(self, label: str, count: int, vtime: datetime):
-        self.count += count
-        self.vtime = max(self.vtime, vtime)
-        if not label:
-            return
-        ind = label.find('/')
-        part = label[:ind] if ind > 0 else label
-        node = self.sub_nodes[part]
-        node.build_node(label[ind + 1:] if ind > 0 else "", count, vtime)
-
-    def build_tree(self, root: QTreeWidget | QTreeWidgetItem, expand: bool):
-        items = sorted(self.sub_nodes.items(),
-                       key=lambda item: (item[1].vtime, item[1].count), reverse=True)
-        for key, node in items:
-            item = QTreeWidgetItem(root)
-            if len(node.sub_nodes) == 1:
-                path = [key]
-                while len(node.sub_nodes) == 1:
-                    key = list(node.sub_nodes.keys())[0]
-                    sub_node = node.sub_nodes[key]
-                    if sub_node.count == node.count:
-                        path.append(key)
-                        node = node.sub_nodes[key]
-                    else:
-                        break
-                key = '/'.join(path)
-            item.setText(0, key)
-            item.setText(1, str(node.count))
-            if node.sub_nodes and expand:
-                item.setExpanded(True)
-            node.build_tree(item, False)
-
-
-def build_tree(treeWidget: QTreeWidget, tags: list[TreeTag]):
-    root = Node()
-    for tag in tags:
-        root.build_node(tag.tag, tag.count, tag.time)
-
-    treeWidget.clear()
-    treeWidget.header().setSectionResizeMode(
-        0, QHeaderView.ResizeMode.ResizeToContents)
-
-    root.build_tree(treeWidget, len(root.sub_nodes) < 10)
+from typing import Any, List, Set
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, QSortFilterProxyModel, Qt, Signal
+
+from .core.tree import TagItem, TreeTag, build_tree
+
+
+TagRole = Qt.ItemDataRole.UserRole
+
+
+class TagTreeModel(QAbstractItemModel):
+    """
+        the tag hierarchy of a search, built once by set_tags from
+        every tag and tag prefix with its distinct file count.
+        filtering is left to TagFilterModel
+    """
+    headers = ["标签", "计数"]
+    tags_changed = Signal()  # emitted before the reset ends
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.root = TagItem("", "", 0, None, 0)
+
+    def set_tags(self, tags: List[TreeTag]):
+        root = build_tree(tags)
+        self.beginResetModel()
+        self.root = root
+        self.tags_changed.emit()
+        self.endResetModel()
+
+    def item(self, index: QModelIndex) -> TagItem:
+        return index.internalPointer() if index.isValid() else self.root
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        return self.createIndex(row, column, self.item(parent).children[row])
+
+    def parent(self, index: QModelIndex) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        parent = self.item(index).parent
+        if parent is self.root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.column() > 0:
+            return 0
+        return len(self.item(parent).children)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return len(self.headers)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        item = self.item(index)
+        if role == Qt.ItemDataRole.DisplayRole:
+            return item.text if index.column() == 0 else str(item.count)
+        if role == TagRole:
+            return item.tag
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.headers[section]
+        return None
+
+
+class TagFilterModel(QSortFilterProxyModel):
+    """
+        tags containing the keyword, with their ancestors.
+        the items to show are found by one pass over the tree,
+        instead of asking the source model for every descendant of every row
+    """
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.keyword = ""
+        self.shown: Set[TagItem] = set()
+
+    def setSourceModel(self, model: TagTreeModel):
+        super().setSourceModel(model)
+        model.tags_changed.connect(self.update_shown)
+        self.update_shown()
+
+    def set_keyword(self, keyword: str):
+        # Qt 6.10 deprecates invalidating in favour of a bracketed change
+        bracketed = hasattr(self, "endFilterChange")
+        if bracketed:
+            self.beginFilterChange()
+        self.keyword = keyword.lower()
+        self.update_shown()
+        if bracketed:
+            self.endFilterChange(QSortFilterProxyModel.Direction.Rows)
+        else:
+            self.invalidateFilter()
+
+    def update_shown(self):
+        self.shown.clear()
+        if self.keyword and self.sourceModel() is not None:
+            self.mark_shown(self.sourceModel().root)
+
+    def mark_shown(self, item: TagItem) -> bool:
+        found = self.keyword in item.tag.lower()
+        for child in item.children:
+            found = self.mark_shown(child) or found
+        if found:
+            self.shown.add(item)
+        return found
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if not self.keyword:
+            return True
+        item = self.sourceModel().item(source_parent).children[source_row]
+        return item in self.shown
@@ -1,18 +1,37 @@
-import multiprocessing
+import sys
+import time
 
-multiprocessing.freeze_support()
+start = time.perf_counter()
+
+if getattr(sys, "frozen", False):
+    import multiprocessing
+    multiprocessing.freeze_support()
 
 if __name__ == "__main__":
+    profile = "--profile-startup" in sys.argv
+    if profile and "importtime" not in sys._xoptions:
+        from labeled_files.startup_profile import run
+        sys.exit(run(__file__))
     try:
         # os.environ.pop("QT_PLUGIN_PATH", None)
         from PySide6 import QtWidgets
         from labeled_files.mainUiPy import Window
+        if profile:
+            from labeled_files.startup_profile import StartupMarks
+            from labeled_files.setting import setting
+            marks = StartupMarks(start)
+            marks.mark("imports")
         app = QtWidgets.QApplication([])
         win = Window()
+        if profile:
+            marks.mark("window created")
+            marks.watch(win)
         win.show()
         win.config_init()
         win.search()
-        import sys
+        if profile:
+            marks.mark("config and workspace loaded")
+            marks.wait_results = setting.root_path is not None
         sys.exit(app.exec())
     except Exception as e:
         import logging